@@ -16,17 +16,31 @@ from _piqtree import __iqtree_version__
 
 from piqtree._data import dataset_names, download_dataset
 from piqtree.iqtree import (
+    AlignmentHandle,
+    CondensedDistanceMatrix,
+    ModelFinderCache,
     ModelFinderResult,
+    ProgressEvent,
     TreeGenMode,
     build_tree,
     consensus_tree,
     fit_tree,
+    fit_trees,
     jc_distances,
+    kuhner_felsenstein,
+    matching_split_distance,
     model_finder,
     nj_tree,
+    parallel_model_finder,
+    quartet_distance,
     random_tree,
+    random_trees,
     robinson_foulds,
     simulate_alignment,
+    simulate_alignment_to_file,
+    simulate_alignments,
+    streaming_consensus_tree,
+    weighted_robinson_foulds,
 )
 from piqtree.model import (
     Model,
@@ -40,8 +54,12 @@ __version__ = "0.8.3"
 
 
 __all__ = [
+    "AlignmentHandle",
+    "CondensedDistanceMatrix",
     "Model",
+    "ModelFinderCache",
     "ModelFinderResult",
+    "ProgressEvent",
     "TreeGenMode",
     "__iqtree_version__",
     "available_freq_type",
@@ -52,11 +70,21 @@ __all__ = [
     "dataset_names",
     "download_dataset",
     "fit_tree",
+    "fit_trees",
     "jc_distances",
+    "kuhner_felsenstein",
     "make_model",
+    "matching_split_distance",
     "model_finder",
     "nj_tree",
+    "parallel_model_finder",
+    "quartet_distance",
     "random_tree",
+    "random_trees",
     "robinson_foulds",
     "simulate_alignment",
+    "simulate_alignment_to_file",
+    "simulate_alignments",
+    "streaming_consensus_tree",
+    "weighted_robinson_foulds",
 ]
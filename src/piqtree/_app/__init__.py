@@ -1,5 +1,6 @@
 """cogent3 apps for piqtree."""
 
+import os
 from collections.abc import Iterable
 
 from cogent3.core.alignment import Alignment
@@ -36,12 +37,14 @@ class piq_build_tree:
         bootstrap_reps: int | None = None,
         num_threads: int | None = None,
         other_options: str = "",
+        checkpoint: str | os.PathLike | None = None,
     ) -> None:
         self._model = model
         self._rand_seed = rand_seed
         self._bootstrap_reps = bootstrap_reps
         self._num_threads = num_threads
         self._other_options = other_options
+        self._checkpoint = checkpoint
 
     def main(
         self,
@@ -54,6 +57,7 @@ class piq_build_tree:
             bootstrap_replicates=self._bootstrap_reps,
             num_threads=self._num_threads,
             other_options=self._other_options,
+            checkpoint=self._checkpoint,
         )
         tree.source = getattr(aln, "source", None)
         return tree
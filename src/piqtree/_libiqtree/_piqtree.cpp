@@ -3,12 +3,28 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <iostream>
+#include <mutex>
 #include <string>
 #include <vector>
 #include "_piqtree.h"
+#include "_tree_distance.h"
 
 namespace py = pybind11;
 
+/*
+ * libiqtree keeps global state (the Params singleton, the random number
+ * generator and its output files), so only one call into it may run at a
+ * time. Bindings release the GIL before taking this lock, so other Python
+ * threads keep running while a call waits for, or holds, the library.
+ */
+std::mutex libiqtreeMutex;
+
+struct LibraryLock {
+  std::lock_guard<std::mutex> lock{libiqtreeMutex};
+};
+
+using LibraryCall = py::call_guard<py::gil_scoped_release, LibraryLock>;
+
 void checkError(char* errorStr) {
   if (errorStr && std::strlen(errorStr) > 0) {
     string msg(errorStr);
@@ -30,6 +46,10 @@ struct type_caster<StringArray> {
   bool load(handle src, bool) {
     /* Extract PyObject from handle */
     PyObject* source = src.ptr();
+    if (py::isinstance<py::array_t<uint8_t>>(src)) {
+      return loadCharMatrix(reinterpret_borrow<py::array_t<uint8_t>>(src));
+    }
+
     if (!py::isinstance<py::sequence>(source)) {
       return false;
     }
@@ -61,8 +81,40 @@ struct type_caster<StringArray> {
   }
 
  private:
+  /*
+   * Borrow the rows of a C-contiguous 2D uint8 array as C strings without
+   * copying. Each row must be NUL-terminated, i.e. its last column is 0.
+   */
+  bool loadCharMatrix(py::array_t<uint8_t> arr) {
+    if (arr.ndim() != 2 || !(arr.flags() & py::array::c_style)) {
+      return false;
+    }
+
+    size_t rows = arr.shape(0);
+    size_t cols = arr.shape(1);
+    const char* data = reinterpret_cast<const char*>(arr.data());
+
+    tmpCStrs.reserve(rows);
+    for (size_t i = 0; i < rows; ++i) {
+      const char* row = data + i * cols;
+      if (cols == 0 || row[cols - 1] != '\0') {
+        throw py::value_error(
+            "Each row of the sequence array must end with 0.");
+      }
+      tmpCStrs.push_back(row);
+    }
+
+    // Keep the array alive for the duration of the call
+    tmpArray = arr;
+    value.length = rows;
+    value.strings = tmpCStrs.data();
+
+    return true;
+  }
+
   vector<string> tmpStrings;
   vector<const char*> tmpCStrs;
+  py::object tmpArray;
 };
 
 template <>
@@ -76,15 +128,24 @@ struct type_caster<DoubleArray> {
       return false;  // Only accept numpy arrays of float64
     }
 
-    auto arr = py::cast<py::array_t<double>>(src);
-    if (arr.ndim() != 1) {
+    // Reads the elements in order, even if the array is not C-contiguous
+    auto arr = py::array_t<double, py::array::c_style>::ensure(src);
+    if (!arr || arr.ndim() != 1) {
       return false;  // Only accept 1D arrays
     }
 
+    // IQ-TREE takes a non-const pointer and is not known to leave the
+    // distances untouched, so only a writeable buffer is lent to it, which
+    // the caller must not rely on afterwards. A read-only one is copied.
     value.length = arr.size();
-
-    tmpDoubles.assign(arr.data(), arr.data() + value.length);
-    value.doubles = tmpDoubles.data();
+    if (arr.writeable()) {
+      value.doubles = arr.mutable_data();
+      // Keep the array alive for the duration of the call
+      tmpArray = arr;
+    } else {
+      tmpDoubles.assign(arr.data(), arr.data() + value.length);
+      value.doubles = tmpDoubles.data();
+    }
 
     return true;
   }
@@ -96,6 +157,7 @@ struct type_caster<DoubleArray> {
 
  private:
   vector<double> tmpDoubles;
+  py::object tmpArray;
 };
 
 template <>
@@ -155,10 +217,13 @@ struct type_caster<DoubleArrayResult> {
   static handle cast(DoubleArrayResult src, return_value_policy, handle) {
     checkError(src.errorStr);
 
-    auto result = py::array_t<double>(src.length);
+    if (!src.value) {
+      return py::array_t<double>(0).release();
+    }
 
-    std::memcpy(result.mutable_data(), src.value, src.length * sizeof(double));
-    iqtree_free(src.value);
+    // Hand the IQ-TREE buffer to numpy, which frees it once unreferenced
+    py::capsule owner(src.value, iqtree_free);
+    auto result = py::array_t<double>(src.length, src.value, owner);
 
     return result.release();
   }
@@ -166,6 +231,145 @@ struct type_caster<DoubleArrayResult> {
 }  // namespace detail
 }  // namespace PYBIND11_NAMESPACE
 
+py::array_t<double> rfAllPairs(SplitWords splits,
+                               Offsets offsets,
+                               bool normalized,
+                               int numThreads) {
+  TreeSplits trees(splits, offsets);
+  return allPairs(trees.numTrees, numThreads, [&](size_t i, size_t j) {
+    return rfDistance(trees, i, trees, j, normalized);
+  });
+}
+
+py::array_t<double> rfManyToMany(SplitWords splitsA,
+                                 Offsets offsetsA,
+                                 SplitWords splitsB,
+                                 Offsets offsetsB,
+                                 bool normalized,
+                                 int numThreads) {
+  TreeSplits treesA(splitsA, offsetsA);
+  TreeSplits treesB(splitsB, offsetsB);
+  checkSameTaxa(treesA.numWords, treesB.numWords);
+  return manyToMany(treesA.numTrees, treesB.numTrees, numThreads,
+                    [&](size_t i, size_t j) {
+                      return rfDistance(treesA, i, treesB, j, normalized);
+                    });
+}
+
+/*
+ * Bind the all-pairs and many-to-many forms of a distance between trees
+ * given their splits with branch lengths.
+ */
+template <double (*Distance)(const WeightedTreeSplits&,
+                             size_t,
+                             const WeightedTreeSplits&,
+                             size_t)>
+void defWeightedDistance(py::module_& m,
+                         const std::string& name,
+                         const std::string& doc) {
+  m.def(
+      (name + "_all_pairs").c_str(),
+      [](SplitWords splits, Offsets offsets, Lengths lengths,
+         Lengths terminal, int numThreads) {
+        WeightedTreeSplits trees(splits, offsets, lengths, terminal);
+        return allPairs(trees.numTrees, numThreads, [&](size_t i, size_t j) {
+          return Distance(trees, i, trees, j);
+        });
+      },
+      ("Pairwise " + doc).c_str(), py::arg("splits"), py::arg("offsets"),
+      py::arg("lengths"), py::arg("terminal"), py::arg("num_threads") = 0);
+  m.def(
+      (name + "_many_to_many").c_str(),
+      [](SplitWords splitsA, Offsets offsetsA, Lengths lengthsA,
+         Lengths terminalA, SplitWords splitsB, Offsets offsetsB,
+         Lengths lengthsB, Lengths terminalB, int numThreads) {
+        WeightedTreeSplits treesA(splitsA, offsetsA, lengthsA, terminalA);
+        WeightedTreeSplits treesB(splitsB, offsetsB, lengthsB, terminalB);
+        checkSameTaxa(treesA.numTaxa, treesB.numTaxa);
+        return manyToMany(treesA.numTrees, treesB.numTrees, numThreads,
+                          [&](size_t i, size_t j) {
+                            return Distance(treesA, i, treesB, j);
+                          });
+      },
+      (doc + " between two sets of trees").c_str(), py::arg("splits_a"),
+      py::arg("offsets_a"), py::arg("lengths_a"), py::arg("terminal_a"),
+      py::arg("splits_b"), py::arg("offsets_b"), py::arg("lengths_b"),
+      py::arg("terminal_b"), py::arg("num_threads") = 0);
+}
+
+std::vector<int64_t> allResolvedQuartets(const TreeVertices& trees,
+                                         int numThreads) {
+  std::vector<int64_t> resolved(trees.numTrees);
+  py::gil_scoped_release release;
+  parallelFor(trees.numTrees, numThreads,
+              [&](size_t i) { resolved[i] = resolvedQuartets(trees, i); });
+  return resolved;
+}
+
+/*
+ * The quartet distance is half the symmetric difference of the sets of
+ * quartets resolved by the two trees. For binary trees this is the number
+ * of quartets resolved differently.
+ */
+py::array_t<double> quartetAllPairs(SplitWords directions,
+                                    Offsets directionOffsets,
+                                    Offsets vertexOffsets,
+                                    int numThreads) {
+  TreeVertices trees(directions, directionOffsets, vertexOffsets);
+  auto resolved = allResolvedQuartets(trees, numThreads);
+  return allPairs(trees.numTrees, numThreads, [&](size_t i, size_t j) {
+    return (resolved[i] + resolved[j]) / 2.0 -
+           sharedQuartets(trees, i, trees, j);
+  });
+}
+
+py::array_t<double> quartetManyToMany(SplitWords directionsA,
+                                      Offsets directionOffsetsA,
+                                      Offsets vertexOffsetsA,
+                                      SplitWords directionsB,
+                                      Offsets directionOffsetsB,
+                                      Offsets vertexOffsetsB,
+                                      int numThreads) {
+  TreeVertices treesA(directionsA, directionOffsetsA, vertexOffsetsA);
+  TreeVertices treesB(directionsB, directionOffsetsB, vertexOffsetsB);
+  checkSameTaxa(treesA.numWords, treesB.numWords);
+  auto resolvedA = allResolvedQuartets(treesA, numThreads);
+  auto resolvedB = allResolvedQuartets(treesB, numThreads);
+  return manyToMany(treesA.numTrees, treesB.numTrees, numThreads,
+                    [&](size_t i, size_t j) {
+                      return (resolvedA[i] + resolvedB[j]) / 2.0 -
+                             sharedQuartets(treesA, i, treesB, j);
+                    });
+}
+
+py::array_t<double> matchingSplitAllPairs(SplitWords splits,
+                                          Offsets offsets,
+                                          int64_t numTaxa,
+                                          int numThreads) {
+  TreeSplits trees(splits, offsets);
+  return allPairs(trees.numTrees, numThreads, [&](size_t i, size_t j) {
+    return matchingSplitDistance(trees, i, trees, j, numTaxa);
+  });
+}
+
+py::array_t<double> matchingSplitManyToMany(SplitWords splitsA,
+                                            Offsets offsetsA,
+                                            int64_t numTaxaA,
+                                            SplitWords splitsB,
+                                            Offsets offsetsB,
+                                            int64_t numTaxaB,
+                                            int numThreads) {
+  TreeSplits treesA(splitsA, offsetsA);
+  TreeSplits treesB(splitsB, offsetsB);
+  checkSameTaxa(numTaxaA, numTaxaB);
+  checkSameTaxa(treesA.numWords, treesB.numWords);
+  return manyToMany(treesA.numTrees, treesB.numTrees, numThreads,
+                    [&](size_t i, size_t j) {
+                      return matchingSplitDistance(treesA, i, treesB, j,
+                                                   numTaxaA);
+                    });
+}
+
 int mine() {
   return 42;
 }
@@ -176,26 +380,69 @@ PYBIND11_MODULE(_piqtree, m) {
   m.attr("__iqtree_version__") = version();
 
   m.def("iq_robinson_fould", &robinson_fould,
-        "Calculates the robinson fould distance between two trees");
+        "Calculates the robinson fould distance between two trees",
+        LibraryCall());
   m.def("iq_random_tree", &random_tree,
         "Generates a set of random phylogenetic trees. tree_gen_mode "
         "allows:\"YULE_HARDING\", \"UNIFORM\", \"CATERPILLAR\", \"BALANCED\", "
-        "\"BIRTH_DEATH\", \"STAR_TREE\".");
+        "\"BIRTH_DEATH\", \"STAR_TREE\".",
+        LibraryCall());
   m.def("iq_build_tree", &build_tree,
         "Perform phylogenetic analysis on the input alignment (in string "
-        "format). With estimation of the best topology.");
+        "format). With estimation of the best topology.",
+        LibraryCall());
   m.def("iq_fit_tree", &fit_tree,
         "Perform phylogenetic analysis on the input alignment (in string "
-        "format). With restriction to the input toplogy.");
+        "format). With restriction to the input toplogy.",
+        LibraryCall());
   m.def("iq_model_finder", &modelfinder,
-        "Find optimal model for an alignment.");
+        "Find optimal model for an alignment.",
+        LibraryCall());
   m.def("iq_jc_distances", &build_distmatrix,
-        "Construct pairwise distance matrix for alignment.");
+        "Construct pairwise distance matrix for alignment.",
+        LibraryCall());
   m.def("iq_nj_tree", &build_njtree,
-        "Build neighbour-joining tree from distance matrix.");
+        "Build neighbour-joining tree from distance matrix.",
+        LibraryCall());
   m.def("iq_consensus_tree", &consensus_tree,
-        "Compute a consensus tree from a sequence of trees.");
+        "Compute a consensus tree from a sequence of trees.",
+        LibraryCall());
   m.def("iq_simulate_alignment", &simulate_alignment,
-        "Simulate an alignment with AliSim.");
+        "Simulate an alignment with AliSim.",
+        LibraryCall());
+  m.def("rf_all_pairs", &rfAllPairs,
+        "Pairwise Robinson-Foulds distances between trees from their splits.",
+        py::arg("splits"), py::arg("offsets"), py::arg("normalized") = false,
+        py::arg("num_threads") = 0);
+  m.def("rf_many_to_many", &rfManyToMany,
+        "Robinson-Foulds distances between two sets of trees from their "
+        "splits.",
+        py::arg("splits_a"), py::arg("offsets_a"), py::arg("splits_b"),
+        py::arg("offsets_b"), py::arg("normalized") = false,
+        py::arg("num_threads") = 0);
+  defWeightedDistance<weightedRfDistance>(
+      m, "weighted_rf", "weighted Robinson-Foulds distances");
+  defWeightedDistance<kfDistance>(m, "kf",
+                                  "Kuhner-Felsenstein branch score distances");
+  m.def("quartet_all_pairs", &quartetAllPairs,
+        "Pairwise quartet distances between trees from their vertices.",
+        py::arg("directions"), py::arg("direction_offsets"),
+        py::arg("vertex_offsets"), py::arg("num_threads") = 0);
+  m.def("quartet_many_to_many", &quartetManyToMany,
+        "Quartet distances between two sets of trees from their vertices.",
+        py::arg("directions_a"), py::arg("direction_offsets_a"),
+        py::arg("vertex_offsets_a"), py::arg("directions_b"),
+        py::arg("direction_offsets_b"), py::arg("vertex_offsets_b"),
+        py::arg("num_threads") = 0);
+  m.def("matching_split_all_pairs", &matchingSplitAllPairs,
+        "Pairwise matching split distances between trees from their splits.",
+        py::arg("splits"), py::arg("offsets"), py::arg("num_taxa"),
+        py::arg("num_threads") = 0);
+  m.def("matching_split_many_to_many", &matchingSplitManyToMany,
+        "Matching split distances between two sets of trees from their "
+        "splits.",
+        py::arg("splits_a"), py::arg("offsets_a"), py::arg("num_taxa_a"),
+        py::arg("splits_b"), py::arg("offsets_b"), py::arg("num_taxa_b"),
+        py::arg("num_threads") = 0);
   m.def("mine", &mine, "The meaning of life, the universe (and everything)!");
 }
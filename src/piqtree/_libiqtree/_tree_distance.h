@@ -0,0 +1,573 @@
+#ifndef _TREE_DISTANCE_H
+#define _TREE_DISTANCE_H
+
+/*
+ * Distances between phylogenetic trees, computed from the splits of the
+ * trees stored as bitsets over a fixed ordering of the taxa.
+ *
+ * The splits of a set of trees are packed as consecutive runs of rows of
+ * little-endian 64-bit words in one array, with the offsets of each tree's
+ * run in a second array. Each split is canonicalised to the side not
+ * containing the first taxon, and each run is sorted.
+ */
+
+#include <pybind11/numpy.h>
+#include <pybind11/pybind11.h>
+#include <algorithm>
+#include <atomic>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <limits>
+#include <string>
+#include <thread>
+#include <vector>
+
+#ifdef _MSC_VER
+#include <intrin.h>
+#endif
+
+namespace py = pybind11;
+
+using SplitWords =
+    py::array_t<uint64_t, py::array::c_style | py::array::forcecast>;
+using Offsets = py::array_t<int64_t, py::array::c_style | py::array::forcecast>;
+using Lengths = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+/*
+ * Run body(i) for i in [0, n) over numThreads threads (all hardware threads
+ * if numThreads <= 0). Threads take chunks of chunkSize indices at a time.
+ */
+template <typename Body>
+void parallelFor(size_t n, int numThreads, Body body, size_t chunkSize = 1) {
+  size_t threads = numThreads > 0
+                       ? numThreads
+                       : std::max(1u, std::thread::hardware_concurrency());
+  threads =
+      std::min(threads, std::max<size_t>((n + chunkSize - 1) / chunkSize, 1));
+
+  if (threads == 1) {
+    for (size_t i = 0; i < n; ++i)
+      body(i);
+    return;
+  }
+
+  std::atomic<size_t> next(0);
+  auto work = [&]() {
+    for (size_t start = next.fetch_add(chunkSize); start < n;
+         start = next.fetch_add(chunkSize)) {
+      size_t end = std::min(start + chunkSize, n);
+      for (size_t i = start; i < end; ++i)
+        body(i);
+    }
+  };
+
+  std::vector<std::thread> workers;
+  workers.reserve(threads);
+  for (size_t t = 0; t < threads; ++t)
+    workers.emplace_back(work);
+  for (auto& worker : workers)
+    worker.join();
+}
+
+/*
+ * Pairwise distances between the trees of one set, with the GIL released.
+ * distance(i, j) is only called for j < i.
+ */
+template <typename Distance>
+py::array_t<double> allPairs(size_t numTrees,
+                             int numThreads,
+                             Distance distance) {
+  py::array_t<double> result({numTrees, numTrees});
+  double* out = result.mutable_data();
+  std::fill(out, out + numTrees * numTrees, 0.0);
+
+  {
+    py::gil_scoped_release release;
+    parallelFor(numTrees, numThreads, [&](size_t i) {
+      for (size_t j = 0; j < i; ++j) {
+        double d = distance(i, j);
+        out[i * numTrees + j] = d;
+        out[j * numTrees + i] = d;
+      }
+    });
+  }
+
+  return result;
+}
+
+/*
+ * Distances between every tree of one set and every tree of another, with
+ * the GIL released. Parallelised over the flattened matrix so one-vs-many
+ * comparisons are also split between threads.
+ */
+template <typename Distance>
+py::array_t<double> manyToMany(size_t rows,
+                               size_t cols,
+                               int numThreads,
+                               Distance distance) {
+  py::array_t<double> result({rows, cols});
+  double* out = result.mutable_data();
+
+  {
+    py::gil_scoped_release release;
+    parallelFor(
+        rows * cols, numThreads,
+        [&](size_t k) { out[k] = distance(k / cols, k % cols); }, 16);
+  }
+
+  return result;
+}
+
+inline int popcount64(uint64_t x) {
+#ifdef _MSC_VER
+  return static_cast<int>(__popcnt64(x));
+#else
+  return __builtin_popcountll(x);
+#endif
+}
+
+inline int64_t countBits(const uint64_t* a, size_t numWords) {
+  int64_t count = 0;
+  for (size_t k = 0; k < numWords; ++k)
+    count += popcount64(a[k]);
+  return count;
+}
+
+inline int64_t countShared(const uint64_t* a,
+                           const uint64_t* b,
+                           size_t numWords) {
+  int64_t count = 0;
+  for (size_t k = 0; k < numWords; ++k)
+    count += popcount64(a[k] & b[k]);
+  return count;
+}
+
+/*
+ * Compare two splits stored as little-endian 64-bit words.
+ */
+inline int compareSplits(const uint64_t* a,
+                         const uint64_t* b,
+                         size_t numWords) {
+  for (size_t k = numWords; k-- > 0;) {
+    if (a[k] != b[k])
+      return a[k] < b[k] ? -1 : 1;
+  }
+  return 0;
+}
+
+/*
+ * Visit the union of two sorted runs of splits, calling
+ * visit(indexA, indexB) with -1 for the index of a split missing from
+ * one of the runs.
+ */
+template <typename Visit>
+void mergeSplits(const uint64_t* a,
+                 size_t lenA,
+                 const uint64_t* b,
+                 size_t lenB,
+                 size_t numWords,
+                 Visit visit) {
+  size_t i = 0, j = 0;
+  while (i < lenA && j < lenB) {
+    int cmp = compareSplits(a + i * numWords, b + j * numWords, numWords);
+    if (cmp == 0) {
+      visit(i++, j++);
+    } else if (cmp < 0) {
+      visit(i++, -1);
+    } else {
+      visit(-1, j++);
+    }
+  }
+  for (; i < lenA; ++i)
+    visit(i, -1);
+  for (; j < lenB; ++j)
+    visit(-1, j);
+}
+
+inline const int64_t* checkOffsets(const Offsets& offsets,
+                                   py::ssize_t total,
+                                   const char* name) {
+  if (offsets.ndim() != 1 || offsets.size() == 0)
+    throw py::value_error(std::string("Expected 1D ") + name + " offsets.");
+
+  const int64_t* offs = offsets.data();
+  for (py::ssize_t i = 1; i < offsets.size(); ++i) {
+    if (offs[i] < offs[i - 1])
+      throw py::value_error(std::string(name) +
+                            " offsets must be non-decreasing.");
+  }
+  if (offs[0] != 0 || offs[offsets.size() - 1] != total)
+    throw py::value_error(std::string(name) +
+                          " offsets do not match the number of " + name +
+                          ".");
+  return offs;
+}
+
+inline void checkSameTaxa(size_t sizeA, size_t sizeB) {
+  if (sizeA != sizeB)
+    throw py::value_error("Both sets of trees must be over the same taxa.");
+}
+
+/*
+ * A read-only view of the sorted splits of a set of trees.
+ */
+struct TreeSplits {
+  const uint64_t* words;
+  const int64_t* offsets;
+  size_t numTrees;
+  size_t numWords;
+
+  TreeSplits(const SplitWords& splits, const Offsets& offsets) {
+    if (splits.ndim() != 2)
+      throw py::value_error("Expected 2D split words.");
+
+    this->words = splits.data();
+    this->offsets = checkOffsets(offsets, splits.shape(0), "splits");
+    this->numTrees = offsets.size() - 1;
+    this->numWords = splits.shape(1);
+  }
+
+  const uint64_t* tree(size_t i) const { return words + offsets[i] * numWords; }
+
+  size_t size(size_t i) const { return offsets[i + 1] - offsets[i]; }
+};
+
+/*
+ * The sorted splits of a set of trees with the length of the branch of
+ * each split, and the lengths of the terminal branches of each tree.
+ */
+struct WeightedTreeSplits : TreeSplits {
+  const double* lengths;
+  const double* terminal;
+  size_t numTaxa;
+
+  WeightedTreeSplits(const SplitWords& splits,
+                     const Offsets& offsets,
+                     const Lengths& lengths,
+                     const Lengths& terminal)
+      : TreeSplits(splits, offsets) {
+    if (lengths.ndim() != 1 || lengths.shape(0) != splits.shape(0))
+      throw py::value_error("Expected a branch length for each split.");
+    if (terminal.ndim() != 2 ||
+        static_cast<size_t>(terminal.shape(0)) != numTrees)
+      throw py::value_error(
+          "Expected a row of terminal branch lengths for each tree.");
+
+    this->lengths = lengths.data();
+    this->terminal = terminal.data();
+    this->numTaxa = terminal.shape(1);
+  }
+
+  const double* treeLengths(size_t i) const { return lengths + offsets[i]; }
+
+  const double* treeTerminal(size_t i) const {
+    return terminal + i * numTaxa;
+  }
+};
+
+/*
+ * For each internal vertex of each tree, the taxa in each direction away
+ * from the vertex. Directions are rows of words, with the offsets of each
+ * vertex's directions and the offsets of each tree's vertices.
+ */
+struct TreeVertices {
+  const uint64_t* words;
+  const int64_t* directionOffsets;
+  const int64_t* vertexOffsets;
+  size_t numTrees;
+  size_t numWords;
+
+  TreeVertices(const SplitWords& directions,
+               const Offsets& directionOffsets,
+               const Offsets& vertexOffsets) {
+    if (directions.ndim() != 2)
+      throw py::value_error("Expected 2D direction words.");
+
+    this->words = directions.data();
+    this->directionOffsets = checkOffsets(
+        directionOffsets, directions.shape(0), "directions");
+    this->vertexOffsets = checkOffsets(
+        vertexOffsets, directionOffsets.size() - 1, "vertices");
+    this->numTrees = vertexOffsets.size() - 1;
+    this->numWords = directions.shape(1);
+  }
+};
+
+/*
+ * The Robinson-Foulds distance between tree i of a and tree j of b,
+ * optionally normalised by the total number of splits of both trees.
+ */
+inline double rfDistance(const TreeSplits& a,
+                         size_t i,
+                         const TreeSplits& b,
+                         size_t j,
+                         bool normalized) {
+  size_t lenI = a.size(i);
+  size_t lenJ = b.size(j);
+  size_t shared = 0;
+  mergeSplits(a.tree(i), lenI, b.tree(j), lenJ, a.numWords,
+              [&](ptrdiff_t x, ptrdiff_t y) { shared += x >= 0 && y >= 0; });
+
+  double rf = static_cast<double>(lenI + lenJ - 2 * shared);
+  if (normalized)
+    return lenI + lenJ > 0 ? rf / (lenI + lenJ) : 0.0;
+  return rf;
+}
+
+/*
+ * Sum f(difference) over the differences in branch length between tree i
+ * of a and tree j of b, where a branch missing from one tree has length 0.
+ */
+template <typename F>
+double sumBranchDifferences(const WeightedTreeSplits& a,
+                            size_t i,
+                            const WeightedTreeSplits& b,
+                            size_t j,
+                            F f) {
+  const double* lengthsI = a.treeLengths(i);
+  const double* lengthsJ = b.treeLengths(j);
+
+  double total = 0.0;
+  mergeSplits(a.tree(i), a.size(i), b.tree(j), b.size(j), a.numWords,
+              [&](ptrdiff_t x, ptrdiff_t y) {
+                double lengthX = x >= 0 ? lengthsI[x] : 0.0;
+                double lengthY = y >= 0 ? lengthsJ[y] : 0.0;
+                total += f(lengthX - lengthY);
+              });
+
+  const double* terminalI = a.treeTerminal(i);
+  const double* terminalJ = b.treeTerminal(j);
+  for (size_t k = 0; k < a.numTaxa; ++k)
+    total += f(terminalI[k] - terminalJ[k]);
+
+  return total;
+}
+
+inline double weightedRfDistance(const WeightedTreeSplits& a,
+                                 size_t i,
+                                 const WeightedTreeSplits& b,
+                                 size_t j) {
+  return sumBranchDifferences(a, i, b, j,
+                              [](double d) { return std::abs(d); });
+}
+
+inline double kfDistance(const WeightedTreeSplits& a,
+                         size_t i,
+                         const WeightedTreeSplits& b,
+                         size_t j) {
+  return std::sqrt(
+      sumBranchDifferences(a, i, b, j, [](double d) { return d * d; }));
+}
+
+inline int64_t choose2(int64_t n) {
+  return n * (n - 1) / 2;
+}
+
+/*
+ * The number of quartets ab|cd resolved by a tree. Every resolved quartet
+ * has a unique vertex where a and b are in different directions and c and
+ * d are together in a third, and is counted at the vertex of ab and of cd.
+ */
+inline int64_t resolvedQuartets(const TreeVertices& t, size_t i) {
+  int64_t twice = 0;
+  std::vector<int64_t> sizes;
+  for (int64_t v = t.vertexOffsets[i]; v < t.vertexOffsets[i + 1]; ++v) {
+    sizes.clear();
+    int64_t total = 0, totalSquares = 0;
+    for (int64_t d = t.directionOffsets[v]; d < t.directionOffsets[v + 1];
+         ++d) {
+      int64_t size = countBits(t.words + d * t.numWords, t.numWords);
+      sizes.push_back(size);
+      total += size;
+      totalSquares += size * size;
+    }
+    for (int64_t size : sizes) {
+      int64_t rest = total - size;
+      int64_t restSquares = totalSquares - size * size;
+      twice += choose2(size) * ((rest * rest - restSquares) / 2);
+    }
+  }
+  return twice / 2;
+}
+
+/*
+ * The number of quartets resolved the same way by tree i of a and tree j
+ * of b. For each pair of vertices, M[x][y] counts the taxa in direction x
+ * of the first and direction y of the second. A shared quartet ab|cd has
+ * c and d in a common cell (l, z), and a and b in cells from different
+ * rows and columns to each other and to (l, z).
+ */
+inline int64_t sharedQuartets(const TreeVertices& a,
+                              size_t i,
+                              const TreeVertices& b,
+                              size_t j) {
+  size_t numWords = a.numWords;
+  int64_t twice = 0;
+  std::vector<int64_t> m, rowSums, rowSquares, colSums, colSquares;
+
+  for (int64_t u = a.vertexOffsets[i]; u < a.vertexOffsets[i + 1]; ++u) {
+    int64_t firstA = a.directionOffsets[u];
+    size_t degA = a.directionOffsets[u + 1] - firstA;
+
+    for (int64_t v = b.vertexOffsets[j]; v < b.vertexOffsets[j + 1]; ++v) {
+      int64_t firstB = b.directionOffsets[v];
+      size_t degB = b.directionOffsets[v + 1] - firstB;
+
+      m.assign(degA * degB, 0);
+      for (size_t x = 0; x < degA; ++x)
+        for (size_t y = 0; y < degB; ++y)
+          m[x * degB + y] = countShared(a.words + (firstA + x) * numWords,
+                                        b.words + (firstB + y) * numWords,
+                                        numWords);
+
+      rowSums.assign(degA, 0);
+      rowSquares.assign(degA, 0);
+      colSums.assign(degB, 0);
+      colSquares.assign(degB, 0);
+      int64_t total = 0, cellSquares = 0;
+      for (size_t x = 0; x < degA; ++x) {
+        for (size_t y = 0; y < degB; ++y) {
+          int64_t cell = m[x * degB + y];
+          rowSums[x] += cell;
+          colSums[y] += cell;
+          rowSquares[x] += cell * cell;
+          colSquares[y] += cell * cell;
+          total += cell;
+          cellSquares += cell * cell;
+        }
+      }
+
+      for (size_t l = 0; l < degA; ++l) {
+        for (size_t z = 0; z < degB; ++z) {
+          int64_t lz = m[l * degB + z];
+          int64_t pairs = choose2(lz);
+          if (pairs == 0)
+            continue;
+
+          // Count ordered pairs of cells outside row l and column z that
+          // share neither a row nor a column
+          int64_t outside = total - rowSums[l] - colSums[z] + lz;
+          int64_t ordered = outside * outside + cellSquares - rowSquares[l] -
+                            colSquares[z] + lz * lz;
+          for (size_t x = 0; x < degA; ++x) {
+            if (x != l) {
+              int64_t rowSum = rowSums[x] - m[x * degB + z];
+              ordered -= rowSum * rowSum;
+            }
+          }
+          for (size_t y = 0; y < degB; ++y) {
+            if (y != z) {
+              int64_t colSum = colSums[y] - m[l * degB + y];
+              ordered -= colSum * colSum;
+            }
+          }
+
+          twice += pairs * (ordered / 2);
+        }
+      }
+    }
+  }
+  return twice / 2;
+}
+
+/*
+ * The minimum cost of a perfect matching in a square cost matrix, by the
+ * Hungarian algorithm in O(n^3).
+ */
+inline int64_t minCostMatching(const std::vector<int64_t>& cost, size_t n) {
+  const int64_t inf = std::numeric_limits<int64_t>::max() / 4;
+  std::vector<int64_t> u(n + 1, 0), v(n + 1, 0), minv(n + 1);
+  std::vector<size_t> p(n + 1, 0), way(n + 1, 0);
+  std::vector<char> used(n + 1);
+
+  for (size_t i = 1; i <= n; ++i) {
+    p[0] = i;
+    size_t j0 = 0;
+    std::fill(minv.begin(), minv.end(), inf);
+    std::fill(used.begin(), used.end(), false);
+    do {
+      used[j0] = true;
+      size_t i0 = p[j0], j1 = 0;
+      int64_t delta = inf;
+      for (size_t j = 1; j <= n; ++j) {
+        if (used[j])
+          continue;
+        int64_t cur = cost[(i0 - 1) * n + (j - 1)] - u[i0] - v[j];
+        if (cur < minv[j]) {
+          minv[j] = cur;
+          way[j] = j0;
+        }
+        if (minv[j] < delta) {
+          delta = minv[j];
+          j1 = j;
+        }
+      }
+      for (size_t j = 0; j <= n; ++j) {
+        if (used[j]) {
+          u[p[j]] += delta;
+          v[j] -= delta;
+        } else {
+          minv[j] -= delta;
+        }
+      }
+      j0 = j1;
+    } while (p[j0] != 0);
+    do {
+      size_t j1 = way[j0];
+      p[j0] = p[j1];
+      j0 = j1;
+    } while (j0 != 0);
+  }
+
+  int64_t total = 0;
+  for (size_t j = 1; j <= n; ++j)
+    total += cost[(p[j] - 1) * n + (j - 1)];
+  return total;
+}
+
+/*
+ * The matching split distance between tree i of a and tree j of b: the
+ * minimum total number of taxa to move to turn the splits of one tree into
+ * those of the other, pairing splits one to one. If one tree has fewer
+ * splits, the extra splits of the other are matched to the trivial split.
+ */
+inline double matchingSplitDistance(const TreeSplits& a,
+                                    size_t i,
+                                    const TreeSplits& b,
+                                    size_t j,
+                                    int64_t numTaxa) {
+  size_t numWords = a.numWords;
+  size_t lenI = a.size(i);
+  size_t lenJ = b.size(j);
+  size_t n = std::max(lenI, lenJ);
+  if (n == 0)
+    return 0.0;
+
+  std::vector<int64_t> sizesI(lenI), sizesJ(lenJ);
+  for (size_t x = 0; x < lenI; ++x)
+    sizesI[x] = countBits(a.tree(i) + x * numWords, numWords);
+  for (size_t y = 0; y < lenJ; ++y)
+    sizesJ[y] = countBits(b.tree(j) + y * numWords, numWords);
+
+  std::vector<int64_t> cost(n * n);
+  for (size_t x = 0; x < n; ++x) {
+    for (size_t y = 0; y < n; ++y) {
+      int64_t c;
+      if (x >= lenI || y >= lenJ) {
+        int64_t size = x < lenI ? sizesI[x] : sizesJ[y];
+        c = std::min(size, numTaxa - size);
+      } else {
+        int64_t shared = countShared(a.tree(i) + x * numWords,
+                                     b.tree(j) + y * numWords, numWords);
+        int64_t same = numTaxa - sizesI[x] - sizesJ[y] + 2 * shared;
+        c = std::min(same, numTaxa - same);
+      }
+      cost[x * n + y] = c;
+    }
+  }
+
+  return static_cast<double>(minCostMatching(cost, n));
+}
+
+#endif /* _TREE_DISTANCE_H */
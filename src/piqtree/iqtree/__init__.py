@@ -1,23 +1,55 @@
 """Functions for calling IQ-TREE as a library."""
 
-from ._alignment import simulate_alignment
+from ._alignment import (
+    SimulatedAlignmentFile,
+    simulate_alignment,
+    simulate_alignment_to_file,
+    simulate_alignments,
+)
+from ._alignment_handle import AlignmentHandle
+from ._consensus import streaming_consensus_tree
+from ._distance_matrix import CondensedDistanceMatrix
 from ._jc_distance import jc_distances
 from ._model_finder import ModelFinderResult, ModelResultValue, model_finder
-from ._random_tree import TreeGenMode, random_tree
-from ._robinson_foulds import robinson_foulds
-from ._tree import build_tree, consensus_tree, fit_tree, nj_tree
+from ._model_finder_cache import ModelFinderCache
+from ._parallel_model_finder import parallel_model_finder
+from ._progress import ProgressEvent
+from ._random_tree import TreeGenMode, random_tree, random_trees
+from ._tree import build_tree, consensus_tree, fit_tree, fit_trees, nj_tree
+from ._tree_distance import (
+    kuhner_felsenstein,
+    matching_split_distance,
+    quartet_distance,
+    robinson_foulds,
+    weighted_robinson_foulds,
+)
 
 __all__ = [
+    "AlignmentHandle",
+    "CondensedDistanceMatrix",
+    "ModelFinderCache",
     "ModelFinderResult",
     "ModelResultValue",
+    "ProgressEvent",
+    "SimulatedAlignmentFile",
     "TreeGenMode",
     "build_tree",
     "consensus_tree",
     "fit_tree",
+    "fit_trees",
     "jc_distances",
+    "kuhner_felsenstein",
+    "matching_split_distance",
     "model_finder",
     "nj_tree",
+    "parallel_model_finder",
+    "quartet_distance",
     "random_tree",
+    "random_trees",
     "robinson_foulds",
     "simulate_alignment",
+    "simulate_alignment_to_file",
+    "simulate_alignments",
+    "streaming_consensus_tree",
+    "weighted_robinson_foulds",
 ]
@@ -1,16 +1,24 @@
-from typing import cast
+import dataclasses
+import functools
+import gzip
+import os
+import pathlib
+from collections.abc import Iterator
+from typing import TextIO, cast
 
-import yaml
+import numpy as np
 from _piqtree import iq_simulate_alignment
-from cogent3 import make_aligned_seqs
+from cogent3 import get_moltype, make_aligned_seqs
 from cogent3.core.alignment import Alignment
+from cogent3.core.moltype import MolType
 from cogent3.core.tree import PhyloNode
 
 from piqtree.distribution import IndelDistribution
 from piqtree.exceptions import ParseIqTreeError
+from piqtree.iqtree._decode import load_yaml
 from piqtree.iqtree._decorator import iqtree_func
 from piqtree.model import LieModel, Model, make_model
-from piqtree.util import get_newick, make_rand_seed
+from piqtree.util import derive_rand_seeds, get_newick, make_rand_seed
 
 iq_simulate_alignment = iqtree_func(iq_simulate_alignment, hide_files=True)
 
@@ -80,6 +88,264 @@ def simulate_alignment(
     if num_threads is None:
         num_threads = 1
 
+    model = _validate_model(model)
+
+    return _simulate(
+        get_newick(tree),
+        model,
+        rand_seed,
+        length,
+        insertion_rate,
+        deletion_rate,
+        str(insertion_size_distribution),
+        str(deletion_size_distribution),
+        root_seq,
+        num_threads,
+    )
+
+
+def simulate_alignments(
+    tree: PhyloNode,
+    model: Model | str,
+    num_replicates: int,
+    length: int = 1000,
+    rand_seed: int | None = None,
+    insertion_rate: float = 0.0,
+    deletion_rate: float = 0.0,
+    insertion_size_distribution: IndelDistribution | str = "POW{1.7/100}",
+    deletion_size_distribution: IndelDistribution | str = "POW{1.7/100}",
+    root_seq: str | None = None,
+    num_threads: int | None = None,
+) -> Iterator[Alignment]:
+    """Uses AliSim to simulate replicate Alignments through IQ-TREE.
+
+    The tree and model are processed once for all replicates, and each
+    replicate is simulated with its own seed derived from rand_seed.
+
+    Parameters
+    ----------
+    tree: list[cogent3.PhyloNode]
+        A tree to simulate the alignments over.
+    model: str
+        The substitution model's specification.
+    num_replicates: int
+        The number of alignments to simulate.
+    length: int
+        The length of each alignment (by default 1000).
+        Alignments may be longer when indel model is used due to insertion events.
+    rand_seed : int | None, optional
+        The random seed the replicate seeds are derived from - None means
+        no seed is used, by default None.
+    insertion_rate: float | None, optional
+        The insertion rate relative to substitution rate (by default 0.0).
+    deletion_rate: float | None, optional
+        The deletion rate relative to substitution rate (by default 0.0).
+    insertion_size_distribution: str | None, optional
+        The insertion size distribution (by default the Zipfian
+        distribution with a=1.7 and maximum size 100).
+    deletion_size_distribution: str | None, optional
+        The deletion size distribution (by default the Zipfian
+        distribution with a=1.7 and maximum size 100).
+    root_seq: str | None, optional
+        The root sequence (by default None).
+    num_threads: int | None, optional
+        Number of threads for IQ-TREE to use for each replicate, by default
+        None (single-threaded). The replicates are simulated one at a time,
+        as IQ-TREE does not support concurrent calls within a process.
+
+    Returns
+    -------
+    Iterator[c3_types.AlignedSeqsType]
+        The simulated alignments, in replicate order.
+
+    """
+    if num_replicates < 0:
+        msg = f"num_replicates must be non-negative, got {num_replicates}"
+        raise ValueError(msg)
+
+    if rand_seed is None:
+        rand_seed = make_rand_seed()
+
+    if root_seq is None:
+        root_seq = ""
+
+    if num_threads is None:
+        num_threads = 1
+
+    model = _validate_model(model)
+
+    simulate = functools.partial(
+        _simulate,
+        get_newick(tree),
+        model,
+        length=length,
+        insertion_rate=insertion_rate,
+        deletion_rate=deletion_rate,
+        insertion_size_distribution=str(insertion_size_distribution),
+        deletion_size_distribution=str(deletion_size_distribution),
+        root_seq=root_seq,
+        num_threads=num_threads,
+    )
+    seeds = derive_rand_seeds(rand_seed, num_replicates)
+
+    return (simulate(seed) for seed in seeds)
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class SimulatedAlignmentFile:
+    """An alignment simulated with AliSim and written to disk.
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        Path of the written alignment.
+    format : str
+        Format of the written alignment, "fasta" or "phylip".
+    num_seqs : int
+        Number of sequences in the alignment.
+    length : int
+        Length of the alignment.
+    rand_seed : int
+        The random seed used for the simulation.
+
+    """
+
+    path: pathlib.Path
+    format: str
+    num_seqs: int
+    length: int
+    rand_seed: int
+
+
+SIMULATION_FILE_FORMATS = ("fasta", "phylip")
+
+
+def simulate_alignment_to_file(
+    path: str | os.PathLike[str],
+    tree: PhyloNode,
+    model: Model | str,
+    length: int = 1000,
+    rand_seed: int | None = None,
+    insertion_rate: float = 0.0,
+    deletion_rate: float = 0.0,
+    insertion_size_distribution: IndelDistribution | str = "POW{1.7/100}",
+    deletion_size_distribution: IndelDistribution | str = "POW{1.7/100}",
+    root_seq: str | None = None,
+    num_threads: int | None = None,
+    file_format: str = "fasta",
+) -> SimulatedAlignmentFile:
+    """Uses AliSim to simulate an Alignment and writes it to a file.
+
+    The alignment is written record by record without constructing
+    a cogent3 Alignment. Paths ending with ".gz" are gzip compressed.
+
+    Parameters
+    ----------
+    path: str | os.PathLike[str]
+        The file to write the alignment to. A relative path is resolved
+        against the working directory at the time of the call.
+    tree: list[cogent3.PhyloNode]
+        A tree to simulate an alignment over.
+    model: str
+        The substitution model's specification.
+    length: int
+        The length of the alignment (by default 1000).
+        Alignment may be longer when indel model is used due to insertion events.
+    rand_seed : int | None, optional
+        The random seed - None means no seed is used, by default None.
+    insertion_rate: float | None, optional
+        The insertion rate relative to substitution rate (by default 0.0).
+    deletion_rate: float | None, optional
+        The deletion rate relative to substitution rate (by default 0.0).
+    insertion_size_distribution: str | None, optional
+        The insertion size distribution (by default the Zipfian
+        distribution with a=1.7 and maximum size 100).
+    deletion_size_distribution: str | None, optional
+        The deletion size distribution (by default the Zipfian
+        distribution with a=1.7 and maximum size 100).
+    root_seq: str | None, optional
+        The root sequence (by default None).
+    num_threads: int | None, optional
+        Number of threads for IQ-TREE to use, by default None (single-threaded).
+    file_format: str, optional
+        The format to write, "fasta" (default) or "phylip".
+
+    Returns
+    -------
+    SimulatedAlignmentFile
+        The path of the written alignment and its dimensions.
+
+    """
+    path = pathlib.Path(path).resolve()
+
+    if file_format not in SIMULATION_FILE_FORMATS:
+        allowed = ", ".join(SIMULATION_FILE_FORMATS)
+        msg = f"file_format must be one of {allowed}, got {file_format!r}"
+        raise ValueError(msg)
+
+    if rand_seed is None:
+        rand_seed = make_rand_seed()
+
+    if root_seq is None:
+        root_seq = ""
+
+    if num_threads is None:
+        num_threads = 1
+
+    model = _validate_model(model)
+
+    fasta = _simulate_fasta(
+        get_newick(tree),
+        model,
+        rand_seed,
+        length,
+        insertion_rate,
+        deletion_rate,
+        str(insertion_size_distribution),
+        str(deletion_size_distribution),
+        root_seq,
+        num_threads,
+    )
+
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "wt") as out:
+        if file_format == "fasta":
+            num_seqs, aln_length = _write_fasta(out, fasta)
+        else:
+            num_seqs, aln_length = _write_phylip(out, fasta)
+
+    return SimulatedAlignmentFile(
+        path=path,
+        format=file_format,
+        num_seqs=num_seqs,
+        length=aln_length,
+        rand_seed=rand_seed,
+    )
+
+
+def _write_fasta(out: TextIO, fasta: str) -> tuple[int, int]:
+    num_seqs = 0
+    aln_length = 0
+    for name, seq in _iter_fasta_records(fasta):
+        out.write(f">{name}\n{seq}\n")
+        num_seqs += 1
+        aln_length = len(seq)
+    return num_seqs, aln_length
+
+
+def _write_phylip(out: TextIO, fasta: str) -> tuple[int, int]:
+    records = _iter_fasta_records(fasta)
+    num_seqs = fasta.count("\n>") + 1
+
+    name, seq = next(records)
+    out.write(f"{num_seqs} {len(seq)}\n")
+    out.write(f"{name}  {seq}\n")
+    for name, seq in records:
+        out.write(f"{name}  {seq}\n")
+    return num_seqs, len(seq)
+
+
+def _validate_model(model: Model | str) -> Model:
     if isinstance(model, str):
         model = make_model(model)
 
@@ -87,9 +353,53 @@ def simulate_alignment(
         msg = f"Lie Model {cast('LieModel', model.submod_type.base_model).value} is unsupported."
         raise ValueError(msg)
 
-    newick_tree = get_newick(tree)
+    return model
+
+
+def _simulate(
+    newick_tree: str,
+    model: Model,
+    rand_seed: int,
+    length: int,
+    insertion_rate: float,
+    deletion_rate: float,
+    insertion_size_distribution: str,
+    deletion_size_distribution: str,
+    root_seq: str,
+    num_threads: int,
+) -> Alignment:
+    fasta = _simulate_fasta(
+        newick_tree,
+        model,
+        rand_seed,
+        length,
+        insertion_rate,
+        deletion_rate,
+        insertion_size_distribution,
+        deletion_size_distribution,
+        root_seq,
+        num_threads,
+    )
 
-    yaml_result = yaml.safe_load(
+    moltype = get_moltype(model.submod_type.get_moltype())
+    seqs = _parse_yaml_alignment(fasta, moltype)
+
+    return make_aligned_seqs(seqs, moltype=moltype)
+
+
+def _simulate_fasta(
+    newick_tree: str,
+    model: Model,
+    rand_seed: int,
+    length: int,
+    insertion_rate: float,
+    deletion_rate: float,
+    insertion_size_distribution: str,
+    deletion_size_distribution: str,
+    root_seq: str,
+    num_threads: int,
+) -> str:
+    yaml_result = load_yaml(
         iq_simulate_alignment(
             newick_tree,
             str(model),
@@ -101,39 +411,64 @@ def simulate_alignment(
             deletion_rate,
             root_seq,
             num_threads,
-            str(insertion_size_distribution),
-            str(deletion_size_distribution),
+            insertion_size_distribution,
+            deletion_size_distribution,
             -1,
         ),
     )
+    return cast("str", yaml_result["alignment"])
 
-    seqs = _parse_yaml_alignment(yaml_result["alignment"])
-
-    return make_aligned_seqs(seqs, moltype=model.submod_type.get_moltype())
-
-
-def _parse_yaml_alignment(yaml_alignment: str) -> dict[str, str]:
-    seqs: dict[str, str] = {}
-    name = None
-    seq_buffer = None
-    for part in yaml_alignment.split("\n"):
-        if part.startswith(">"):
-            if seq_buffer is not None:
-                if name is None:
-                    msg = "Got sequence data without name."  # pragma: no cover
-                    raise ParseIqTreeError(msg)  # pragma: no cover
-                seqs[name] = seq_buffer
-            name = part.strip()[1:]
-            seq_buffer = ""
-        elif seq_buffer is not None:
-            seq_buffer += part.strip()
-        else:
-            msg = f"Unexpected parsed value '{part}'"  # pragma: no cover
-            raise ParseIqTreeError(msg)  # pragma: no cover
-
-    if seq_buffer is not None:
-        if name is None:
-            msg = "Got sequence data without name."  # pragma: no cover
-            raise ParseIqTreeError(msg)  # pragma: no cover
-        seqs[name] = seq_buffer
-    return seqs
+
+def _parse_yaml_alignment(
+    yaml_alignment: str,
+    moltype: MolType[str],
+) -> dict[str, np.ndarray]:
+    """Parse the FASTA formatted alignment returned by AliSim.
+
+    The sequences of all records are encoded into one preallocated
+    array, each record's text being released once it is encoded, so no
+    further full copy of the alignment's text is made.
+
+    Parameters
+    ----------
+    yaml_alignment : str
+        The FASTA formatted alignment.
+    moltype : MolType[str]
+        The moltype of the alignment.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        Sequence names mapped to their encoded sequences.
+
+    """
+    names: list[str] = []
+    seqs: list[str] = []
+    for name, seq in _iter_fasta_records(yaml_alignment):
+        names.append(name)
+        seqs.append(seq)
+
+    alphabet = moltype.most_degen_alphabet()
+    lengths = [len(seq) for seq in seqs]
+    encoded = np.empty(sum(lengths), dtype=alphabet.dtype)
+    start = 0
+    for i, length in enumerate(lengths):
+        encoded[start : start + length] = alphabet.to_indices(seqs[i])
+        seqs[i] = ""
+        start += length
+
+    split_points = np.cumsum(lengths[:-1])
+    return dict(zip(names, np.split(encoded, split_points), strict=True))
+
+
+def _iter_fasta_records(fasta: str) -> Iterator[tuple[str, str]]:
+    """Yield the name and sequence of each record in FASTA text."""
+    if not fasta.startswith(">"):
+        part = fasta.split("\n", 1)[0]
+        msg = f"Unexpected parsed value '{part}'"  # pragma: no cover
+        raise ParseIqTreeError(msg)  # pragma: no cover
+
+    for record in fasta[1:].split("\n>"):
+        name, _, seq = record.partition("\n")
+        # Sequences may be wrapped over multiple lines
+        yield name.strip(), "".join(seq.split())
@@ -0,0 +1,75 @@
+"""Alignments encoded once for repeated calls to the IQ-TREE library."""
+
+from collections.abc import Sequence
+
+import numpy as np
+from cogent3.core.alignment import Alignment
+
+from piqtree.util import get_seq_array
+
+
+class AlignmentHandle:
+    """An alignment encoded once for repeated calls to IQ-TREE.
+
+    Every piqtree function taking an alignment also accepts a handle.
+    The sequences are encoded into one read-only buffer when the handle
+    is created, and IQ-TREE reads that buffer in place on each call, so
+    a workflow such as model_finder then build_tree then fit_tree on the
+    same alignment only encodes it once.
+
+    Parameters
+    ----------
+    aln : Alignment
+        The alignment to encode.
+
+    Attributes
+    ----------
+    names : tuple[str, ...]
+        The names of the sequences, in the order of the rows of seqs.
+    seqs : np.ndarray
+        The read-only (num_seqs, length + 1) uint8 array of the sequence
+        characters, with each row terminated by 0.
+    source : str | None
+        The source of the alignment, from its info.
+
+    """
+
+    __slots__ = ("names", "seqs", "source")
+
+    def __init__(self, aln: Alignment) -> None:
+        self.names: tuple[str, ...] = tuple(aln.names)
+        self.seqs = get_seq_array(aln)
+        self.seqs.flags.writeable = False
+        self.source: str | None = aln.info.source
+
+    @property
+    def num_seqs(self) -> int:
+        """The number of sequences in the alignment."""
+        return len(self.names)
+
+    def __len__(self) -> int:
+        return self.seqs.shape[1] - 1
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(num_seqs={self.num_seqs}, length={len(self)})"
+
+
+def encode_alignment(
+    aln: Alignment | AlignmentHandle,
+) -> tuple[Sequence[str], np.ndarray]:
+    """The names and encoded sequences of an alignment for IQ-TREE.
+
+    Parameters
+    ----------
+    aln : Alignment | AlignmentHandle
+        The alignment, or a handle holding its encoded sequences.
+
+    Returns
+    -------
+    tuple[Sequence[str], np.ndarray]
+        The sequence names, and the sequences as from get_seq_array.
+
+    """
+    if isinstance(aln, AlignmentHandle):
+        return aln.names, aln.seqs
+    return aln.names, get_seq_array(aln)
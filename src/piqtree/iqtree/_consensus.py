@@ -0,0 +1,233 @@
+"""Consensus trees accumulated over a stream of trees."""
+
+import dataclasses
+import gzip
+import math
+import os
+import pathlib
+from collections.abc import Iterable, Iterator
+
+from cogent3 import make_tree
+from cogent3.core.tree import PhyloNode
+
+from piqtree.iqtree._splits import SplitIndex
+from piqtree.iqtree._tree import _SUPPORT_AGGREGATES
+
+
+@dataclasses.dataclass(slots=True)
+class _SplitRecord:
+    """The number of trees with a split, and a summary of their support."""
+
+    count: int = 0
+    num_supports: int = 0
+    total_support: float = 0.0
+    min_support: float = math.inf
+    max_support: float = -math.inf
+
+    def add_support(self, support: float) -> None:
+        self.num_supports += 1
+        self.total_support += support
+        self.min_support = min(self.min_support, support)
+        self.max_support = max(self.max_support, support)
+
+    def aggregate_support(self, support_aggregate: str) -> float | None:
+        if not self.num_supports:
+            return None
+        if support_aggregate == "max":
+            return self.max_support
+        if support_aggregate == "min":
+            return self.min_support
+        return self.total_support / self.num_supports
+
+
+def _iter_newick_lines(path: str | os.PathLike) -> Iterator[str]:
+    path = pathlib.Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt") as newick_file:
+        for line in newick_file:
+            newick = line.strip()
+            if newick:
+                yield newick
+
+
+def _iter_trees(
+    trees: str | os.PathLike | Iterable[str | PhyloNode],
+) -> Iterator[PhyloNode]:
+    if isinstance(trees, str | os.PathLike):
+        trees = _iter_newick_lines(trees)
+    for tree in trees:
+        yield make_tree(tree) if isinstance(tree, str) else tree
+
+
+def _add_tree_splits(
+    index: SplitIndex,
+    tree: PhyloNode,
+    splits: dict[int, _SplitRecord],
+    *,
+    record_support: bool,
+) -> None:
+    # a tree rooted on a branch has that split twice, so only count it once
+    tree_splits = set()
+    try:
+        for node, split in index.node_splits(tree):
+            if not index.is_nontrivial(split):
+                continue
+
+            record = splits.get(split)
+            if record is None:
+                record = splits[split] = _SplitRecord()
+            if split not in tree_splits:
+                tree_splits.add(split)
+                record.count += 1
+
+            support = getattr(node, "support", None)
+            if record_support and support is not None:
+                record.add_support(support)
+    except ValueError:
+        msg = "Trees must be on same taxa set."
+        raise ValueError(msg) from None
+
+
+def _compatible(split1: int, split2: int) -> bool:
+    # both splits exclude the first taxon, so they are compatible if
+    # they are disjoint or nested
+    shared = split1 & split2
+    return not shared or shared in (split1, split2)
+
+
+def _select_splits(
+    splits: dict[int, _SplitRecord],
+    num_trees: int,
+    min_support: float,
+) -> list[int]:
+    candidates = [
+        split
+        for split, record in splits.items()
+        if record.count > min_support * num_trees or record.count == num_trees
+    ]
+    candidates.sort(key=lambda split: splits[split].count, reverse=True)
+
+    # clades in more than half the trees are always compatible
+    if min_support >= 0.5:
+        return candidates
+
+    accepted: list[int] = []
+    for split in candidates:
+        if all(_compatible(split, other) for other in accepted):
+            accepted.append(split)
+    return accepted
+
+
+def _build_consensus(
+    index: SplitIndex,
+    splits: dict[int, _SplitRecord],
+    accepted: list[int],
+    num_trees: int,
+    support_aggregate: str | None,
+) -> PhyloNode:
+    # adding clades from smallest to largest, each taxon maps to the
+    # largest clade containing it so far
+    top = {name: PhyloNode(name) for name in index.taxa}
+    for i, split in enumerate(sorted(accepted, key=int.bit_count)):
+        names = index.split_taxa(split)
+        children = list({id(top[name]): top[name] for name in names}.values())
+
+        record = splits[split]
+        support = None
+        if support_aggregate is not None:
+            support = record.aggregate_support(support_aggregate)
+        if support is None:
+            support = 100 * record.count / num_trees
+
+        node = PhyloNode(
+            f"edge.{i}",
+            children=children,
+            name_loaded=False,
+            support=support,
+        )
+        for name in names:
+            top[name] = node
+
+    children = list({id(node): node for node in top.values()}.values())
+    return PhyloNode("root", children=children, name_loaded=False)
+
+
+def streaming_consensus_tree(
+    trees: str | os.PathLike | Iterable[str | PhyloNode],
+    *,
+    min_support: float = 0.5,
+    support_aggregate: str | None = "mean",
+) -> PhyloNode:
+    """Build a consensus tree from a stream of trees, defaults to majority-rule.
+
+    Unlike consensus_tree, the trees are read one at a time, and only
+    the number of trees containing each split is kept. This allows a
+    consensus of more trees than fit in memory, such as a file of
+    posterior samples.
+
+    The min_support parameter represents the proportion of trees a clade
+    must appear in to be in the resulting consensus tree.
+
+    If min_support is 1.0, computes the strict consensus tree.
+    If min_support is 0.0, computes the extended majority-rule consensus tree.
+
+    Clades are compared as unrooted splits, so a clade at the root of
+    one tree matches its complement in another. Unlike consensus_tree,
+    the root of each input tree is not treated as a clade boundary.
+
+    By default the input trees' own support values are transferred onto
+    matching consensus clades.
+
+    Parameters
+    ----------
+    trees : str | os.PathLike | Iterable[str | PhyloNode]
+        A path to a file with one newick tree per line, which may be
+        gzip compressed, or an iterable of newick strings or trees.
+    min_support : float, optional
+        The minimum support for a clade to appear
+        in the consensus tree, by default 0.5.
+    support_aggregate : str | None, optional
+        How to combine the input trees' support for a shared clade.
+        One of "mean" (default), "max", "min". If None, the consensus'
+        own clade-frequency support is kept and the input support ignored.
+
+    Returns
+    -------
+    PhyloNode
+        The constructed consensus tree.
+
+    Raises
+    ------
+    ValueError
+        If there are no trees, or the trees are not all on the same taxa.
+
+    """
+    if not 0 <= min_support <= 1:
+        msg = f"Only min support values in the range 0 <= value <= 1 are supported, got {min_support}"
+        raise ValueError(msg)
+
+    if support_aggregate is not None and support_aggregate not in _SUPPORT_AGGREGATES:
+        allowed = ", ".join(sorted(_SUPPORT_AGGREGATES))
+        msg = f"support_aggregate must be one of {allowed} or None, got {support_aggregate!r}"
+        raise ValueError(msg)
+
+    index: SplitIndex | None = None
+    splits: dict[int, _SplitRecord] = {}
+    num_trees = 0
+    for tree in _iter_trees(trees):
+        if index is None:
+            index = SplitIndex(sorted(tree.get_tip_names()))
+        _add_tree_splits(
+            index,
+            tree,
+            splits,
+            record_support=support_aggregate is not None,
+        )
+        num_trees += 1
+
+    if index is None:
+        msg = "At least one tree is required to build a consensus tree."
+        raise ValueError(msg)
+
+    accepted = _select_splits(splits, num_trees, min_support)
+    return _build_consensus(index, splits, accepted, num_trees, support_aggregate)
@@ -0,0 +1,30 @@
+"""Decoding of results returned by the IQ-TREE library."""
+
+from typing import Any
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore[assignment]
+
+
+def load_yaml(yaml_str: str) -> Any:  # noqa: ANN401
+    """Parse a YAML result from IQ-TREE.
+
+    Uses libyaml's CSafeLoader when PyYAML was built with it,
+    otherwise falls back to the pure-Python SafeLoader.
+
+    Parameters
+    ----------
+    yaml_str : str
+        The YAML string returned by IQ-TREE.
+
+    Returns
+    -------
+    Any
+        The parsed YAML.
+
+    """
+    return yaml.load(yaml_str, Loader=SafeLoader)
@@ -1,12 +1,16 @@
 """Decorators for IQ-TREE functions."""
 
+import collections
+import contextlib
 import io
 import os
 import pathlib
 import sys
 import tempfile
-from collections.abc import Callable
+import threading
+from collections.abc import Callable, Iterator
 from functools import wraps
+from typing import cast
 
 from piqtree.exceptions import IqTreeError
 
@@ -32,6 +36,216 @@ def _fd_or_fallback(stream: object, fallback_fd: int) -> int:
         return fallback_fd  # pragma: no cover
 
 
+class _SharedProcessState:
+    """Process-wide state shared between concurrent IQ-TREE calls.
+
+    Redirecting stdout/stderr affects the whole process, not just the
+    calling thread. Concurrent calls therefore share a single redirection,
+    set up by the first call to enter and restored by the last call to exit.
+
+    While any listener is registered, the output is sent through a pipe and
+    each line is passed to every listener from a reader thread, rather than
+    being discarded. As the output cannot be told apart by the call which
+    wrote it, listeners are only registered by one thread at a time, once no
+    other thread is in a call, and calls from other threads wait until the
+    last listener is removed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._num_silenced = 0
+        self._fds: tuple[int, int, int, int, int] | None = None
+        self._listeners: list[Callable[[str], None]] = []
+        self._reader: threading.Thread | None = None
+        # the number of calls running in each thread
+        self._calls: collections.Counter[int] = collections.Counter()
+        self._capturing_thread: int | None = None
+
+    def enter(self) -> None:
+        thread = threading.get_ident()
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self._capturing_thread in (None, thread),
+            )
+            if self._num_silenced == 0:
+                self._silence()
+            self._num_silenced += 1
+            self._calls[thread] += 1
+
+    def exit(self) -> None:
+        thread = threading.get_ident()
+        with self._changed:
+            self._calls[thread] -= 1
+            if self._calls[thread] == 0:
+                del self._calls[thread]
+
+            self._num_silenced -= 1
+            if self._num_silenced == 0:
+                self._restore()
+            self._changed.notify_all()
+
+    def add_listener(self, listener: Callable[[str], None]) -> None:
+        thread = threading.get_ident()
+        with self._changed:
+            self._changed.wait_for(
+                lambda: (
+                    self._capturing_thread in (None, thread)
+                    and all(caller == thread for caller in self._calls)
+                ),
+            )
+            self._capturing_thread = thread
+            self._listeners.append(listener)
+            if self._fds is not None and self._reader is None:
+                self._start_capture()
+
+    def remove_listener(self, listener: Callable[[str], None]) -> None:
+        with self._changed:
+            self._listeners.remove(listener)
+            if not self._listeners:
+                if self._reader is not None:
+                    self._stop_capture()
+                self._capturing_thread = None
+                self._changed.notify_all()
+
+    def _silence(self) -> None:
+        # Flush stdout and stderr
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        # Fetch file descriptors
+        out_fd = _fd_or_fallback(sys.stdout, 1)
+        err_fd = _fd_or_fallback(sys.stderr, 2)
+
+        # Save original stdout and stderr file descriptors
+        saved_stdout_fd = os.dup(out_fd)
+        saved_stderr_fd = os.dup(err_fd)
+
+        # Open /dev/null (or NUL on Windows) as destination for stdout and stderr
+        devnull_fd = os.open(os.devnull, os.O_WRONLY)
+
+        # Replace stdout and stderr with /dev/null
+        os.dup2(devnull_fd, out_fd)
+        os.dup2(devnull_fd, err_fd)
+
+        self._fds = (out_fd, err_fd, saved_stdout_fd, saved_stderr_fd, devnull_fd)
+
+        if self._listeners:
+            self._start_capture()
+
+    def _start_capture(self) -> None:
+        out_fd, err_fd, _, _, _ = cast("tuple[int, int, int, int, int]", self._fds)
+        read_fd, write_fd = os.pipe()
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(write_fd, out_fd)
+        os.dup2(write_fd, err_fd)
+        os.close(write_fd)
+
+        self._reader = threading.Thread(
+            target=self._read_output,
+            args=(read_fd,),
+            name="piqtree-output",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _stop_capture(self) -> None:
+        out_fd, err_fd, _, _, devnull_fd = cast(
+            "tuple[int, int, int, int, int]",
+            self._fds,
+        )
+
+        # Closing the last write end of the pipe ends the reader thread
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(devnull_fd, out_fd)
+        os.dup2(devnull_fd, err_fd)
+
+        cast("threading.Thread", self._reader).join()
+        self._reader = None
+
+    def _read_output(self, read_fd: int) -> None:
+        with open(read_fd, "rb") as pipe:
+            for raw_line in pipe:
+                line = raw_line.decode(errors="replace").rstrip()
+                for listener in list(self._listeners):
+                    # a failing listener must not stop the pipe being drained
+                    with contextlib.suppress(Exception):
+                        listener(line)
+
+    def _restore(self) -> None:
+        if self._reader is not None:
+            self._stop_capture()
+
+        out_fd, err_fd, saved_stdout_fd, saved_stderr_fd, devnull_fd = cast(
+            "tuple[int, int, int, int, int]",
+            self._fds,
+        )
+        self._fds = None
+
+        # Flush stdout and stderr
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        # Restore stdout and stderr
+        os.dup2(saved_stdout_fd, out_fd)
+        os.dup2(saved_stderr_fd, err_fd)
+
+        # Close the devnull file descriptor, and duplicated file descriptors
+        os.close(devnull_fd)
+        os.close(saved_stdout_fd)
+        os.close(saved_stderr_fd)
+
+
+_PROCESS_STATE = _SharedProcessState()
+
+# the working directory is shared by the process, so calls hiding their
+# files change it one at a time
+_WORKING_DIR_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def _hide_files() -> Iterator[None]:
+    with (
+        _WORKING_DIR_LOCK,
+        tempfile.TemporaryDirectory(prefix="piqtree_") as tempdir,
+    ):
+        original_dir = pathlib.Path.cwd()
+        os.chdir(tempdir)
+        try:
+            yield
+        finally:
+            os.chdir(original_dir)
+
+
+@contextlib.contextmanager
+def capture_output(listener: Callable[[str], None]) -> Iterator[None]:
+    """Pass each line IQ-TREE writes to stdout or stderr to a listener.
+
+    Output is captured while IQ-TREE functions are called within the
+    context. As stdout and stderr are shared by the process, the output
+    of a call cannot be attributed to the thread which made it. Entering
+    the context therefore waits for the calls of other threads to finish,
+    and calls from other threads wait until the context is exited, so only
+    the output of calls made by this thread is passed to the listener.
+
+    Parameters
+    ----------
+    listener : Callable[[str], None]
+        Called from a reader thread with each line, without its line
+        ending. It should return quickly, as IQ-TREE blocks while the
+        pipe it writes to is full, and must not call IQ-TREE functions.
+
+    """
+    _PROCESS_STATE.add_listener(listener)
+    try:
+        yield
+    finally:
+        _PROCESS_STATE.remove_listener(listener)
+
+
 def iqtree_func[**Param, RetType](
     func: Callable[Param, RetType],
     *,
@@ -39,14 +253,32 @@ def iqtree_func[**Param, RetType](
 ) -> Callable[Param, RetType]:
     """IQ-TREE function wrapper.
 
-    Hides stdout and stderr, as well as any output files.
+    Hides stdout and stderr, as well as any output files, and converts
+    errors from the IQ-TREE library.
+
+    IQ-TREE writes to the stdout and stderr file descriptors of the process,
+    so they are redirected for the whole process, not just the calling
+    thread: while any call is running, output written to them by any thread
+    is discarded. Concurrent calls share the redirection, which is restored
+    once the last of them has finished. While another thread is capturing
+    the output (see capture_output), calls wait until it has finished.
+
+    Functions taking IQ-TREE options keep output files out of the working
+    directory by passing each call an output prefix in its own temporary
+    directory (see piqtree.util.output_dir). Those which cannot be given a
+    prefix hide their files instead, running each call in its own temporary
+    working directory. As the working directory is shared by the process,
+    such calls change it one at a time (the library runs one call at a
+    time in any case), and relative paths used by other threads during a
+    call are resolved in its temporary directory.
 
     Parameters
     ----------
     func : Callable[Param, RetType]
         The IQ-TREE library function.
     hide_files : bool, optional
-        Whether hiding output files is necessary, by default False.
+        Whether the function may write files to the working directory,
+        by default False.
 
     Returns
     -------
@@ -62,51 +294,14 @@ def iqtree_func[**Param, RetType](
 
     @wraps(func)
     def wrapper_iqtree_func(*args: Param.args, **kwargs: Param.kwargs) -> RetType:
-        # Flush stdout and stderr
-        sys.stdout.flush()
-        sys.stderr.flush()
-
-        # Fetch file descriptors
-        out_fd = _fd_or_fallback(sys.stdout, 1)
-        err_fd = _fd_or_fallback(sys.stderr, 2)
-
-        # Save original stdout and stderr file descriptors
-        saved_stdout_fd = os.dup(out_fd)
-        saved_stderr_fd = os.dup(err_fd)
-
-        # Open /dev/null (or NUL on Windows) as destination for stdout and stderr
-        devnull_fd = os.open(os.devnull, os.O_WRONLY)
-
-        if hide_files:
-            original_dir = pathlib.Path.cwd()
-            tempdir = tempfile.TemporaryDirectory(prefix=f"piqtree_{func.__name__}")
-            os.chdir(tempdir.name)
-
+        _PROCESS_STATE.enter()
         try:
-            # Replace stdout and stderr with /dev/null
-            os.dup2(devnull_fd, out_fd)
-            os.dup2(devnull_fd, err_fd)
-
             # Call the wrapped function
-            return func(*args, **kwargs)
+            with _hide_files() if hide_files else contextlib.nullcontext():
+                return func(*args, **kwargs)
         except RuntimeError as e:
             raise IqTreeError(e) from None
         finally:
-            # Flush stdout and stderr
-            sys.stdout.flush()
-            sys.stderr.flush()
-
-            # Restore stdout and stderr
-            os.dup2(saved_stdout_fd, out_fd)
-            os.dup2(saved_stderr_fd, err_fd)
-
-            # Close the devnull file descriptor, and duplicated file descriptors
-            os.close(devnull_fd)
-            os.close(saved_stdout_fd)
-            os.close(saved_stderr_fd)
-
-            if hide_files:
-                os.chdir(original_dir)
-                tempdir.cleanup()
+            _PROCESS_STATE.exit()
 
     return wrapper_iqtree_func
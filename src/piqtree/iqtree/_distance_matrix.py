@@ -0,0 +1,150 @@
+"""Compact representation of pairwise distance matrices."""
+
+import dataclasses
+from collections.abc import Sequence
+from typing import Self
+
+import numpy as np
+from cogent3.evolve.fast_distance import DistanceMatrix
+from numpy.typing import DTypeLike
+
+
+def _num_pairs(num_names: int) -> int:
+    return num_names * (num_names - 1) // 2
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class CondensedDistanceMatrix:
+    """Pairwise distances stored as the upper triangle of a symmetric matrix.
+
+    The distances are ordered as in scipy's condensed distance matrices,
+    i.e. row by row over the pairs (i, j) with i < j. This takes half the
+    memory of the full square matrix.
+
+    Attributes
+    ----------
+    names : tuple[str, ...]
+        The names of the rows/columns of the matrix.
+    distances : np.ndarray
+        The condensed distances, of length n * (n - 1) / 2.
+
+    """
+
+    names: tuple[str, ...]
+    distances: np.ndarray
+
+    def __post_init__(self) -> None:
+        if self.distances.ndim != 1 or len(self.distances) != _num_pairs(
+            len(self.names),
+        ):
+            msg = (
+                f"Expected {_num_pairs(len(self.names))} condensed distances "
+                f"for {len(self.names)} names, got shape {self.distances.shape}"
+            )
+            raise ValueError(msg)
+
+    @classmethod
+    def from_square(
+        cls,
+        matrix: np.ndarray,
+        names: Sequence[str],
+        dtype: DTypeLike = np.float64,
+        out: np.ndarray | None = None,
+    ) -> Self:
+        """Condense the upper triangle of a symmetric square matrix.
+
+        Parameters
+        ----------
+        matrix : np.ndarray
+            A symmetric (n, n) matrix of pairwise distances.
+        names : Sequence[str]
+            The names of the rows/columns of the matrix.
+        dtype : DTypeLike, optional
+            The dtype of the condensed distances, by default np.float64.
+            Ignored if out is given.
+        out : np.ndarray | None, optional
+            A 1D array of length n * (n - 1) / 2 to write the condensed
+            distances into, e.g. a np.memmap. By default None, where
+            a new array is allocated.
+
+        Returns
+        -------
+        CondensedDistanceMatrix
+            The condensed distance matrix.
+
+        """
+        num_names = len(names)
+        if out is None:
+            distances = np.empty(_num_pairs(num_names), dtype=dtype)
+        elif out.shape != (_num_pairs(num_names),):
+            msg = (
+                f"out must have shape ({_num_pairs(num_names)},) "
+                f"for {num_names} names, got {out.shape}"
+            )
+            raise ValueError(msg)
+        else:
+            distances = out
+
+        # copy row by row to avoid allocating index arrays the size of the matrix
+        start = 0
+        for i in range(num_names - 1):
+            end = start + num_names - i - 1
+            distances[start:end] = matrix[i, i + 1 :]
+            start = end
+
+        if isinstance(distances, np.memmap):
+            distances.flush()
+
+        return cls(names=tuple(names), distances=distances)
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.distances.dtype
+
+    def _index(self, name1: str, name2: str) -> int:
+        i = self.names.index(name1)
+        j = self.names.index(name2)
+        if i > j:
+            i, j = j, i
+        return len(self.names) * i - i * (i + 1) // 2 + (j - i - 1)
+
+    def __getitem__(self, names: tuple[str, str]) -> float:
+        name1, name2 = names
+        if name1 == name2:
+            return 0.0
+        return float(self.distances[self._index(name1, name2)])
+
+    def to_square(self, dtype: DTypeLike = np.float64) -> np.ndarray:
+        """The full symmetric square matrix.
+
+        Parameters
+        ----------
+        dtype : DTypeLike, optional
+            The dtype of the square matrix, by default np.float64.
+
+        Returns
+        -------
+        np.ndarray
+            The (n, n) matrix of pairwise distances.
+
+        """
+        num_names = len(self.names)
+        matrix = np.zeros((num_names, num_names), dtype=dtype)
+        start = 0
+        for i in range(num_names - 1):
+            end = start + num_names - i - 1
+            matrix[i, i + 1 :] = self.distances[start:end]
+            matrix[i + 1 :, i] = self.distances[start:end]
+            start = end
+        return matrix
+
+    def to_distance_matrix(self) -> DistanceMatrix:
+        """The equivalent cogent3 DistanceMatrix.
+
+        Returns
+        -------
+        DistanceMatrix
+            Pairwise distance matrix.
+
+        """
+        return DistanceMatrix.from_array_names(self.to_square(), self.names)
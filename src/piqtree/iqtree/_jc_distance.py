@@ -1,11 +1,15 @@
 from collections.abc import Sequence
+from typing import Literal, overload
 
 import numpy as np
 from _piqtree import iq_jc_distances
 from cogent3.core.alignment import Alignment
 from cogent3.evolve.fast_distance import DistanceMatrix
+from numpy.typing import DTypeLike
 
+from piqtree.iqtree._alignment_handle import AlignmentHandle, encode_alignment
 from piqtree.iqtree._decorator import iqtree_func
+from piqtree.iqtree._distance_matrix import CondensedDistanceMatrix
 
 iq_jc_distances = iqtree_func(iq_jc_distances, hide_files=True)
 
@@ -16,10 +20,12 @@ def _dists_to_distmatrix(
 ) -> DistanceMatrix:
     """Convert numpy representation of distance matrix into cogent3 pairwise distance matrix.
 
+    The array is wrapped as is, without creating an object per pair.
+
     Parameters
     ----------
     distances : np.ndarray
-        Pairwise distances.
+        Symmetric (n, n) array of pairwise distances.
     names : Sequence[str]
         Corresponding sequence names.
 
@@ -29,40 +35,88 @@ def _dists_to_distmatrix(
         Pairwise distance matrix.
 
     """
-    dist_dict = {}
-    for i in range(1, len(distances)):
-        for j in range(i):
-            dist_dict[(names[i], names[j])] = distances[i, j]
-    return DistanceMatrix(dist_dict)
+    return DistanceMatrix.from_array_names(distances, names)
 
 
+@overload
 def jc_distances(
-    aln: Alignment,
+    aln: Alignment | AlignmentHandle,
     num_threads: int | None = None,
-) -> DistanceMatrix:
+    *,
+    condensed: Literal[False] = False,
+    dtype: DTypeLike = np.float64,
+    out: None = None,
+) -> DistanceMatrix: ...
+
+
+@overload
+def jc_distances(
+    aln: Alignment | AlignmentHandle,
+    num_threads: int | None = None,
+    *,
+    condensed: Literal[True],
+    dtype: DTypeLike = np.float64,
+    out: np.ndarray | None = None,
+) -> CondensedDistanceMatrix: ...
+
+
+def jc_distances(
+    aln: Alignment | AlignmentHandle,
+    num_threads: int | None = None,
+    *,
+    condensed: bool = False,
+    dtype: DTypeLike = np.float64,
+    out: np.ndarray | None = None,
+) -> DistanceMatrix | CondensedDistanceMatrix:
     """Compute pairwise JC distances for a given alignment.
 
     Parameters
     ----------
-    aln : Alignment
+    aln : Alignment | AlignmentHandle
         The alignment to compute pairwise JC distances for.
     num_threads: int | None, optional
         Number of threads for IQ-TREE to use,
         by default None (uses all available threads).
+    condensed: bool, optional
+        If True, returns only the upper triangle of the symmetric
+        distance matrix as a CondensedDistanceMatrix, by default False.
+    dtype: DTypeLike, optional
+        The dtype of the condensed distances, e.g. np.float32 to halve
+        memory use further. Only supported when condensed is True,
+        by default np.float64.
+    out: np.ndarray | None, optional
+        A 1D array of length n * (n - 1) / 2 to write the condensed
+        distances into, such as a np.memmap backed by a file, in which
+        case dtype is ignored. Only supported when condensed is True,
+        by default None.
 
     Returns
     -------
-    DistanceMatrix
+    DistanceMatrix | CondensedDistanceMatrix
         Pairwise JC distance matrix.
 
     """
+    if not condensed and np.dtype(dtype) != np.float64:
+        msg = f"dtype {np.dtype(dtype)} is only supported with condensed=True."
+        raise ValueError(msg)
+
+    if not condensed and out is not None:
+        msg = "out is only supported with condensed=True."
+        raise ValueError(msg)
+
     if num_threads is None:
         num_threads = 0
 
-    names = aln.names
-    seqs = [str(seq) for seq in aln.iter_seqs(names)]
+    names, seqs = encode_alignment(aln)
 
-    distances = np.array(iq_jc_distances(names, seqs, num_threads)).reshape(
+    distances = iq_jc_distances(names, seqs, num_threads).reshape(
         (len(names), len(names)),
     )
+    if condensed:
+        return CondensedDistanceMatrix.from_square(
+            distances,
+            names,
+            dtype=dtype,
+            out=out,
+        )
     return _dists_to_distmatrix(distances, names)
@@ -1,19 +1,38 @@
 """Python wrapper for model finder in the IQ-TREE library."""
 
 import dataclasses
-from collections.abc import Iterable
+import itertools
+import logging
+import math
+import os
+import re
+from collections.abc import Iterable, Sequence
 from typing import Any, cast
 
-import yaml
+import numpy as np
 from _piqtree import iq_model_finder
 from cogent3.core.alignment import Alignment
 from scinexus.misc import get_object_provenance
 
+from piqtree.iqtree._alignment_handle import AlignmentHandle, encode_alignment
+from piqtree.iqtree._decode import load_yaml
 from piqtree.iqtree._decorator import iqtree_func
+from piqtree.iqtree._model_finder_cache import (
+    ModelFinderCache,
+    ModelFinderCheckpoint,
+    model_finder_key,
+)
+from piqtree.iqtree._progress import ProgressCallback, report_progress
+from piqtree.iqtree._timings import CallTimer
 from piqtree.model import Model, make_model
-from piqtree.util import process_rand_seed_nonzero, validate_other_options
+from piqtree.util import (
+    add_output_prefix,
+    output_dir,
+    process_rand_seed_nonzero,
+    validate_other_options,
+)
 
-iq_model_finder = iqtree_func(iq_model_finder, hide_files=True)
+iq_model_finder = iqtree_func(iq_model_finder)
 
 
 @dataclasses.dataclass(slots=True, frozen=True)
@@ -64,6 +83,8 @@ class ModelFinderResult:
         The best BIC model.
     model_stats : dict[Model | str, ModelResultValue]
         Semi-processed representation of raw_data.
+    timings : dict[str, Any] | None
+        The timing breakdown of the model_finder call, if it was timed.
 
     """
 
@@ -77,6 +98,12 @@ class ModelFinderResult:
         repr=False,
         default_factory=dict,
     )
+    timings: dict[str, Any] | None = dataclasses.field(
+        init=False,
+        repr=False,
+        compare=False,
+        default=None,
+    )
 
     def __post_init__(self, raw_data: dict[str, Any]) -> None:
         self.model_stats = {
@@ -130,23 +157,238 @@ INVALID_MODEL_FINDER_PARAMS = [
     "-seed",  # seed
     "-nt",  # threads
     "-ntmax",  # threads
+    "-pre",  # output prefix
 ]
 
+_CRITERIA = ("AIC", "AICc", "BIC")
+
+
+def model_grid(
+    model_set: Iterable[str] | None,
+    freq_set: Iterable[str] | None,
+    rate_set: Iterable[str] | None,
+) -> list[tuple[str, str, str]]:
+    """Split a ModelFinder search space into one task per combination.
+
+    An axis of the search space that is not given is not split, so
+    each task searches IQ-TREE's default space for it.
+
+    Parameters
+    ----------
+    model_set : Iterable[str] | None
+        Search space for models.
+    freq_set : Iterable[str] | None
+        Search space for frequency types.
+    rate_set : Iterable[str] | None
+        Search space for rate heterogeneity types.
+
+    Returns
+    -------
+    list[tuple[str, str, str]]
+        The model, frequency type and rate heterogeneity type of each task.
+
+    """
+
+    def axis(values: Iterable[str] | None) -> list[str]:
+        values = [] if values is None else list(values)
+        return values or [""]
+
+    return list(itertools.product(axis(model_set), axis(freq_set), axis(rate_set)))
+
+
+def evaluate_models(
+    names: Sequence[str],
+    seqs: np.ndarray,
+    rand_seed: int,
+    model_set: str,
+    freq_set: str,
+    rate_set: str,
+    num_threads: int,
+    other_options: str,
+) -> dict[str, Any]:
+    """Run ModelFinder on one part of a search space.
+
+    Parameters
+    ----------
+    names : Sequence[str]
+        The names of the sequences.
+    seqs : np.ndarray
+        The encoded sequences, as from get_seq_array.
+    rand_seed : int
+        The random seed, which must be nonzero.
+    model_set : str
+        Comma separated search space for models.
+    freq_set : str
+        Comma separated search space for frequency types.
+    rate_set : str
+        Comma separated search space for rate heterogeneity types.
+    num_threads : int
+        Number of threads for IQ-TREE to use.
+    other_options : str
+        Additional command line options for IQ-TREE.
+
+    Returns
+    -------
+    dict[str, Any]
+        The raw data returned by ModelFinder.
+
+    """
+    with output_dir() as out_dir:
+        return load_yaml(
+            iq_model_finder(
+                names,
+                seqs,
+                rand_seed,
+                model_set,
+                freq_set,
+                rate_set,
+                num_threads,
+                add_output_prefix(other_options, out_dir / "piqtree"),
+            ),
+        )
+
+
+# sequence types reading each codon of the alignment as one site
+_CODON_SEQ_TYPE = re.compile(r"(?:^|\s)(?:-st|--seqtype)\s+(?:CODON\d*|NT2AA)(?:\s|$)")
+
+
+def sample_size(seqs: np.ndarray, other_options: str) -> int:
+    """The number of sites ModelFinder scores the models of an alignment with.
+
+    This is the number of alignment columns, except for codon data
+    (IQ-TREE's -st CODON or NT2AA sequence types), where each codon
+    is one site.
+
+    Parameters
+    ----------
+    seqs : np.ndarray
+        The encoded sequences, as from get_seq_array.
+    other_options : str
+        The additional command line options given to IQ-TREE.
+
+    Returns
+    -------
+    int
+        The sample size used for the AICc and BIC.
+
+    """
+    num_columns = seqs.shape[1] - 1
+    if _CODON_SEQ_TYPE.search(other_options):
+        return num_columns // 3
+    return num_columns
+
+
+def _information_criteria(
+    stats: ModelResultValue,
+    num_sites: int,
+) -> tuple[float, float, float]:
+    """The AIC, AICc and BIC of a model as computed by ModelFinder."""
+    k = stats.nfp
+    aic = 2 * k - 2 * stats.lnL
+    aicc = aic + 2 * k * (k + 1) / max(num_sites - k - 1, 1)
+    bic = k * math.log(num_sites) - 2 * stats.lnL
+    return aic, aicc, bic
+
+
+def merge_model_finder_results(
+    results: Iterable[dict[str, Any]],
+    num_sites: int,
+) -> dict[str, Any]:
+    """Merge the raw results of ModelFinder runs over parts of a search space.
+
+    Parameters
+    ----------
+    results : Iterable[dict[str, Any]]
+        The raw data returned by each ModelFinder run.
+    num_sites : int
+        The sample size the models are scored with (see sample_size).
+
+    Returns
+    -------
+    dict[str, Any]
+        Raw data with every model's statistics, and the best model
+        under each criterion over all the models.
+
+    """
+    merged: dict[str, Any] = {}
+    for raw in results:
+        for key, value in raw.items():
+            if key.startswith(("best_", "initTree")) or not isinstance(value, str):
+                continue
+            merged.setdefault(key, value)
+
+    if not merged:
+        msg = "ModelFinder did not return any models."
+        raise ValueError(msg)
+
+    scores = {
+        model: _information_criteria(ModelResultValue.from_string(value), num_sites)
+        for model, value in merged.items()
+    }
+    for i, criterion in enumerate(_CRITERIA):
+        merged[f"best_model_{criterion}"] = min(scores, key=lambda m: scores[m][i])
+    return merged
+
+
+def task_key(
+    names: Sequence[str],
+    seqs: np.ndarray,
+    task: tuple[str, str, str],
+    rand_seed: int | None,
+    other_options: str,
+) -> str:
+    """The checkpoint key of one task of a ModelFinder search space.
+
+    Parameters
+    ----------
+    names : Sequence[str]
+        The names of the sequences.
+    seqs : np.ndarray
+        The encoded sequences, as from get_seq_array.
+    task : tuple[str, str, str]
+        The model, frequency type and rate heterogeneity type of the task.
+    rand_seed : int | None
+        The random seed as given by the caller.
+    other_options : str
+        Additional command line options for IQ-TREE.
+
+    Returns
+    -------
+    str
+        A hex digest identifying the alignment content and the task.
+
+    """
+    model_set, freq_set, rate_set = ([value] for value in task)
+    return model_finder_key(
+        names,
+        seqs,
+        model_set,
+        freq_set,
+        rate_set,
+        rand_seed,
+        other_options,
+    )
+
 
 def model_finder(
-    aln: Alignment,
+    aln: Alignment | AlignmentHandle,
     model_set: Iterable[str] | None = None,
     freq_set: Iterable[str] | None = None,
     rate_set: Iterable[str] | None = None,
     rand_seed: int | None = None,
     num_threads: int | None = None,
     other_options: str = "",
+    *,
+    cache: ModelFinderCache | None = None,
+    checkpoint_dir: str | os.PathLike | None = None,
+    progress: ProgressCallback | logging.Logger | None = None,
+    timings: bool = False,
 ) -> ModelFinderResult:
     """Find the models of best fit for an alignment using ModelFinder.
 
     Parameters
     ----------
-    aln : Alignment
+    aln : Alignment | AlignmentHandle
         The alignment to find the model of best fit for.
     model_set : Iterable[str] | None, optional
         Search space for models.
@@ -164,42 +406,151 @@ def model_finder(
         If 0 is specified, IQ-TREE attempts to find the optimal number of threads.
     other_options: str, optional
         Additional command line options for IQ-TREE.
+    cache: ModelFinderCache | None, optional
+        A cache to reuse the result of an earlier call on the same
+        alignment with the same arguments from, and to store this
+        result in, by default None (no caching).
+    checkpoint_dir: str | os.PathLike | None, optional
+        Directory to keep the result of each part of the search space
+        in, by default None (no checkpointing). A call which finds
+        results for its alignment and arguments there only evaluates
+        the parts not yet scored, so an interrupted search resumes and
+        a search over extra models reuses those already scored.
+        Requires a model_set.
+    progress: ProgressCallback | logging.Logger | None, optional
+        A callback for the ProgressEvent reports made as IQ-TREE's output
+        is followed, or a logger to log them, by default None (no reports).
+        The reports are delivered in the calling thread once IQ-TREE has
+        returned. Following the output serialises every IQ-TREE call in
+        the process: calls from other threads wait until a call reporting
+        its progress or timing its phases has finished.
+    timings: bool, optional
+        Whether to time the call, by default False. If True, the seconds
+        spent encoding the alignment ("encode"), looking up the cache
+        ("cache"), in IQ-TREE including decoding its output ("iqtree")
+        and in each of its phases ("iqtree_phases"), building the result
+        ("process_result") and in total ("total") are stored as the
+        result's timings.
 
     Returns
     -------
     ModelFinderResult
         Collection of data returned from IQ-TREE's ModelFinder.
 
+    Raises
+    ------
+    ValueError
+        If checkpoint_dir is given without a model_set.
+
+    Notes
+    -----
+    With a checkpoint_dir, ModelFinder is run once for each combination
+    of the given models, frequency types and rate heterogeneity types,
+    as in parallel_model_finder, and the best models are selected from
+    their merged statistics. A frequency or rate heterogeneity axis
+    that is not given is not split. A model_set must be given, as IQ-TREE's
+    default search space would otherwise be a single part, which would be
+    lost entirely if interrupted.
+
     """
     validate_other_options(other_options, INVALID_MODEL_FINDER_PARAMS)
 
-    source = cast("str", aln.info.source)
-
-    rand_seed = process_rand_seed_nonzero(rand_seed)
+    if isinstance(aln, AlignmentHandle):
+        source = cast("str", aln.source)
+    else:
+        source = cast("str", aln.info.source)
 
     if num_threads is None:
         num_threads = 1
 
-    if model_set is None:
-        model_set = set()
-    if freq_set is None:
-        freq_set = set()
-    if rate_set is None:
-        rate_set = set()
-
-    names = aln.names
-    seqs = [str(seq) for seq in aln.iter_seqs(names)]
-
-    raw = yaml.safe_load(
-        iq_model_finder(
-            names,
-            seqs,
-            rand_seed,
-            ",".join(model_set),
-            ",".join(freq_set),
-            ",".join(rate_set),
-            num_threads,
-            other_options,
-        ),
-    )
-    return ModelFinderResult(raw_data=raw, source=source)
+    # materialised, as they are both hashed and passed to IQ-TREE
+    model_set = [] if model_set is None else list(model_set)
+    freq_set = [] if freq_set is None else list(freq_set)
+    rate_set = [] if rate_set is None else list(rate_set)
+
+    if checkpoint_dir is not None and not model_set:
+        msg = "checkpoint_dir requires a model_set to split the search by."
+        raise ValueError(msg)
+
+    timer = CallTimer(enabled=timings)
+    with timer.step("encode"):
+        names, seqs = encode_alignment(aln)
+
+    key = None
+    if cache is not None:
+        with timer.step("cache"):
+            key = model_finder_key(
+                names,
+                seqs,
+                model_set,
+                freq_set,
+                rate_set,
+                rand_seed,
+                other_options,
+            )
+            cached = cache.get(key)
+        if cached is not None:
+            result = ModelFinderResult.from_rich_dict(cached)
+            result.source = source
+            if timings:
+                result.timings = timer.timings(None)
+            return result
+
+    with timer.step("iqtree"), report_progress(progress, track=timings) as tracker:
+        if checkpoint_dir is None:
+            raw = evaluate_models(
+                names,
+                seqs,
+                process_rand_seed_nonzero(rand_seed),
+                ",".join(model_set),
+                ",".join(freq_set),
+                ",".join(rate_set),
+                num_threads,
+                other_options,
+            )
+        else:
+            raw = _checkpointed_model_finder(
+                names,
+                seqs,
+                model_grid(model_set, freq_set, rate_set),
+                rand_seed,
+                num_threads,
+                other_options,
+                ModelFinderCheckpoint(checkpoint_dir),
+            )
+    with timer.step("process_result"):
+        result = ModelFinderResult(raw_data=raw, source=source)
+
+    if cache is not None:
+        cache.put(cast("str", key), result.to_rich_dict())
+
+    if timings:
+        result.timings = timer.timings(tracker)
+    return result
+
+
+def _checkpointed_model_finder(
+    names: Sequence[str],
+    seqs: np.ndarray,
+    tasks: list[tuple[str, str, str]],
+    rand_seed: int | None,
+    num_threads: int,
+    other_options: str,
+    checkpoint: ModelFinderCheckpoint,
+) -> dict[str, Any]:
+    results = []
+    for task in tasks:
+        key = task_key(names, seqs, task, rand_seed, other_options)
+        raw = checkpoint.get(key)
+        if raw is None:
+            raw = evaluate_models(
+                names,
+                seqs,
+                process_rand_seed_nonzero(rand_seed),
+                *task,
+                num_threads,
+                other_options,
+            )
+            checkpoint.put(key, raw)
+        results.append(raw)
+    return merge_model_finder_results(results, sample_size(seqs, other_options))
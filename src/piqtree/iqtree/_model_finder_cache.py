@@ -0,0 +1,276 @@
+"""Caching of ModelFinder results between calls and between runs."""
+
+import collections
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import numpy as np
+from _piqtree import __iqtree_version__
+
+
+def model_finder_key(
+    names: Sequence[str],
+    seqs: np.ndarray,
+    model_set: Iterable[str],
+    freq_set: Iterable[str],
+    rate_set: Iterable[str],
+    rand_seed: int | None,
+    other_options: str,
+) -> str:
+    """The cache key of a ModelFinder run.
+
+    Parameters
+    ----------
+    names : Sequence[str]
+        The names of the sequences.
+    seqs : np.ndarray
+        The encoded sequences, as from get_seq_array.
+    model_set : Iterable[str]
+        Search space for models.
+    freq_set : Iterable[str]
+        Search space for frequency types.
+    rate_set : Iterable[str]
+        Search space for rate heterogeneity types.
+    rand_seed : int | None
+        The random seed as given by the caller.
+    other_options : str
+        Additional command line options for IQ-TREE.
+
+    Returns
+    -------
+    str
+        A hex digest identifying the alignment content and arguments.
+
+    """
+    options = {
+        "iqtree_version": __iqtree_version__,
+        "names": list(names),
+        "shape": list(seqs.shape),
+        "model_set": sorted(model_set),
+        "freq_set": sorted(freq_set),
+        "rate_set": sorted(rate_set),
+        "rand_seed": rand_seed,
+        "other_options": " ".join(other_options.split()),
+    }
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(seqs, dtype=np.uint8).data)
+    return digest.hexdigest()
+
+
+def _load_json(file: pathlib.Path) -> dict[str, Any] | None:
+    try:
+        with file.open() as stored:
+            data = json.load(stored)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        # a partly written or corrupt result is treated as missing
+        file.unlink(missing_ok=True)
+        return None
+
+    # mark as recently used for eviction
+    with contextlib.suppress(OSError):
+        os.utime(file)
+    return data
+
+
+def _store_json(file: pathlib.Path, data: dict[str, Any]) -> None:
+    # write to a temporary file first so readers never see a partial result
+    with tempfile.NamedTemporaryFile(
+        "w",
+        dir=file.parent,
+        suffix=".tmp",
+        delete=False,
+    ) as tmp:
+        json.dump(data, tmp)
+    pathlib.Path(tmp.name).replace(file)
+
+
+class ModelFinderCheckpoint:
+    """An on-disk store of the raw results of ModelFinder runs.
+
+    The raw data IQ-TREE returns for each task of a ModelFinder search
+    space is kept as one JSON file, so an interrupted search only runs
+    the tasks without a result. Nothing is kept in memory.
+
+    Parameters
+    ----------
+    path : str | os.PathLike
+        Directory to store results in, created if needed.
+
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """The stored raw result for a key, if any.
+
+        Parameters
+        ----------
+        key : str
+            The key of the task, as from task_key.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            The raw data returned by IQ-TREE for the task, or None if
+            there is no result for the key.
+
+        """
+        return _load_json(self.path / f"{key}.json")
+
+    def put(self, key: str, raw: dict[str, Any]) -> None:
+        """Store a raw result.
+
+        Parameters
+        ----------
+        key : str
+            The key of the task, as from task_key.
+        raw : dict[str, Any]
+            The raw data returned by IQ-TREE for the task.
+
+        """
+        _store_json(self.path / f"{key}.json", raw)
+
+
+class ModelFinderCache:
+    """An opt-in cache of ModelFinder results.
+
+    Results are kept in a least-recently-used in-memory store and,
+    if a directory is given, as one JSON file per result on disk so
+    they are reused between runs. Each result is keyed by a hash of the
+    alignment's content and the arguments that affect ModelFinder's
+    result, so the number of threads is ignored.
+
+    Parameters
+    ----------
+    path : str | os.PathLike | None, optional
+        Directory to store results in, created if needed. None keeps
+        results in memory only, by default None.
+    max_entries : int, optional
+        The maximum number of results kept in memory, by default 128.
+    max_disk_entries : int | None, optional
+        The maximum number of results kept on disk, least recently used
+        first to be removed. None means unbounded, by default None.
+
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike | None = None,
+        *,
+        max_entries: int = 128,
+        max_disk_entries: int | None = None,
+    ) -> None:
+        if max_entries < 0:
+            msg = f"max_entries must be non-negative, got {max_entries}"
+            raise ValueError(msg)
+        if max_disk_entries is not None and max_disk_entries < 0:
+            msg = f"max_disk_entries must be non-negative, got {max_disk_entries}"
+            raise ValueError(msg)
+
+        self.path = None if path is None else pathlib.Path(path)
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: collections.OrderedDict[str, dict[str, Any]] = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """The stored result for a key, if any.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as from model_finder_key.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            The rich dict of the stored ModelFinderResult, or None if
+            there is no result for the key.
+
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        data = self._load(key)
+        if data is not None:
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        """Store a result.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as from model_finder_key.
+        data : dict[str, Any]
+            The rich dict of the ModelFinderResult.
+
+        """
+        self._remember(key, data)
+        self._store(key, data)
+
+    def clear(self) -> None:
+        """Remove all stored results, in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+        for file in self._disk_files():
+            file.unlink(missing_ok=True)
+
+    def _remember(self, key: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _file(self, key: str) -> pathlib.Path:
+        return self.path / f"{key}.json"  # type: ignore[operator]
+
+    def _disk_files(self) -> list[pathlib.Path]:
+        if self.path is None:
+            return []
+        return list(self.path.glob("*.json"))
+
+    def _load(self, key: str) -> dict[str, Any] | None:
+        if self.path is None:
+            return None
+        return _load_json(self._file(key))
+
+    def _store(self, key: str, data: dict[str, Any]) -> None:
+        if self.path is None:
+            return
+
+        _store_json(self._file(key), data)
+        if self.max_disk_entries is not None:
+            self._evict_disk(self.max_disk_entries)
+
+    def _evict_disk(self, max_disk_entries: int) -> None:
+        files = []
+        for file in self._disk_files():
+            with contextlib.suppress(OSError):
+                files.append((file.stat().st_mtime_ns, file))
+        files.sort()
+        for _, file in files[: max(0, len(files) - max_disk_entries)]:
+            file.unlink(missing_ok=True)
@@ -0,0 +1,148 @@
+"""ModelFinder scheduled over the grid of candidate models."""
+
+import os
+from collections.abc import Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Any, cast
+
+from cogent3.core.alignment import Alignment
+
+from piqtree.iqtree._alignment_handle import AlignmentHandle, encode_alignment
+from piqtree.iqtree._model_finder import (
+    INVALID_MODEL_FINDER_PARAMS,
+    ModelFinderResult,
+    evaluate_models,
+    merge_model_finder_results,
+    model_grid,
+    sample_size,
+    task_key,
+)
+from piqtree.iqtree._model_finder_cache import ModelFinderCheckpoint
+from piqtree.util import process_rand_seed_nonzero, validate_other_options
+
+
+def parallel_model_finder(
+    aln: Alignment | AlignmentHandle,
+    model_set: Iterable[str] | None = None,
+    freq_set: Iterable[str] | None = None,
+    rate_set: Iterable[str] | None = None,
+    rand_seed: int | None = None,
+    num_workers: int | None = None,
+    other_options: str = "",
+    *,
+    executor: Executor | None = None,
+    checkpoint_dir: str | os.PathLike | None = None,
+) -> ModelFinderResult:
+    """Find the models of best fit with ModelFinder runs in parallel.
+
+    The search space is split into one task for each combination of
+    the given models, frequency types and rate heterogeneity types.
+    Each task runs ModelFinder single-threaded, and the statistics of
+    every model are merged to select the best models under the AIC,
+    AICc and BIC as ModelFinder does. For short alignments this scales
+    better than threads within one ModelFinder run.
+
+    Parameters
+    ----------
+    aln : Alignment | AlignmentHandle
+        The alignment to find the model of best fit for.
+    model_set : Iterable[str] | None, optional
+        Search space for models.
+        Equivalent to IQ-TREE's mset parameter, by default None
+    freq_set : Iterable[str] | None, optional
+        Search space for frequency types.
+        Equivalent to IQ-TREE's mfreq parameter, by default None
+    rate_set : Iterable[str] | None, optional
+        Search space for rate heterogeneity types.
+        Equivalent to IQ-TREE's mrate parameter, by default None
+    rand_seed : int | None, optional
+        The random seed - None means no seed is used, by default None.
+        The same seed is used for every task.
+    num_workers : int | None, optional
+        Number of processes to run tasks in, by default None (the
+        number of processors). Ignored if executor is given.
+    other_options: str, optional
+        Additional command line options for IQ-TREE.
+    executor : Executor | None, optional
+        An executor to run the tasks with, such as one spanning several
+        machines, by default None (a process pool of num_workers). It
+        is not shut down.
+    checkpoint_dir : str | os.PathLike | None, optional
+        Directory to keep the result of each task in as it completes,
+        by default None (no checkpointing). Tasks with a result there
+        for the same alignment and arguments are not run again.
+        Requires a model_set.
+
+    Returns
+    -------
+    ModelFinderResult
+        Collection of the data returned from every ModelFinder run.
+
+    Raises
+    ------
+    ValueError
+        If checkpoint_dir is given without a model_set.
+
+    Notes
+    -----
+    An axis of the search space that is not given is not split, so
+    each task searches IQ-TREE's default space for it.
+
+    """
+    validate_other_options(other_options, INVALID_MODEL_FINDER_PARAMS)
+
+    if isinstance(aln, AlignmentHandle):
+        source = cast("str", aln.source)
+    else:
+        source = cast("str", aln.info.source)
+
+    model_set = None if model_set is None else list(model_set)
+    if checkpoint_dir is not None and not model_set:
+        msg = "checkpoint_dir requires a model_set to split the search by."
+        raise ValueError(msg)
+
+    names, seqs = encode_alignment(aln)
+    names = list(names)
+    tasks = model_grid(model_set, freq_set, rate_set)
+
+    results: list[dict[str, Any] | None] = [None] * len(tasks)
+    checkpoint = None
+    keys: list[str] = []
+    if checkpoint_dir is not None:
+        checkpoint = ModelFinderCheckpoint(checkpoint_dir)
+        keys = [task_key(names, seqs, task, rand_seed, other_options) for task in tasks]
+        results = [checkpoint.get(key) for key in keys]
+
+    rand_seed = process_rand_seed_nonzero(rand_seed)
+
+    def run(pool: Executor) -> None:
+        futures = {
+            pool.submit(
+                evaluate_models,
+                names,
+                seqs,
+                rand_seed,
+                *task,
+                1,
+                other_options,
+            ): i
+            for i, task in enumerate(tasks)
+            if results[i] is None
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if checkpoint is not None:
+                checkpoint.put(keys[i], results[i])
+
+    if executor is not None:
+        run(executor)
+    elif any(raw is None for raw in results):
+        with ProcessPoolExecutor(max_workers=num_workers) as pool:
+            run(pool)
+
+    raw = merge_model_finder_results(
+        cast("list[dict[str, Any]]", results),
+        sample_size(seqs, other_options),
+    )
+    return ModelFinderResult(raw_data=raw, source=source)
@@ -0,0 +1,258 @@
+"""Progress reports parsed from the output of IQ-TREE."""
+
+import contextlib
+import dataclasses
+import logging
+import math
+import re
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+from piqtree.iqtree._decorator import capture_output
+
+PROGRESS_INTERVAL = 1.0
+"""The minimum number of seconds between reports within a phase."""
+
+_NUMBER = r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?"
+
+# the first line of IQ-TREE's output starting each phase
+_PHASES = (
+    ("model_finder", re.compile(r"ModelFinder will test")),
+    ("distances", re.compile(r"Computing ML distances|Computing BIONJ tree")),
+    ("parsimony", re.compile(r"Creating fast initial parsimony tree")),
+    ("initial_trees", re.compile(r"INITIALIZING CANDIDATE TREE SET")),
+    ("tree_search", re.compile(r"OPTIMIZING CANDIDATE TREE SET")),
+    ("finalizing", re.compile(r"FINALIZING TREE SEARCH")),
+    ("bootstrap", re.compile(r"Creating bootstrap support values")),
+)
+_ITERATION = re.compile(rf"^Iteration (\d+) / LogL: ({_NUMBER})")
+_BETTER_TREE = re.compile(rf"BETTER TREE FOUND at iteration (\d+): ({_NUMBER})")
+_BEST_SCORE = re.compile(
+    rf"(?:BEST SCORE FOUND|Current best score|Optimal log-likelihood)\s*:\s*({_NUMBER})",
+)
+# a row of ModelFinder's table: number, model, -lnL and degrees of freedom
+_MODEL_ROW = re.compile(rf"^\s*(\d+)\s+\S+\s+({_NUMBER})\s+\d+\s")
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ProgressEvent:
+    """A report of the progress of an IQ-TREE call.
+
+    Attributes
+    ----------
+    phase : str
+        The phase of the call, such as "model_finder", "distances",
+        "parsimony", "initial_trees", "tree_search", "finalizing" or
+        "bootstrap".
+        The first phase is "setup" and the last is "done".
+    iteration : int | None
+        The tree search iteration, or the number of models tested by
+        ModelFinder, if reached in this phase.
+    best_lnl : float | None
+        The best log likelihood found so far, if any.
+    elapsed : float
+        Seconds since the call started.
+    phase_elapsed : float
+        Seconds since the phase started.
+    message : str
+        The line of IQ-TREE's output the report was made for.
+
+    """
+
+    phase: str
+    iteration: int | None
+    best_lnl: float | None
+    elapsed: float
+    phase_elapsed: float
+    message: str
+
+    def __str__(self) -> str:
+        parts = [self.phase]
+        if self.iteration is not None:
+            parts.append(f"iteration {self.iteration}")
+        if self.best_lnl is not None:
+            parts.append(f"best lnL {self.best_lnl:.4f}")
+        parts.append(f"{self.elapsed:.1f}s")
+        return ", ".join(parts)
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressTracker:
+    """Follows the output of an IQ-TREE call and reports its progress.
+
+    A report is made when a phase starts, and otherwise at most every
+    min_interval seconds when the iteration or best log likelihood
+    changes, so frequent output does not flood the callback. The time
+    spent in each phase is kept in phase_times.
+
+    Parameters
+    ----------
+    callback : ProgressCallback | None
+        Called with each report, or None to only keep the phase times.
+    min_interval : float, optional
+        The minimum number of seconds between reports within a phase,
+        by default PROGRESS_INTERVAL.
+
+    """
+
+    def __init__(
+        self,
+        callback: ProgressCallback | None,
+        min_interval: float = PROGRESS_INTERVAL,
+    ) -> None:
+        self._callback = callback
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._phase_start = self._start
+        self._last_report = -math.inf
+        self._finished = False
+
+        self.phase = "setup"
+        self.iteration: int | None = None
+        self.best_lnl: float | None = None
+        self.error: Exception | None = None
+        self.phase_times: dict[str, float] = {}
+
+    def __call__(self, line: str) -> None:
+        """Update the progress from a line of IQ-TREE's output."""
+        with self._lock:
+            if self._finished:
+                return
+
+            now = time.perf_counter()
+            phase = self._match_phase(line)
+            started = False
+            if phase is not None and phase != self.phase:
+                self._start_phase(phase, now)
+                started = True
+
+            updated = self._update(line)
+            if started or (updated and now - self._last_report >= self._min_interval):
+                self._report(line, now)
+
+    def finish(self) -> None:
+        """Report the end of the call."""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+
+            now = time.perf_counter()
+            self._start_phase("done", now)
+            self._report("", now)
+
+    def _start_phase(self, phase: str, now: float) -> None:
+        elapsed = now - self._phase_start
+        self.phase_times[self.phase] = self.phase_times.get(self.phase, 0) + elapsed
+
+        self.phase = phase
+        self._phase_start = now
+        self.iteration = None
+
+    def _match_phase(self, line: str) -> str | None:
+        for phase, pattern in _PHASES:
+            if pattern.search(line):
+                return phase
+        return None
+
+    def _update(self, line: str) -> bool:
+        if match := _ITERATION.match(line) or _BETTER_TREE.search(line):
+            self.iteration = int(match.group(1))
+            self._improve(float(match.group(2)))
+            return True
+        if match := _BEST_SCORE.search(line):
+            self._improve(float(match.group(1)))
+            return True
+        if self.phase == "model_finder" and (match := _MODEL_ROW.match(line)):
+            self.iteration = int(match.group(1))
+            self._improve(-float(match.group(2)))
+            return True
+        return False
+
+    def _improve(self, lnl: float) -> None:
+        if self.best_lnl is None or lnl > self.best_lnl:
+            self.best_lnl = lnl
+
+    def _report(self, message: str, now: float) -> None:
+        self._last_report = now
+        if self._callback is None:
+            return
+
+        event = ProgressEvent(
+            phase=self.phase,
+            iteration=self.iteration,
+            best_lnl=self.best_lnl,
+            elapsed=now - self._start,
+            phase_elapsed=now - self._phase_start,
+            message=message,
+        )
+        try:
+            self._callback(event)
+        except Exception as e:  # noqa: BLE001
+            # raised in the calling thread once IQ-TREE returns
+            if self.error is None:
+                self.error = e
+
+
+def _log_progress(logger: logging.Logger) -> ProgressCallback:
+    def log(event: ProgressEvent) -> None:
+        logger.info("%s", event, extra={"progress": event})
+
+    return log
+
+
+@contextlib.contextmanager
+def report_progress(
+    progress: ProgressCallback | logging.Logger | None,
+    *,
+    track: bool = False,
+) -> Iterator[ProgressTracker | None]:
+    """Report the progress of the IQ-TREE calls made within the context.
+
+    Only calls made by this thread are followed, so every IQ-TREE call in
+    the process is serialised while the context is open: calls from other
+    threads wait until it is exited (see capture_output).
+
+    The reports are made while IQ-TREE's output is captured, so anything
+    written to stdout or stderr then would be captured with it. They are
+    therefore queued, and passed to the callback in the calling thread
+    once the context's calls have returned and the output is restored.
+    Each event's elapsed times are those of when the report was made.
+
+    Parameters
+    ----------
+    progress : ProgressCallback | logging.Logger | None
+        A callback for each ProgressEvent, or a logger to log them at
+        the INFO level with the event as the "progress" attribute of
+        the record. None reports nothing.
+    track : bool, optional
+        Whether to follow the output for the phase times even if
+        nothing is reported, by default False.
+
+    Yields
+    ------
+    ProgressTracker | None
+        The tracker following the output, or None if neither reporting
+        nor tracking.
+
+    """
+    if progress is None and not track:
+        yield None
+        return
+
+    if isinstance(progress, logging.Logger):
+        progress = _log_progress(progress)
+
+    events: list[ProgressEvent] = []
+    tracker = ProgressTracker(None if progress is None else events.append)
+    with capture_output(tracker):
+        yield tracker
+    tracker.finish()
+
+    if progress is not None:
+        for event in events:
+            progress(event)
@@ -1,5 +1,7 @@
 """Python wrappers to random tree generation in the IQ-TREE library."""
 
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum, auto
 
 from _piqtree import iq_random_tree
@@ -7,7 +9,7 @@ from cogent3 import make_tree
 from cogent3.core.tree import PhyloNode
 
 from piqtree.iqtree._decorator import iqtree_func
-from piqtree.util import process_rand_seed_nonzero
+from piqtree.util import derive_rand_seeds, process_rand_seed_nonzero
 
 iq_random_tree = iqtree_func(iq_random_tree)
 
@@ -51,3 +53,108 @@ def random_tree(
 
     newick = iq_random_tree(num_taxa, tree_mode.name, 1, rand_seed).strip()
     return make_tree(newick)
+
+
+def _random_newicks(
+    num_taxa: int,
+    tree_mode: TreeGenMode,
+    num_trees: int,
+    rand_seed: int,
+) -> list[str]:
+    newicks = iq_random_tree(num_taxa, tree_mode.name, num_trees, rand_seed)
+    return [newick.strip() for newick in newicks.splitlines() if newick.strip()]
+
+
+def _batch_sizes(num_trees: int, num_batches: int) -> list[int]:
+    size, remainder = divmod(num_trees, num_batches)
+    return [size + (i < remainder) for i in range(num_batches)]
+
+
+def _iter_random_newicks(
+    num_taxa: int,
+    tree_mode: TreeGenMode,
+    num_trees: int,
+    rand_seed: int,
+    num_workers: int,
+) -> Iterator[str]:
+    if num_trees == 0:
+        return
+
+    if num_workers <= 1 or num_trees == 1:
+        yield from _random_newicks(num_taxa, tree_mode, num_trees, rand_seed)
+        return
+
+    # IQ-TREE cannot be called concurrently within a process, so each
+    # batch of trees is generated in a worker process with its own seed
+    sizes = _batch_sizes(num_trees, min(num_workers, num_trees))
+    seeds = [
+        process_rand_seed_nonzero(seed)
+        for seed in derive_rand_seeds(rand_seed, len(sizes))
+    ]
+    with ProcessPoolExecutor(max_workers=len(sizes)) as pool:
+        batches = [
+            pool.submit(_random_newicks, num_taxa, tree_mode, size, seed)
+            for size, seed in zip(sizes, seeds, strict=True)
+        ]
+        for batch in batches:
+            yield from batch.result()
+
+
+def random_trees(
+    num_taxa: int,
+    tree_mode: TreeGenMode,
+    num_trees: int,
+    rand_seed: int | None = None,
+    *,
+    as_newick: bool = False,
+    num_workers: int | None = None,
+) -> Iterator[PhyloNode] | Iterator[str]:
+    """Generate many random phylogenetic trees.
+
+    The trees are generated by IQ-TREE in a single call, and are only
+    parsed as the iterator is consumed.
+
+    Parameters
+    ----------
+    num_taxa : int
+        The number of taxa per tree.
+    tree_mode : TreeGenMode
+        How the trees are generated.
+    num_trees : int
+        The number of trees to generate.
+    rand_seed : int | None, optional
+        The random seed - None means no seed is used, by default None.
+    as_newick : bool, optional
+        Whether to yield the newick strings of the trees rather than
+        parsing them, by default False.
+    num_workers : int | None, optional
+        Number of processes to generate batches of trees in, by default
+        None (one batch, generated in this process). Each batch is
+        generated with its own seed derived from rand_seed, so the trees
+        depend on num_workers.
+
+    Returns
+    -------
+    Iterator[PhyloNode] | Iterator[str]
+        The random trees, or their newick strings if as_newick is True.
+
+    """
+    if num_trees < 0:
+        msg = f"num_trees must be non-negative, got {num_trees}"
+        raise ValueError(msg)
+
+    rand_seed = process_rand_seed_nonzero(rand_seed)
+
+    if num_workers is None:
+        num_workers = 1
+
+    newicks = _iter_random_newicks(
+        num_taxa,
+        tree_mode,
+        num_trees,
+        rand_seed,
+        num_workers,
+    )
+    if as_newick:
+        return newicks
+    return (make_tree(newick) for newick in newicks)
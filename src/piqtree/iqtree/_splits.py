@@ -0,0 +1,335 @@
+"""Bitset representation of the splits of phylogenetic trees."""
+
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+from cogent3.core.tree import PhyloNode
+
+
+def taxon_bits(taxa: Iterable[str]) -> dict[str, int]:
+    """Map each taxon to its bit in a split bitset.
+
+    Parameters
+    ----------
+    taxa : Iterable[str]
+        The fixed ordering of the taxa.
+
+    Returns
+    -------
+    dict[str, int]
+        The single bit set for each taxon.
+
+    """
+    return {name: 1 << i for i, name in enumerate(taxa)}
+
+
+def _iter_subtrees(
+    tree: PhyloNode,
+    bits: dict[str, int],
+) -> Iterator[tuple[PhyloNode, int, list[int]]]:
+    """Postorder over the nodes of a tree with the taxa below each node.
+
+    Yields each node with the bitset of the taxa below it, and the
+    bitsets of its children. Once exhausted, the tree's tips have been
+    checked against the taxa of bits.
+    """
+    num_tips = 0
+    stack: list[int] = []
+    for node in tree.postorder():
+        if node.is_tip():
+            if node.name not in bits:
+                msg = f"Tree tip {node.name!r} is not among the expected taxa."
+                raise ValueError(msg)
+            num_tips += 1
+            stack.append(bits[node.name])
+            yield node, bits[node.name], []
+            continue
+
+        children = stack[-len(node.children) :]
+        del stack[-len(node.children) :]
+        subtree = 0
+        for child in children:
+            subtree |= child
+        stack.append(subtree)
+        yield node, subtree, children
+
+    if num_tips != len(bits) or stack[-1] != (1 << len(bits)) - 1:
+        msg = f"Expected the tree to have the {len(bits)} taxa {list(bits)}."
+        raise ValueError(msg)
+
+
+def _canonical(subtree: int, all_taxa: int) -> int:
+    return subtree ^ all_taxa if subtree & 1 else subtree
+
+
+def _is_nontrivial(split: int, num_taxa: int) -> bool:
+    return 1 < split.bit_count() < num_taxa - 1
+
+
+class SplitIndex:
+    """Splits of trees as integer bitsets over a fixed ordering of taxa.
+
+    Each split is canonicalised to the side not containing the first
+    taxon, so splits of any tree over the same taxa can be used as
+    keys regardless of where the trees are rooted.
+
+    Parameters
+    ----------
+    taxa : Iterable[str]
+        The fixed ordering of the taxa.
+
+    """
+
+    __slots__ = ("_all_taxa", "bits", "taxa")
+
+    def __init__(self, taxa: Iterable[str]) -> None:
+        self.taxa = tuple(taxa)
+        self.bits = taxon_bits(self.taxa)
+        self._all_taxa = (1 << len(self.taxa)) - 1
+
+    def node_splits(self, tree: PhyloNode) -> Iterator[tuple[PhyloNode, int]]:
+        """The split of each internal, non-root node of a tree.
+
+        The splits are found in a single postorder pass over the tree.
+
+        Parameters
+        ----------
+        tree : PhyloNode
+            The tree to find the splits of.
+
+        Yields
+        ------
+        tuple[PhyloNode, int]
+            Each internal node, other than the root, with its split.
+
+        Raises
+        ------
+        ValueError
+            If the tree's tips differ from the taxa of the index.
+
+        """
+        for node, subtree, children in _iter_subtrees(tree, self.bits):
+            if children and node.parent is not None:
+                yield node, _canonical(subtree, self._all_taxa)
+
+    def is_nontrivial(self, split: int) -> bool:
+        """Whether a split has at least two taxa on each side.
+
+        Parameters
+        ----------
+        split : int
+            The split bitset.
+
+        Returns
+        -------
+        bool
+            True if the split is non-trivial.
+
+        """
+        return _is_nontrivial(split, len(self.taxa))
+
+    def split_taxa(self, split: int) -> list[str]:
+        """The taxa on the canonical side of a split.
+
+        Parameters
+        ----------
+        split : int
+            The split bitset.
+
+        Returns
+        -------
+        list[str]
+            The taxa whose bits are set, in the order of the index.
+
+        """
+        return [name for name, bit in self.bits.items() if split & bit]
+
+
+def tree_splits(tree: PhyloNode, bits: dict[str, int]) -> list[int]:
+    """The non-trivial splits of a tree as sorted integer bitsets.
+
+    The splits are found in a single postorder pass. Each split is
+    canonicalised to the side not containing the first taxon, so a
+    split is the same regardless of where the tree is rooted.
+
+    Parameters
+    ----------
+    tree : PhyloNode
+        The tree to find the splits of.
+    bits : dict[str, int]
+        The bit of each taxon, as from taxon_bits.
+
+    Returns
+    -------
+    list[int]
+        The sorted, distinct non-trivial splits of the tree.
+
+    Raises
+    ------
+    ValueError
+        If the tree's tips differ from the taxa of bits.
+
+    """
+    num_taxa = len(bits)
+    all_taxa = (1 << num_taxa) - 1
+
+    splits = set()
+    for node, subtree, _ in _iter_subtrees(tree, bits):
+        if node.is_tip():
+            continue
+        split = _canonical(subtree, all_taxa)
+        if _is_nontrivial(split, num_taxa):
+            splits.add(split)
+
+    return sorted(splits)
+
+
+def weighted_tree_splits(
+    tree: PhyloNode,
+    bits: dict[str, int],
+) -> tuple[list[int], list[float], list[float]]:
+    """The splits of a tree with the lengths of their branches.
+
+    Where the tree is rooted on a branch, the lengths of the two
+    branches either side of the root are summed.
+
+    Parameters
+    ----------
+    tree : PhyloNode
+        The tree to find the splits of.
+    bits : dict[str, int]
+        The bit of each taxon, as from taxon_bits.
+
+    Returns
+    -------
+    tuple[list[int], list[float], list[float]]
+        The sorted, distinct non-trivial splits of the tree, the branch
+        length of each, and the length of the terminal branch of each
+        taxon in the order of bits.
+
+    Raises
+    ------
+    ValueError
+        If the tree's tips differ from the taxa of bits.
+
+    """
+    num_taxa = len(bits)
+    all_taxa = (1 << num_taxa) - 1
+
+    lengths: dict[int, float] = {}
+    for node, subtree, _ in _iter_subtrees(tree, bits):
+        if node.parent is None:
+            continue
+        split = _canonical(subtree, all_taxa)
+        lengths[split] = lengths.get(split, 0.0) + (node.length or 0.0)
+
+    splits = sorted(split for split in lengths if _is_nontrivial(split, num_taxa))
+    terminal = [lengths.get(_canonical(bit, all_taxa), 0.0) for bit in bits.values()]
+    return splits, [lengths[split] for split in splits], terminal
+
+
+def tree_vertices(tree: PhyloNode, bits: dict[str, int]) -> list[list[int]]:
+    """The taxa in each direction away from each internal vertex of a tree.
+
+    Vertices with fewer than three directions, such as the root of a
+    rooted tree, are omitted.
+
+    Parameters
+    ----------
+    tree : PhyloNode
+        The tree to find the vertices of.
+    bits : dict[str, int]
+        The bit of each taxon, as from taxon_bits.
+
+    Returns
+    -------
+    list[list[int]]
+        For each vertex, the bitsets of the taxa in each direction.
+
+    Raises
+    ------
+    ValueError
+        If the tree's tips differ from the taxa of bits.
+
+    """
+    all_taxa = (1 << len(bits)) - 1
+
+    vertices = []
+    for node, subtree, children in _iter_subtrees(tree, bits):
+        directions = list(children)
+        if node.parent is not None:
+            directions.append(subtree ^ all_taxa)
+        if len(directions) > 2:
+            vertices.append(directions)
+    return vertices
+
+
+def to_words(bitsets: Iterable[int], num_taxa: int) -> np.ndarray:
+    """Pack integer bitsets into rows of little-endian 64-bit words.
+
+    Parameters
+    ----------
+    bitsets : Iterable[int]
+        The bitsets to pack.
+    num_taxa : int
+        The number of taxa the bitsets are over.
+
+    Returns
+    -------
+    np.ndarray
+        A (num_bitsets, num_words) uint64 array.
+
+    """
+    num_words = max(1, (num_taxa + 63) // 64)
+    num_bytes = num_words * 8
+    packed = b"".join(bitset.to_bytes(num_bytes, "little") for bitset in bitsets)
+    return np.frombuffer(packed, dtype="<u8").reshape(-1, num_words)
+
+
+def to_offsets(lengths: Iterable[int]) -> np.ndarray:
+    """The offsets of consecutive runs of the given lengths.
+
+    Parameters
+    ----------
+    lengths : Iterable[int]
+        The length of each run.
+
+    Returns
+    -------
+    np.ndarray
+        The int64 offsets of each run, with the total length last.
+
+    """
+    offsets = [0]
+    for length in lengths:
+        offsets.append(offsets[-1] + length)
+    return np.array(offsets, dtype=np.int64)
+
+
+def pack_splits(
+    tree_split_lists: Iterable[list[int]],
+    num_taxa: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pack the splits of many trees into contiguous arrays.
+
+    Parameters
+    ----------
+    tree_split_lists : Iterable[list[int]]
+        The sorted splits of each tree, as from tree_splits.
+    num_taxa : int
+        The number of taxa the splits are over.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        A (num_splits, num_words) uint64 array of the splits as
+        little-endian words, and the offsets of each tree's splits
+        into it, of length num_trees + 1.
+
+    """
+    tree_split_lists = list(tree_split_lists)
+    words = to_words(
+        (split for splits in tree_split_lists for split in splits),
+        num_taxa,
+    )
+    return words, to_offsets(len(splits) for splits in tree_split_lists)
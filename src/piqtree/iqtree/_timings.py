@@ -0,0 +1,59 @@
+"""Timing breakdowns of calls to IQ-TREE."""
+
+import contextlib
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from piqtree.iqtree._progress import ProgressTracker
+
+
+class CallTimer:
+    """Wall-clock seconds spent in each step of a call.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether steps are timed. If not, timing a step does nothing.
+
+    """
+
+    def __init__(self, *, enabled: bool) -> None:
+        self.enabled = enabled
+        self.steps: dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Time the code run within the context as the named step."""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.steps[name] = self.steps.get(name, 0.0) + elapsed
+
+    def timings(self, tracker: ProgressTracker | None) -> dict[str, Any]:
+        """The timing breakdown of the call.
+
+        Parameters
+        ----------
+        tracker : ProgressTracker | None
+            The tracker which followed IQ-TREE's output, if any.
+
+        Returns
+        -------
+        dict[str, Any]
+            Seconds spent in each step, the seconds spent in each of
+            IQ-TREE's phases as "iqtree_phases", and the "total".
+
+        """
+        timings: dict[str, Any] = dict(self.steps)
+        if tracker is not None:
+            timings["iqtree_phases"] = dict(tracker.phase_times)
+        timings["total"] = time.perf_counter() - self._start
+        return timings
@@ -1,25 +1,49 @@
 """Python wrappers to tree searching functions in the IQ-TREE library."""
 
+import functools
+import hashlib
+import json
+import logging
+import os
+import pathlib
 import statistics
-from collections.abc import Callable, Iterable, Sequence
+import tempfile
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from typing import Any, cast
 
 import numpy as np
-import yaml
-from _piqtree import iq_build_tree, iq_consensus_tree, iq_fit_tree, iq_nj_tree
+from _piqtree import (
+    __iqtree_version__,
+    iq_build_tree,
+    iq_consensus_tree,
+    iq_fit_tree,
+    iq_nj_tree,
+)
 from cogent3 import make_tree
 from cogent3.core.alignment import Alignment
 from cogent3.core.tree import PhyloNode
 from cogent3.evolve.fast_distance import DistanceMatrix
 
 from piqtree.exceptions import ParseIqTreeError
+from piqtree.iqtree._alignment_handle import AlignmentHandle, encode_alignment
+from piqtree.iqtree._decode import load_yaml
 from piqtree.iqtree._decorator import iqtree_func
+from piqtree.iqtree._distance_matrix import CondensedDistanceMatrix
 from piqtree.iqtree._parse_tree_parameters import parse_model_parameters
+from piqtree.iqtree._progress import ProgressCallback, report_progress
+from piqtree.iqtree._splits import SplitIndex
+from piqtree.iqtree._timings import CallTimer
 from piqtree.model import Model, make_model
-from piqtree.util import get_newick, process_rand_seed_nonzero, validate_other_options
-
-iq_build_tree = iqtree_func(iq_build_tree, hide_files=True)
-iq_fit_tree = iqtree_func(iq_fit_tree, hide_files=True)
+from piqtree.util import (
+    add_output_prefix,
+    get_newick,
+    output_dir,
+    process_rand_seed_nonzero,
+    validate_other_options,
+)
+
+iq_build_tree = iqtree_func(iq_build_tree)
+iq_fit_tree = iqtree_func(iq_fit_tree)
 iq_nj_tree = iqtree_func(iq_nj_tree, hide_files=True)
 iq_consensus_tree = iqtree_func(iq_consensus_tree, hide_files=True)
 
@@ -91,16 +115,21 @@ INVALID_BUILD_TREE_PARAMS = [
     "-bb",  # bootstrap replicates
     "-nt",  # threads
     "-ntmax",  # threads
+    "-pre",  # output prefix
 ]
 
 
 def build_tree(
-    aln: Alignment,
+    aln: Alignment | AlignmentHandle,
     model: Model | str,
     rand_seed: int | None = None,
     bootstrap_replicates: int | None = None,
     num_threads: int | None = None,
     other_options: str = "",
+    *,
+    checkpoint: str | os.PathLike | None = None,
+    progress: ProgressCallback | logging.Logger | None = None,
+    timings: bool = False,
 ) -> PhyloNode:
     """Reconstruct a phylogenetic tree.
 
@@ -108,7 +137,7 @@ def build_tree(
 
     Parameters
     ----------
-    aln : Alignment
+    aln : Alignment | AlignmentHandle
         The sequence alignment.
     model : Model | str
         The substitution model with base frequencies and rate heterogeneity.
@@ -123,41 +152,155 @@ def build_tree(
         If 0 is specified, IQ-TREE attempts to find the optimal number of threads.
     other_options: str, optional
         Additional command line options for IQ-TREE.
+    checkpoint: str | os.PathLike | None, optional
+        Directory to keep IQ-TREE's checkpoint and output files in, by
+        default None (a temporary directory which is removed). A call
+        with the same alignment and arguments resumes the search from
+        the last checkpoint, or returns the finished result.
+    progress: ProgressCallback | logging.Logger | None, optional
+        A callback for the ProgressEvent reports made as IQ-TREE's output
+        is followed, or a logger to log them, by default None (no reports).
+        The reports are delivered in the calling thread once IQ-TREE has
+        returned. Following the output serialises every IQ-TREE call in
+        the process: calls from other threads wait until a call reporting
+        its progress or timing its phases has finished.
+    timings: bool, optional
+        Whether to time the call, by default False. If True, the seconds
+        spent encoding the alignment ("encode"), in IQ-TREE ("iqtree")
+        and in each of its phases ("iqtree_phases"), parsing its output
+        ("parse_yaml"), building the tree ("process_tree") and in total
+        ("total") are stored in the tree's params as "timings".
 
     Returns
     -------
     PhyloNode
         The IQ-TREE maximum likelihood tree from the given alignment.
 
+    Notes
+    -----
+    The files of a search are named by a hash of the alignment's
+    content and the arguments other than num_threads, so one directory
+    can hold the searches of many alignments. Concurrent calls must not
+    share a search.
+
     """
     validate_other_options(other_options, INVALID_BUILD_TREE_PARAMS)
 
     if isinstance(model, str):
         model = make_model(model)
 
-    rand_seed = process_rand_seed_nonzero(rand_seed)
-
     if bootstrap_replicates is None:
         bootstrap_replicates = 0
 
     if num_threads is None:
         num_threads = 1
 
-    names = aln.names
-    seqs = [str(seq) for seq in aln.iter_seqs(names)]
-
-    yaml_result = yaml.safe_load(
-        iq_build_tree(
-            names,
-            seqs,
-            str(model),
-            rand_seed,
-            bootstrap_replicates,
-            num_threads,
-            other_options,
-        ),
+    timer = CallTimer(enabled=timings)
+    with timer.step("encode"):
+        names, seqs = encode_alignment(aln)
+
+    with timer.step("iqtree"), report_progress(progress, track=timings) as tracker:
+        if checkpoint is None:
+            with output_dir() as out_dir:
+                yaml_result = iq_build_tree(
+                    names,
+                    seqs,
+                    str(model),
+                    process_rand_seed_nonzero(rand_seed),
+                    bootstrap_replicates,
+                    num_threads,
+                    add_output_prefix(other_options, out_dir / "piqtree"),
+                )
+        else:
+            key = _build_tree_key(
+                names,
+                seqs,
+                str(model),
+                rand_seed,
+                bootstrap_replicates,
+                other_options,
+            )
+            yaml_result = _checkpointed_build_tree(
+                pathlib.Path(checkpoint).absolute() / f"piqtree_{key}",
+                names,
+                seqs,
+                str(model),
+                process_rand_seed_nonzero(rand_seed),
+                bootstrap_replicates,
+                num_threads,
+                other_options,
+            )
+
+    with timer.step("parse_yaml"):
+        tree_yaml = load_yaml(yaml_result)
+    with timer.step("process_tree"):
+        tree = _process_tree_yaml(tree_yaml, names, model)
+
+    if timings:
+        tree.params["timings"] = timer.timings(tracker)
+    return tree
+
+
+def _build_tree_key(
+    names: Sequence[str],
+    seqs: np.ndarray,
+    model: str,
+    rand_seed: int | None,
+    bootstrap_replicates: int,
+    other_options: str,
+) -> str:
+    options = {
+        "iqtree_version": __iqtree_version__,
+        "names": list(names),
+        "shape": list(seqs.shape),
+        "model": model,
+        "rand_seed": rand_seed,
+        "bootstrap_replicates": bootstrap_replicates,
+        "other_options": " ".join(other_options.split()),
+    }
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(seqs, dtype=np.uint8).data)
+    return digest.hexdigest()
+
+
+def _checkpointed_build_tree(
+    prefix: pathlib.Path,
+    names: Sequence[str],
+    seqs: np.ndarray,
+    model: str,
+    rand_seed: int,
+    bootstrap_replicates: int,
+    num_threads: int,
+    other_options: str,
+) -> str:
+    options = add_output_prefix(other_options, prefix)
+
+    # IQ-TREE refuses to rerun a finished search, so its result is kept
+    result_file = prefix.with_name(f"{prefix.name}.result.yaml")
+    if result_file.exists():
+        return result_file.read_text()
+
+    prefix.parent.mkdir(parents=True, exist_ok=True)
+    yaml_result = iq_build_tree(
+        names,
+        seqs,
+        model,
+        rand_seed,
+        bootstrap_replicates,
+        num_threads,
+        options,
     )
-    return _process_tree_yaml(yaml_result, names, model)
+
+    # write to a temporary file first so a killed call never leaves a partial result
+    with tempfile.NamedTemporaryFile(
+        "w",
+        dir=prefix.parent,
+        suffix=".tmp",
+        delete=False,
+    ) as tmp:
+        tmp.write(yaml_result)
+    pathlib.Path(tmp.name).replace(result_file)
+    return yaml_result
 
 
 INVALID_FIT_TREE_PARAMS = [
@@ -167,12 +310,13 @@ INVALID_FIT_TREE_PARAMS = [
     "-m",  # model selection
     "-nt",  # threads
     "-ntmax",  # threads
+    "-pre",  # output prefix
     "-blfix",  # whether to fix current branch lengths
 ]
 
 
 def fit_tree(
-    aln: Alignment,
+    aln: Alignment | AlignmentHandle,
     tree: PhyloNode,
     model: Model | str,
     num_threads: int | None = None,
@@ -187,7 +331,7 @@ def fit_tree(
 
     Parameters
     ----------
-    aln : Alignment
+    aln : Alignment | AlignmentHandle
         The sequence alignment.
     tree : PhyloNode
         The topology to fit branch lengths to.
@@ -218,27 +362,91 @@ def fit_tree(
     if num_threads is None:
         num_threads = 1
 
-    names = aln.names
-    seqs = [str(seq) for seq in aln.iter_seqs(names)]
+    names, seqs = encode_alignment(aln)
     newick = get_newick(tree)
 
-    yaml_result = yaml.safe_load(
-        iq_fit_tree(
-            names,
-            seqs,
-            str(model),
-            newick,
-            bl_fixed,
-            0,
-            num_threads,
-            other_options,
-        ),
-    )
+    with output_dir() as out_dir:
+        yaml_result = load_yaml(
+            iq_fit_tree(
+                names,
+                seqs,
+                str(model),
+                newick,
+                bl_fixed,
+                0,
+                num_threads,
+                add_output_prefix(other_options, out_dir / "piqtree"),
+            ),
+        )
     return _process_tree_yaml(yaml_result, names, model)
 
 
+def fit_trees(
+    aln: Alignment | AlignmentHandle,
+    trees: Iterable[PhyloNode],
+    model: Model | str,
+    num_threads: int | None = None,
+    other_options: str = "",
+    *,
+    bl_fixed: bool = False,
+) -> Iterator[PhyloNode]:
+    """Fit branch lengths and likelihood for each of many trees.
+
+    Given a sequence alignment and a collection of fixed topologies,
+    uses IQ-TREE to fit branch lengths to each tree. The alignment is
+    encoded once (see AlignmentHandle), and each tree is then fitted
+    with its own call to IQ-TREE, as by fit_tree, as it is iterated.
+
+    Parameters
+    ----------
+    aln : Alignment | AlignmentHandle
+        The sequence alignment.
+    trees : Iterable[PhyloNode]
+        The topologies to fit branch lengths to.
+    model : Model | str
+        The substitution model with base frequencies and rate heterogeneity.
+    num_threads: int | None, optional
+        Number of threads for IQ-TREE to use for each fit, by default None
+        (single-threaded).
+        If 0 is specified, IQ-TREE attempts to find the optimal number of threads.
+    bl_fixed: bool, optional
+        If True, evaluates likelihood using the provided branch lengths on the trees.
+        Branch lengths will be treated as constant in this case, with any unspecified
+        branch lengths still being optimised. Otherwise if False, branch lengths are
+        fitted to the trees whether provided or not. By default False.
+    other_options: str, optional
+        Additional command line options for IQ-TREE.
+
+    Returns
+    -------
+    Iterator[PhyloNode]
+        For each tree in order, a phylogenetic tree with the same given
+        topology fitted with branch lengths. A tree IQ-TREE fails to fit
+        raises IqTreeError when it is reached, after the trees before it
+        have been returned.
+
+    """
+    validate_other_options(other_options, INVALID_FIT_TREE_PARAMS)
+
+    if isinstance(model, str):
+        model = make_model(model)
+
+    if not isinstance(aln, AlignmentHandle):
+        aln = AlignmentHandle(aln)
+
+    fit = functools.partial(
+        fit_tree,
+        aln,
+        model=model,
+        num_threads=num_threads,
+        other_options=other_options,
+        bl_fixed=bl_fixed,
+    )
+    return (fit(tree) for tree in trees)
+
+
 def nj_tree(
-    pairwise_distances: DistanceMatrix,
+    pairwise_distances: DistanceMatrix | CondensedDistanceMatrix,
     *,
     allow_negative: bool = False,
 ) -> PhyloNode:
@@ -246,7 +454,7 @@ def nj_tree(
 
     Parameters
     ----------
-    pairwise_distances : DistanceMatrix
+    pairwise_distances : DistanceMatrix | CondensedDistanceMatrix
         Pairwise distances to construct neighbour joining tree from.
     allow_negative : bool, optional
         Whether to allow negative branch lengths in the output.
@@ -261,15 +469,32 @@ def nj_tree(
     --------
     jc_distances : construction of pairwise JC distance matrix from alignment.
 
+    Notes
+    -----
+    IQ-TREE takes the full square matrix as an n x n float64 array in
+    memory, which it may modify, so it is given one of its own: the array
+    of a DistanceMatrix is copied, and a CondensedDistanceMatrix is
+    expanded. Condensed or memory-mapped distances therefore save no
+    memory here, as the full matrix is held for the call.
+
     """
-    if np.isnan(pairwise_distances.array).any():
+    if isinstance(pairwise_distances, CondensedDistanceMatrix):
+        names = list(pairwise_distances.names)
+        has_nan = np.isnan(pairwise_distances.distances).any()
+    else:
+        names = pairwise_distances.keys()
+        has_nan = np.isnan(pairwise_distances.array).any()
+
+    if has_nan:
         msg = "The pairwise distance matrix cannot contain NaN values."
         raise ValueError(msg)
 
-    newick_tree = iq_nj_tree(
-        pairwise_distances.keys(),
-        np.array(pairwise_distances).flatten(),
-    )
+    if isinstance(pairwise_distances, CondensedDistanceMatrix):
+        distances = pairwise_distances.to_square()
+    else:
+        distances = np.array(pairwise_distances.array, dtype=np.float64, order="C")
+
+    newick_tree = iq_nj_tree(names, distances.ravel())
 
     tree = make_tree(newick_tree)
 
@@ -303,27 +528,18 @@ def _transfer_support(
     aggregate: Callable[[Iterable[float]], float],
 ) -> None:
     """Set each consensus clade's support from the input trees' support for the same split."""
-    taxa = frozenset(consensus.get_tip_names())
-    reference = min(taxa)
-
-    def split_key(node: PhyloNode) -> frozenset[str]:
-        side = frozenset(node.get_tip_names())
-        return taxa - side if reference in side else side
+    index = SplitIndex(consensus.get_tip_names())
 
-    lookup: dict[frozenset[str], list[float]] = {}
+    lookup: dict[int, list[float]] = {}
     for tree in trees:
-        for node in tree.postorder():
-            if node.is_tip() or node.is_root():
-                continue
+        for node, split in index.node_splits(tree):
             support = getattr(node, "support", None)
             if support is None:
                 continue
-            lookup.setdefault(split_key(node), []).append(support)
+            lookup.setdefault(split, []).append(support)
 
-    for node in consensus.postorder():
-        if node.is_tip() or node.is_root():
-            continue
-        values = lookup.get(split_key(node))
+    for node, split in index.node_splits(consensus):
+        values = lookup.get(split)
         if values:
             node.support = aggregate(values)
 
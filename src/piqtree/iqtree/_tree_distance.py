@@ -0,0 +1,393 @@
+"""Distances between trees computed from their splits."""
+
+import functools
+from collections.abc import Callable, Sequence
+
+import numpy as np
+from _piqtree import (
+    kf_all_pairs,
+    kf_many_to_many,
+    matching_split_all_pairs,
+    matching_split_many_to_many,
+    quartet_all_pairs,
+    quartet_many_to_many,
+    rf_all_pairs,
+    rf_many_to_many,
+    weighted_rf_all_pairs,
+    weighted_rf_many_to_many,
+)
+from cogent3.core.tree import PhyloNode
+
+from piqtree.iqtree._splits import (
+    pack_splits,
+    taxon_bits,
+    to_offsets,
+    to_words,
+    tree_splits,
+    tree_vertices,
+    weighted_tree_splits,
+)
+
+PackTrees = Callable[[Sequence[PhyloNode], dict[str, int]], tuple]
+
+
+def _tree_distances(
+    trees: PhyloNode | Sequence[PhyloNode],
+    others: Sequence[PhyloNode] | None,
+    pack: PackTrees,
+    all_pairs: Callable[..., np.ndarray],
+    many_to_many: Callable[..., np.ndarray],
+) -> np.ndarray:
+    """Distances between trees with a native kernel.
+
+    Parameters
+    ----------
+    trees : PhyloNode | Sequence[PhyloNode]
+        The trees to compare, or a single tree if others is given.
+    others : Sequence[PhyloNode] | None
+        The trees to compare trees against, or None for all pairs
+        of trees.
+    pack : PackTrees
+        Packs a sequence of trees into the arrays the kernels take,
+        given the bit of each taxon.
+    all_pairs : Callable[..., np.ndarray]
+        The kernel for the pairwise distances of one packed set.
+    many_to_many : Callable[..., np.ndarray]
+        The kernel for the distances between two packed sets.
+
+    Returns
+    -------
+    np.ndarray
+        The (n, n) pairwise distances without others, a 1D array for a
+        single tree, otherwise an array of shape (len(trees), len(others)).
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips, or if a single
+        tree is given without others.
+
+    """
+    single = isinstance(trees, PhyloNode)
+    if single:
+        if others is None:
+            msg = "others must be given to compare a single tree against."
+            raise ValueError(msg)
+        trees = [trees]
+
+    all_trees = [*trees, *(others or [])]
+    if not all_trees:
+        return np.zeros((0, 0))
+
+    bits = taxon_bits(sorted(all_trees[0].get_tip_names()))
+    packed = pack(trees, bits)
+    if others is None:
+        return all_pairs(*packed)
+
+    distances = many_to_many(*packed, *pack(others, bits))
+    return distances[0] if single else distances
+
+
+def _pack_tree_splits(
+    trees: Sequence[PhyloNode],
+    bits: dict[str, int],
+) -> tuple[np.ndarray, np.ndarray]:
+    return pack_splits((tree_splits(tree, bits) for tree in trees), len(bits))
+
+
+def _pack_counted_splits(
+    trees: Sequence[PhyloNode],
+    bits: dict[str, int],
+) -> tuple[np.ndarray, np.ndarray, int]:
+    return (*_pack_tree_splits(trees, bits), len(bits))
+
+
+def _pack_weighted_splits(
+    trees: Sequence[PhyloNode],
+    bits: dict[str, int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    weighted = [weighted_tree_splits(tree, bits) for tree in trees]
+    words, offsets = pack_splits((splits for splits, _, _ in weighted), len(bits))
+    lengths = np.array(
+        [length for _, tree_lengths, _ in weighted for length in tree_lengths],
+        dtype=np.float64,
+    )
+    terminal = np.array(
+        [tree_terminal for _, _, tree_terminal in weighted],
+        dtype=np.float64,
+    ).reshape(len(weighted), len(bits))
+    return words, offsets, lengths, terminal
+
+
+def _pack_vertices(
+    trees: Sequence[PhyloNode],
+    bits: dict[str, int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    vertices = [tree_vertices(tree, bits) for tree in trees]
+    directions = to_words(
+        (direction for tree in vertices for vertex in tree for direction in vertex),
+        len(bits),
+    )
+    direction_offsets = to_offsets(len(vertex) for tree in vertices for vertex in tree)
+    return directions, direction_offsets, to_offsets(len(tree) for tree in vertices)
+
+
+def robinson_foulds(
+    trees: PhyloNode | Sequence[PhyloNode],
+    others: Sequence[PhyloNode] | None = None,
+    *,
+    normalized: bool = False,
+    num_threads: int | None = None,
+) -> np.ndarray:
+    """Robinson-Foulds distances between trees.
+
+    For a sequence of trees, returns a numpy array containing the
+    pairwise distances between the trees. If others is also given,
+    only the distances between trees and others are calculated.
+
+    Parameters
+    ----------
+    trees : PhyloNode | Sequence[PhyloNode]
+        The sequence of trees to calculate the pairwise Robinson-Foulds
+        distances of, or a single reference tree if others is given.
+    others : Sequence[PhyloNode] | None, optional
+        A second sequence of trees to calculate the Robinson-Foulds
+        distances to, by default None.
+    normalized : bool, optional
+        Whether to divide each distance by the total number of
+        non-trivial splits of the two trees, giving values between 0
+        and 1, by default False.
+    num_threads: int | None, optional
+        Number of threads to use, by default None (uses all available threads).
+
+    Returns
+    -------
+    np.ndarray
+        The Robinson-Foulds distances. Without others this is the
+        (n, n) matrix of pairwise distances. For a single tree and
+        others it is a 1D array of length len(others), otherwise an
+        array of shape (len(trees), len(others)).
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips, or if a single
+        tree is given without others.
+
+    """
+    if num_threads is None:
+        num_threads = 0
+
+    return _tree_distances(
+        trees,
+        others,
+        _pack_tree_splits,
+        functools.partial(
+            rf_all_pairs,
+            normalized=normalized,
+            num_threads=num_threads,
+        ),
+        functools.partial(
+            rf_many_to_many,
+            normalized=normalized,
+            num_threads=num_threads,
+        ),
+    )
+
+
+def weighted_robinson_foulds(
+    trees: PhyloNode | Sequence[PhyloNode],
+    others: Sequence[PhyloNode] | None = None,
+    *,
+    num_threads: int | None = None,
+) -> np.ndarray:
+    """Weighted Robinson-Foulds distances between trees.
+
+    The sum, over all branches of both trees, of the absolute
+    difference in branch length, where a branch missing from a tree
+    has length 0.
+
+    Parameters
+    ----------
+    trees : PhyloNode | Sequence[PhyloNode]
+        The sequence of trees to calculate the pairwise distances of,
+        or a single reference tree if others is given.
+    others : Sequence[PhyloNode] | None, optional
+        A second sequence of trees to calculate the distances to,
+        by default None.
+    num_threads: int | None, optional
+        Number of threads to use, by default None (uses all available threads).
+
+    Returns
+    -------
+    np.ndarray
+        The distances, shaped as for robinson_foulds.
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips, or if a single
+        tree is given without others.
+
+    """
+    if num_threads is None:
+        num_threads = 0
+
+    return _tree_distances(
+        trees,
+        others,
+        _pack_weighted_splits,
+        functools.partial(weighted_rf_all_pairs, num_threads=num_threads),
+        functools.partial(weighted_rf_many_to_many, num_threads=num_threads),
+    )
+
+
+def kuhner_felsenstein(
+    trees: PhyloNode | Sequence[PhyloNode],
+    others: Sequence[PhyloNode] | None = None,
+    *,
+    num_threads: int | None = None,
+) -> np.ndarray:
+    """Kuhner-Felsenstein branch score distances between trees.
+
+    The square root of the sum, over all branches of both trees, of
+    the squared difference in branch length, where a branch missing
+    from a tree has length 0.
+
+    Parameters
+    ----------
+    trees : PhyloNode | Sequence[PhyloNode]
+        The sequence of trees to calculate the pairwise distances of,
+        or a single reference tree if others is given.
+    others : Sequence[PhyloNode] | None, optional
+        A second sequence of trees to calculate the distances to,
+        by default None.
+    num_threads: int | None, optional
+        Number of threads to use, by default None (uses all available threads).
+
+    Returns
+    -------
+    np.ndarray
+        The distances, shaped as for robinson_foulds.
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips, or if a single
+        tree is given without others.
+
+    """
+    if num_threads is None:
+        num_threads = 0
+
+    return _tree_distances(
+        trees,
+        others,
+        _pack_weighted_splits,
+        functools.partial(kf_all_pairs, num_threads=num_threads),
+        functools.partial(kf_many_to_many, num_threads=num_threads),
+    )
+
+
+def quartet_distance(
+    trees: PhyloNode | Sequence[PhyloNode],
+    others: Sequence[PhyloNode] | None = None,
+    *,
+    num_threads: int | None = None,
+) -> np.ndarray:
+    """Quartet distances between trees.
+
+    Half the size of the symmetric difference between the sets of
+    quartets resolved by each tree. For binary trees this is the
+    number of sets of four taxa on which the trees differ.
+
+    Parameters
+    ----------
+    trees : PhyloNode | Sequence[PhyloNode]
+        The sequence of trees to calculate the pairwise distances of,
+        or a single reference tree if others is given.
+    others : Sequence[PhyloNode] | None, optional
+        A second sequence of trees to calculate the distances to,
+        by default None.
+    num_threads: int | None, optional
+        Number of threads to use, by default None (uses all available threads).
+
+    Returns
+    -------
+    np.ndarray
+        The distances, shaped as for robinson_foulds.
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips, or if a single
+        tree is given without others.
+
+    Notes
+    -----
+    Each pair of trees with n taxa takes O(n^3 / 64) time.
+
+    """
+    if num_threads is None:
+        num_threads = 0
+
+    return _tree_distances(
+        trees,
+        others,
+        _pack_vertices,
+        functools.partial(quartet_all_pairs, num_threads=num_threads),
+        functools.partial(quartet_many_to_many, num_threads=num_threads),
+    )
+
+
+def matching_split_distance(
+    trees: PhyloNode | Sequence[PhyloNode],
+    others: Sequence[PhyloNode] | None = None,
+    *,
+    num_threads: int | None = None,
+) -> np.ndarray:
+    """Matching split distances between trees.
+
+    The minimum, over one-to-one pairings of the non-trivial splits of
+    two trees, of the total number of taxa that must be moved to turn
+    each split into its pair. If one tree has fewer splits, the extra
+    splits of the other are paired with the trivial split.
+
+    Parameters
+    ----------
+    trees : PhyloNode | Sequence[PhyloNode]
+        The sequence of trees to calculate the pairwise distances of,
+        or a single reference tree if others is given.
+    others : Sequence[PhyloNode] | None, optional
+        A second sequence of trees to calculate the distances to,
+        by default None.
+    num_threads: int | None, optional
+        Number of threads to use, by default None (uses all available threads).
+
+    Returns
+    -------
+    np.ndarray
+        The distances, shaped as for robinson_foulds.
+
+    Raises
+    ------
+    ValueError
+        If the trees do not all have the same tips, or if a single
+        tree is given without others.
+
+    Notes
+    -----
+    Each pair of trees with n taxa takes O(n^3) time to find the
+    optimal pairing.
+
+    """
+    if num_threads is None:
+        num_threads = 0
+
+    return _tree_distances(
+        trees,
+        others,
+        _pack_counted_splits,
+        functools.partial(matching_split_all_pairs, num_threads=num_threads),
+        functools.partial(matching_split_many_to_many, num_threads=num_threads),
+    )
@@ -1,6 +1,13 @@
+import contextlib
+import os
+import pathlib
+import random
 import secrets
-from collections.abc import Iterable
+import tempfile
+from collections.abc import Iterable, Iterator
 
+import numpy as np
+from cogent3.core.alignment import Alignment
 from cogent3.core.tree import PhyloNode
 
 
@@ -12,10 +19,95 @@ def validate_other_options(other_options: str, banned_options: Iterable[str]) ->
             raise ValueError(msg)
 
 
+@contextlib.contextmanager
+def output_dir() -> Iterator[pathlib.Path]:
+    """A temporary directory for the output files of one IQ-TREE call.
+
+    The directory and its contents are removed on exiting the context.
+
+    Yields
+    ------
+    pathlib.Path
+        The absolute path of the directory.
+    """
+    with tempfile.TemporaryDirectory(prefix="piqtree_") as tmp_dir:
+        yield pathlib.Path(tmp_dir).absolute()
+
+
+def add_output_prefix(other_options: str, prefix: str | os.PathLike[str]) -> str:
+    """Add an output prefix to the IQ-TREE command line options.
+
+    Parameters
+    ----------
+    other_options : str
+        The additional command line options for IQ-TREE.
+    prefix : str | os.PathLike[str]
+        The path IQ-TREE's output files are named from, such as
+        ``output_dir() / "piqtree"``.
+
+    Returns
+    -------
+    str
+        The command line options with the output prefix.
+
+    Raises
+    ------
+    ValueError
+        If the prefix contains whitespace, which IQ-TREE would split
+        into separate options.
+    """
+    prefix = os.fspath(prefix)
+    if any(char.isspace() for char in prefix):
+        msg = (
+            f"The IQ-TREE output prefix must not contain whitespace: {prefix!r}. "
+            "Use a directory without whitespace, or for temporary output set "
+            "TMPDIR to one."
+        )
+        raise ValueError(msg)
+    return f"{other_options} -pre {prefix}".strip()
+
+
 def get_newick(tree: PhyloNode) -> str:
     return tree.get_newick(with_distances=True, escape_name=False)
 
 
+def get_seq_array(aln: Alignment) -> np.ndarray:
+    """Encode the sequences of an alignment for IQ-TREE.
+
+    Maps cogent3's encoded sequences straight to their characters
+    without building a Python string per sequence. Each row is
+    terminated by 0 so IQ-TREE can read the rows in place as C strings.
+
+    Parameters
+    ----------
+    aln : Alignment
+        The alignment to encode.
+
+    Returns
+    -------
+    np.ndarray
+        A (num_seqs, len(aln) + 1) uint8 array of the sequence characters,
+        with rows in the order of aln.names.
+
+    Raises
+    ------
+    ValueError
+        If a sequence holds a code outside the alphabet of the moltype.
+    """
+    chars = np.frombuffer(aln.moltype.most_degen_alphabet().as_bytes(), dtype=np.uint8)
+    codes = aln.array_seqs
+    if codes.size and (codes.min() < 0 or codes.max() >= len(chars)):
+        msg = (
+            f"Alignment holds codes outside the {len(chars)} characters of "
+            f"the {aln.moltype.label!r} alphabet."
+        )
+        raise ValueError(msg)
+
+    seqs = np.zeros((aln.num_seqs, len(aln) + 1), dtype=np.uint8)
+    np.take(chars, codes, out=seqs[:, :-1])
+    return seqs
+
+
 def make_rand_seed() -> int:
     """Make a 32-bit random seed.
 
@@ -28,6 +120,26 @@ def make_rand_seed() -> int:
     return seed if seed < (1 << 31) else seed - (1 << 32)
 
 
+def derive_rand_seeds(rand_seed: int, num_seeds: int) -> list[int]:
+    """Derive a reproducible sequence of 32-bit random seeds.
+
+    Parameters
+    ----------
+    rand_seed : int
+        The seed the sequence is derived from.
+    num_seeds : int
+        The number of seeds to derive.
+
+    Returns
+    -------
+    list[int]
+        32-bit random seeds, the same for the same rand_seed.
+    """
+    rng = random.Random(rand_seed)  # noqa: S311
+    seeds = [rng.getrandbits(32) for _ in range(num_seeds)]
+    return [seed if seed < (1 << 31) else seed - (1 << 32) for seed in seeds]
+
+
 def make_nonzero_rand_seed() -> int:
     """Make a non-zero 32-bit random seed.
 
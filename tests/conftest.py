@@ -1,9 +1,36 @@
+import os
 import pathlib
+import sys
+import time
+from collections.abc import Callable
+from types import ModuleType
 
 import pytest
 from cogent3 import PhyloNode, load_aligned_seqs, make_tree
 from cogent3.core.alignment import Alignment
 
+from piqtree.iqtree._decorator import iqtree_func
+
+# the YAML results returned by IQ-TREE for four_otu, with the tips numbered
+NEWICK = (
+    "(0:0.0058955371,1:0.0026486308,(2:0.0230933557,3:0.3069062230):0.01387802789);"
+)
+RAW_TREE = f"""\
+CandidateSet:
+  0: "-6519.33018689 {NEWICK}"
+PhyloTree:
+  newick: "{NEWICK}"
+"""
+RAW_MODELS = """\
+best_model_AIC: HKY+F
+best_model_AICc: HKY+F
+best_model_BIC: JC
+HKY+F: "-100.5 11 0.25"
+JC: "-110.5 7 0.3"
+"""
+
+FakeIqTree = Callable[[ModuleType, str, str, str], None]
+
 
 @pytest.fixture(scope="session")
 def DATA_DIR() -> pathlib.Path:
@@ -74,3 +101,30 @@ def four_taxon_unrooted_tree() -> PhyloNode:  # Unrooted
 @pytest.fixture
 def five_taxon_rooted_tree() -> PhyloNode:  # Rooted
     return make_tree("(((a:0.1,b:0.2):0.05,(c:0.3,d:0.1):0.2):0.05,e:0.4);")
+
+
+@pytest.fixture
+def raw_tree() -> str:
+    return RAW_TREE
+
+
+@pytest.fixture
+def raw_models() -> str:
+    return RAW_MODELS
+
+
+@pytest.fixture
+def fake_iqtree(monkeypatch: pytest.MonkeyPatch) -> FakeIqTree:
+    # replaces a library function with one writing output and returning a result
+    def fake(module: ModuleType, name: str, output: str, result: str) -> None:
+        def run(*_: object) -> str:
+            for line in output.splitlines(keepends=True):
+                time.sleep(0.001)
+                # the stdout file descriptor, which differs from 1 under
+                # pytest's capturing
+                os.write(sys.stdout.fileno(), line.encode())
+            return result
+
+        monkeypatch.setattr(module, name, iqtree_func(run))
+
+    return fake
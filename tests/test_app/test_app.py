@@ -1,3 +1,5 @@
+import pathlib
+
 import pytest
 from cogent3 import PhyloNode, get_app, make_tree
 from cogent3.core.alignment import Alignment
@@ -25,6 +27,17 @@ def test_piq_build_tree_support(four_otu: Alignment) -> None:
     assert all(supports)
 
 
+def test_piq_build_tree_checkpoint(
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    app = get_app("piq_build_tree", model="JC", rand_seed=1, checkpoint=tmp_path)
+    first = app(four_otu)
+    second = app(four_otu)
+    assert list(tmp_path.glob("*.ckp.gz"))
+    assert second.same_topology(first)
+
+
 def test_piq_fit_tree(three_otu: Alignment) -> None:
     tree = make_tree(tip_names=three_otu.names)
     app = get_app("model", "JC69", tree=tree)
@@ -130,6 +143,15 @@ def test_piq_simulate_alignment(five_taxon_rooted_tree: PhyloNode) -> None:
     assert len(aln) == 1000
 
 
+def test_piq_simulate_alignment_seeded(five_taxon_rooted_tree: PhyloNode) -> None:
+    app = get_app("piq_simulate_alignment", model="JC", rand_seed=1)
+    aln = app(five_taxon_rooted_tree)
+
+    expected = piqtree.simulate_alignment(five_taxon_rooted_tree, "JC", rand_seed=1)
+    assert isinstance(aln, Alignment)
+    assert aln.to_dict() == expected.to_dict()
+
+
 @pytest.mark.parametrize(
     ("app_name", "kwargs"),
     [
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from cogent3 import make_tree
+from cogent3.core.alignment import Alignment
+
+import piqtree
+from piqtree import AlignmentHandle
+from piqtree.util import get_seq_array
+
+
+def test_alignment_handle(five_otu: Alignment) -> None:
+    handle = AlignmentHandle(five_otu)
+
+    assert handle.names == tuple(five_otu.names)
+    assert handle.num_seqs == five_otu.num_seqs
+    assert len(handle) == len(five_otu)
+    np.testing.assert_array_equal(handle.seqs, get_seq_array(five_otu))
+    assert repr(handle) == f"AlignmentHandle(num_seqs=5, length={len(five_otu)})"
+
+
+def test_alignment_handle_read_only(five_otu: Alignment) -> None:
+    handle = AlignmentHandle(five_otu)
+
+    with pytest.raises(ValueError, match="read-only"):
+        handle.seqs[0, 0] = 0
+
+
+def test_handle_jc_distances(five_otu: Alignment) -> None:
+    expected = piqtree.jc_distances(five_otu)
+    got = piqtree.jc_distances(AlignmentHandle(five_otu))
+
+    np.testing.assert_allclose(got.array, expected.array)
+    assert got.names == expected.names
+
+
+def test_handle_build_and_fit_tree(four_otu: Alignment) -> None:
+    handle = AlignmentHandle(four_otu)
+
+    expected = piqtree.build_tree(four_otu, "JC", rand_seed=1)
+    got = piqtree.build_tree(handle, "JC", rand_seed=1)
+    assert got.same_topology(expected)
+    assert got.params["lnL"] == pytest.approx(expected.params["lnL"])
+
+    topology = make_tree(tip_names=four_otu.names)
+    fitted = piqtree.fit_tree(handle, topology, "JC")
+    assert fitted.params["lnL"] == pytest.approx(
+        piqtree.fit_tree(four_otu, topology, "JC").params["lnL"],
+    )
+
+
+def test_handle_model_finder(four_otu: Alignment) -> None:
+    handle = AlignmentHandle(four_otu)
+
+    got = piqtree.model_finder(handle, model_set={"JC", "HKY"}, rand_seed=1)
+    expected = piqtree.model_finder(four_otu, model_set={"JC", "HKY"}, rand_seed=1)
+    assert str(got.best_bic) == str(expected.best_bic)
@@ -0,0 +1,89 @@
+import pathlib
+
+import pytest
+from cogent3.core.alignment import Alignment
+
+import piqtree
+import piqtree.iqtree._tree as tree_module
+
+
+class SearchKilledError(Exception):
+    pass
+
+
+@pytest.fixture
+def prefixes(monkeypatch: pytest.MonkeyPatch, raw_tree: str) -> list[str]:
+    prefixes = []
+
+    def fake_build_tree(*args: object) -> str:
+        other_options = str(args[-1])
+        prefix = other_options.rsplit("-pre ", maxsplit=1)[-1]
+        prefixes.append(prefix)
+
+        # the first call is killed after IQ-TREE saved a checkpoint
+        checkpoint = pathlib.Path(f"{prefix}.ckp.gz")
+        if not checkpoint.exists():
+            checkpoint.write_bytes(b"")
+            raise SearchKilledError
+        return raw_tree
+
+    monkeypatch.setattr(tree_module, "iq_build_tree", fake_build_tree)
+    return prefixes
+
+
+def test_build_tree_resume(
+    prefixes: list[str],
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    with pytest.raises(SearchKilledError):
+        piqtree.build_tree(four_otu, "JC", rand_seed=1, checkpoint=tmp_path)
+    assert not list(tmp_path.glob("*.result.yaml"))
+
+    tree = piqtree.build_tree(four_otu, "JC", rand_seed=1, checkpoint=tmp_path)
+    assert len(prefixes) == 2
+    assert prefixes[0] == prefixes[1]
+    assert pathlib.Path(prefixes[0]).parent == tmp_path.absolute()
+    assert tree.params["lnL"] == pytest.approx(-6519.33018689)
+    assert set(tree.get_tip_names()) == set(four_otu.names)
+
+    # a finished search returns the stored result
+    again = piqtree.build_tree(
+        four_otu,
+        "JC",
+        rand_seed=1,
+        num_threads=2,
+        checkpoint=tmp_path,
+    )
+    assert len(prefixes) == 2
+    assert again.same_topology(tree)
+
+
+def test_build_tree_checkpoint_arguments(
+    prefixes: list[str],
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    for model, rand_seed in ("JC", 1), ("JC", 2), ("HKY", 1):
+        with pytest.raises(SearchKilledError):
+            piqtree.build_tree(four_otu, model, rand_seed, checkpoint=tmp_path)
+    assert len(set(prefixes)) == 3
+
+
+def test_build_tree_checkpoint_whitespace(
+    prefixes: list[str],
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    with pytest.raises(ValueError, match="must not contain whitespace"):
+        piqtree.build_tree(four_otu, "JC", checkpoint=tmp_path / "my checkpoint")
+    assert not prefixes
+
+
+def test_build_tree_checkpoint(tmp_path: pathlib.Path, four_otu: Alignment) -> None:
+    expected = piqtree.build_tree(four_otu, "JC", rand_seed=1)
+    got = piqtree.build_tree(four_otu, "JC", rand_seed=1, checkpoint=tmp_path)
+
+    assert list(tmp_path.glob("*.ckp.gz"))
+    assert got.same_topology(expected)
+    assert got.params["lnL"] == pytest.approx(expected.params["lnL"])
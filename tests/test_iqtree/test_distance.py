@@ -1,6 +1,12 @@
+import pathlib
+
+import numpy as np
+import pytest
 from cogent3.core.alignment import Alignment
+from numpy.testing import assert_array_equal
 
-from piqtree import jc_distances
+from piqtree import CondensedDistanceMatrix, jc_distances
+from piqtree.iqtree._jc_distance import _dists_to_distmatrix
 
 
 def test_jc_distance(five_otu: Alignment) -> None:
@@ -26,3 +32,125 @@ def test_jc_distance(five_otu: Alignment) -> None:
     assert (
         0 < dists["Manatee", "Dugong"] < dists["Manatee", "Rhesus"]
     )  # dugong closer than rhesus
+
+
+def test_dists_to_distmatrix() -> None:
+    names = ["a", "b", "c"]
+    distances = np.array([[0.0, 0.1, 0.2], [0.1, 0.0, 0.3], [0.2, 0.3, 0.0]])
+
+    dists = _dists_to_distmatrix(distances, names)
+
+    assert dists.names == names
+    assert dists["a", "b"] == dists["b", "a"] == 0.1
+    assert dists["a", "c"] == dists["c", "a"] == 0.2
+    assert dists["b", "c"] == dists["c", "b"] == 0.3
+    assert_array_equal(dists.array, distances)
+
+
+@pytest.fixture
+def square_distances() -> np.ndarray:
+    return np.array(
+        [
+            [0.0, 0.1, 0.2, 0.3],
+            [0.1, 0.0, 0.4, 0.5],
+            [0.2, 0.4, 0.0, 0.6],
+            [0.3, 0.5, 0.6, 0.0],
+        ],
+    )
+
+
+def test_condensed_from_square(square_distances: np.ndarray) -> None:
+    names = ["a", "b", "c", "d"]
+    condensed = CondensedDistanceMatrix.from_square(square_distances, names)
+
+    assert condensed.names == tuple(names)
+    assert_array_equal(condensed.distances, [0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+    assert_array_equal(condensed.to_square(), square_distances)
+
+    for i, name1 in enumerate(names):
+        for j, name2 in enumerate(names):
+            assert condensed[name1, name2] == square_distances[i, j]
+
+
+def test_condensed_float32(square_distances: np.ndarray) -> None:
+    condensed = CondensedDistanceMatrix.from_square(
+        square_distances,
+        ["a", "b", "c", "d"],
+        dtype=np.float32,
+    )
+    assert condensed.dtype == np.float32
+    assert condensed.to_square().dtype == np.float64
+
+
+def test_condensed_to_distance_matrix(square_distances: np.ndarray) -> None:
+    names = ["a", "b", "c", "d"]
+    dists = CondensedDistanceMatrix.from_square(
+        square_distances,
+        names,
+    ).to_distance_matrix()
+
+    assert dists.names == names
+    assert_array_equal(dists.array, square_distances)
+
+
+def test_condensed_from_square_memmap(
+    square_distances: np.ndarray,
+    tmp_path: pathlib.Path,
+) -> None:
+    names = ["a", "b", "c", "d"]
+    out = np.memmap(tmp_path / "dists.dat", dtype=np.float32, mode="w+", shape=(6,))
+
+    condensed = CondensedDistanceMatrix.from_square(square_distances, names, out=out)
+
+    assert condensed.distances is out
+    stored = np.memmap(tmp_path / "dists.dat", dtype=np.float32, mode="r")
+    assert_array_equal(stored, np.float32([0.1, 0.2, 0.3, 0.4, 0.5, 0.6]))
+
+
+def test_condensed_from_square_out_wrong_shape(square_distances: np.ndarray) -> None:
+    with pytest.raises(ValueError, match=r"out must have shape \(6,\)"):
+        CondensedDistanceMatrix.from_square(
+            square_distances,
+            ["a", "b", "c", "d"],
+            out=np.empty(5),
+        )
+
+
+def test_condensed_wrong_length() -> None:
+    with pytest.raises(ValueError, match="Expected 3 condensed distances"):
+        CondensedDistanceMatrix(names=("a", "b", "c"), distances=np.zeros(4))
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_jc_distances_condensed(five_otu: Alignment, dtype: type) -> None:
+    dists = jc_distances(five_otu)
+    condensed = jc_distances(five_otu, condensed=True, dtype=dtype)
+
+    assert condensed.names == tuple(five_otu.names)
+    assert condensed.dtype == dtype
+    for name1 in five_otu.names:
+        for name2 in five_otu.names:
+            assert condensed[name1, name2] == pytest.approx(
+                dists[name1, name2],
+                rel=1e-6,
+            )
+
+
+def test_jc_distances_float32_requires_condensed(five_otu: Alignment) -> None:
+    with pytest.raises(ValueError, match="only supported with condensed=True"):
+        jc_distances(five_otu, dtype=np.float32)
+
+
+def test_jc_distances_memmap(five_otu: Alignment, tmp_path: pathlib.Path) -> None:
+    dists = jc_distances(five_otu, condensed=True)
+    out = np.memmap(tmp_path / "dists.dat", dtype=np.float64, mode="w+", shape=(10,))
+
+    condensed = jc_distances(five_otu, condensed=True, out=out)
+
+    assert condensed.distances is out
+    assert_array_equal(condensed.distances, dists.distances)
+
+
+def test_jc_distances_out_requires_condensed(five_otu: Alignment) -> None:
+    with pytest.raises(ValueError, match="only supported with condensed=True"):
+        jc_distances(five_otu, out=np.empty(10))
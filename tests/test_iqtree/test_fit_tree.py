@@ -247,3 +247,50 @@ def test_fit_tree_overridden_option(four_otu: Alignment) -> None:
             "JC",
             other_options="-blfix",
         )
+
+
+@pytest.mark.parametrize("num_threads", [None, 2])
+def test_fit_trees(four_otu: Alignment, num_threads: int | None) -> None:
+    a, b, c, d = four_otu.names
+    topologies = [
+        make_tree(f"(({a},{b}),{c},{d});"),
+        make_tree(f"(({a},{c}),{b},{d});"),
+        make_tree(f"(({a},{d}),{b},{c});"),
+    ]
+
+    got = list(
+        piqtree.fit_trees(four_otu, topologies, "GTR", num_threads=num_threads),
+    )
+
+    assert len(got) == len(topologies)
+    for fitted, topology in zip(got, topologies, strict=True):
+        expected = piqtree.fit_tree(four_otu, topology, "GTR")
+        assert fitted.same_topology(topology)
+        check_model_name(fitted, "GTR")
+        assert fitted.params["lnL"] == pytest.approx(expected.params["lnL"])
+        check_branch_lengths(fitted, expected)
+
+
+def test_fit_trees_no_trees(four_otu: Alignment) -> None:
+    assert list(piqtree.fit_trees(four_otu, [], "JC")) == []
+
+
+def test_fit_trees_overridden_option(four_otu: Alignment) -> None:
+    tree = make_tree(tip_names=four_otu.names)
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Option '-blfix' will be overridden"),
+    ):
+        _ = piqtree.fit_trees(four_otu, [tree], "JC", other_options="-blfix")
+
+
+def test_fit_trees_invalid_tree(four_otu: Alignment) -> None:
+    valid = make_tree(tip_names=four_otu.names)
+    invalid = make_tree("((a,b),c,d);")
+
+    fitted = piqtree.fit_trees(four_otu, [valid, invalid], "JC")
+
+    assert next(fitted).same_topology(valid)
+    with pytest.raises(IqTreeError):
+        _ = next(fitted)
@@ -0,0 +1,31 @@
+"""Test IQ-TREE functions keep their output files out of the working directory."""
+
+import pathlib
+
+import pytest
+from cogent3 import make_tree
+from cogent3.core.alignment import Alignment
+
+from piqtree import (
+    consensus_tree,
+    jc_distances,
+    nj_tree,
+    simulate_alignment,
+)
+
+
+def test_working_dir_stays_empty(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    tree = make_tree("(a:0.1,b:0.2,(c:0.1,d:0.3):0.05);")
+
+    simulate_alignment(tree, "JC", length=100, rand_seed=1)
+    distances = jc_distances(four_otu)
+    nj_tree(distances)
+    consensus_tree([tree, tree])
+
+    assert pathlib.Path.cwd() == tmp_path
+    assert list(tmp_path.iterdir()) == []
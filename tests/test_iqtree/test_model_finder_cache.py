@@ -0,0 +1,187 @@
+import pathlib
+
+import numpy as np
+import pytest
+from cogent3.core.alignment import Alignment
+
+import piqtree.iqtree._model_finder as model_finder_module
+from piqtree import ModelFinderCache, model_finder
+from piqtree.iqtree._model_finder_cache import model_finder_key
+
+RAW_RESULT = """\
+best_model_AIC: HKY+F
+best_model_AICc: HKY+F
+best_model_BIC: JC
+HKY+F: "-100.5 11 0.25"
+JC: "-110.5 7 0.3"
+"""
+
+
+def _key(seqs: np.ndarray, **kwargs: object) -> str:
+    args: dict = {
+        "model_set": ["HKY", "JC"],
+        "freq_set": [],
+        "rate_set": [],
+        "rand_seed": 1,
+        "other_options": "",
+    }
+    args.update(kwargs)
+    return model_finder_key(["a", "b"], seqs, **args)
+
+
+@pytest.fixture
+def seqs() -> np.ndarray:
+    return np.array([[65, 67, 71, 0], [65, 67, 84, 0]], dtype=np.uint8)
+
+
+def test_key_deterministic(seqs: np.ndarray) -> None:
+    assert _key(seqs) == _key(seqs.copy())
+    assert _key(seqs) == _key(seqs, model_set=["JC", "HKY"])
+    assert _key(seqs, other_options="-mtree  -madd X") == _key(
+        seqs,
+        other_options=" -mtree -madd X",
+    )
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"model_set": ["HKY"]},
+        {"freq_set": ["F"]},
+        {"rate_set": ["G"]},
+        {"rand_seed": 2},
+        {"rand_seed": None},
+        {"other_options": "-mtree"},
+    ],
+)
+def test_key_arguments(seqs: np.ndarray, changes: dict) -> None:
+    assert _key(seqs) != _key(seqs, **changes)
+
+
+def test_key_alignment(seqs: np.ndarray) -> None:
+    changed = seqs.copy()
+    changed[1, 2] = 65
+    assert _key(seqs) != _key(changed)
+    assert model_finder_key(["a", "b"], seqs, [], [], [], 1, "") != model_finder_key(
+        ["b", "a"],
+        seqs,
+        [],
+        [],
+        [],
+        1,
+        "",
+    )
+
+
+def test_memory_lru() -> None:
+    cache = ModelFinderCache(max_entries=2)
+    cache.put("a", {"value": 1})
+    cache.put("b", {"value": 2})
+    assert cache.get("a") == {"value": 1}
+
+    cache.put("c", {"value": 3})
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"value": 1}
+    assert cache.get("c") == {"value": 3}
+
+
+def test_disk_persistence(tmp_path: pathlib.Path) -> None:
+    ModelFinderCache(tmp_path / "cache").put("a", {"value": 1})
+
+    cache = ModelFinderCache(tmp_path / "cache")
+    assert len(cache) == 0
+    assert cache.get("a") == {"value": 1}
+    assert len(cache) == 1
+
+
+def test_disk_eviction(tmp_path: pathlib.Path) -> None:
+    cache = ModelFinderCache(tmp_path, max_entries=0, max_disk_entries=2)
+    for key in "abc":
+        cache.put(key, {"value": key})
+
+    assert sorted(file.stem for file in tmp_path.glob("*.json")) == ["b", "c"]
+    assert cache.get("a") is None
+    assert cache.get("c") == {"value": "c"}
+
+
+def test_disk_corrupt(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "a.json").write_text('{"value": ')
+
+    cache = ModelFinderCache(tmp_path)
+    assert cache.get("a") is None
+    assert not (tmp_path / "a.json").exists()
+
+
+def test_clear(tmp_path: pathlib.Path) -> None:
+    cache = ModelFinderCache(tmp_path)
+    cache.put("a", {"value": 1})
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.get("a") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"max_entries": -1}, {"max_disk_entries": -1}],
+)
+def test_bad_sizes(kwargs: dict) -> None:
+    with pytest.raises(ValueError, match="must be non-negative"):
+        ModelFinderCache(**kwargs)
+
+
+def test_model_finder_cached_call(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    calls = []
+
+    def fake_model_finder(*args: object) -> str:
+        calls.append(args)
+        return RAW_RESULT
+
+    monkeypatch.setattr(model_finder_module, "iq_model_finder", fake_model_finder)
+
+    cache = ModelFinderCache(tmp_path)
+    first = model_finder(four_otu, model_set={"HKY", "JC"}, rand_seed=1, cache=cache)
+    second = model_finder(
+        four_otu,
+        model_set=["JC", "HKY"],
+        rand_seed=1,
+        num_threads=4,
+        cache=cache,
+    )
+    assert len(calls) == 1
+    assert str(second.best_aic) == str(first.best_aic) == "HKY+F"
+    assert str(second.best_bic) == "JC"
+    assert second.model_stats["JC"].lnL == -110.5
+
+    # a new cache over the same directory reuses the stored result
+    third = model_finder(
+        four_otu,
+        model_set={"HKY", "JC"},
+        rand_seed=1,
+        cache=ModelFinderCache(tmp_path),
+    )
+    assert len(calls) == 1
+    assert str(third.best_aicc) == "HKY+F"
+
+    # any change to the alignment or arguments is a miss
+    model_finder(four_otu, model_set={"HKY", "JC"}, rand_seed=2, cache=cache)
+    model_finder(four_otu[:-3], model_set={"HKY", "JC"}, rand_seed=1, cache=cache)
+    assert len(calls) == 3
+
+
+def test_model_finder_cache(four_otu: Alignment) -> None:
+    cache = ModelFinderCache()
+    expected = model_finder(four_otu, model_set={"HKY", "JC"}, rand_seed=1)
+    first = model_finder(four_otu, model_set={"HKY", "JC"}, rand_seed=1, cache=cache)
+    second = model_finder(four_otu, model_set={"HKY", "JC"}, rand_seed=1, cache=cache)
+
+    assert len(cache) == 1
+    for result in first, second:
+        assert str(result.best_aic) == str(expected.best_aic)
+        assert str(result.best_bic) == str(expected.best_bic)
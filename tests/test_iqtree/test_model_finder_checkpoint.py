@@ -0,0 +1,136 @@
+import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from cogent3.core.alignment import Alignment
+
+import piqtree.iqtree._model_finder as model_finder_module
+import piqtree.iqtree._parallel_model_finder as parallel_module
+from piqtree import model_finder, parallel_model_finder
+from piqtree.iqtree._model_finder_cache import ModelFinderCheckpoint
+
+# lnL, nfp and tree length of each model
+STATS = {
+    "JC": "-1000.0 7 0.5",
+    "HKY+F": "-980.0 11 0.5",
+    "GTR+F": "-978.0 15 0.5",
+}
+MODELS = {"JC": "JC", "HKY": "HKY+F", "GTR": "GTR+F"}
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls = []
+
+    def fake_evaluate(*args: Any) -> dict[str, Any]:  # noqa: ANN401
+        model_set = args[3]
+        calls.append(model_set)
+        model = MODELS[model_set]
+        return {
+            model: STATS[model],
+            "best_model_AIC": model,
+            "best_model_AICc": model,
+            "best_model_BIC": model,
+        }
+
+    monkeypatch.setattr(model_finder_module, "evaluate_models", fake_evaluate)
+    monkeypatch.setattr(parallel_module, "evaluate_models", fake_evaluate)
+    return calls
+
+
+def test_checkpoint_store(tmp_path: pathlib.Path) -> None:
+    checkpoint = ModelFinderCheckpoint(tmp_path / "checkpoint")
+    raw = {"JC": STATS["JC"], "best_model_AIC": "JC"}
+
+    assert checkpoint.get("task") is None
+    checkpoint.put("task", raw)
+    assert ModelFinderCheckpoint(tmp_path / "checkpoint").get("task") == raw
+
+    # a partly written result is run again
+    (tmp_path / "checkpoint" / "task.json").write_text('{"JC": ')
+    assert checkpoint.get("task") is None
+
+
+def test_model_finder_resume(
+    calls: list[str],
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    first = model_finder(
+        four_otu,
+        model_set=["JC", "HKY"],
+        rand_seed=1,
+        checkpoint_dir=tmp_path,
+    )
+    assert sorted(calls) == ["HKY", "JC"]
+    assert str(first.best_aic) == "HKY+F"
+
+    # extending the search only evaluates the new model
+    second = model_finder(
+        four_otu,
+        model_set=["JC", "HKY", "GTR"],
+        rand_seed=1,
+        num_threads=2,
+        checkpoint_dir=tmp_path,
+    )
+    assert sorted(calls) == ["GTR", "HKY", "JC"]
+    assert set(map(str, second.model_stats)) == set(STATS)
+    assert str(second.best_bic) == "HKY+F"
+
+    # other arguments or alignments do not reuse the results
+    model_finder(four_otu, model_set=["JC"], rand_seed=2, checkpoint_dir=tmp_path)
+    model_finder(four_otu[:-3], model_set=["JC"], rand_seed=1, checkpoint_dir=tmp_path)
+    assert calls.count("JC") == 3
+
+
+def test_parallel_model_finder_resume(
+    calls: list[str],
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+) -> None:
+    model_finder(four_otu, model_set=["JC"], rand_seed=1, checkpoint_dir=tmp_path)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = parallel_model_finder(
+            four_otu,
+            model_set=["JC", "HKY", "GTR"],
+            rand_seed=1,
+            executor=executor,
+            checkpoint_dir=tmp_path,
+        )
+        assert sorted(calls) == ["GTR", "HKY", "JC"]
+
+        parallel_model_finder(
+            four_otu,
+            model_set=["HKY", "GTR"],
+            rand_seed=1,
+            executor=executor,
+            checkpoint_dir=tmp_path,
+        )
+    assert len(calls) == 3
+    assert set(map(str, result.model_stats)) == set(STATS)
+
+
+@pytest.mark.parametrize("model_set", [None, []])
+def test_checkpoint_requires_model_set(
+    tmp_path: pathlib.Path,
+    four_otu: Alignment,
+    calls: list[str],
+    model_set: list[str] | None,
+) -> None:
+    with pytest.raises(ValueError, match="requires a model_set"):
+        model_finder(four_otu, model_set=model_set, checkpoint_dir=tmp_path)
+    with pytest.raises(ValueError, match="requires a model_set"):
+        parallel_model_finder(four_otu, model_set=model_set, checkpoint_dir=tmp_path)
+    assert calls == []
+
+
+def test_model_finder_checkpoint(tmp_path: pathlib.Path, four_otu: Alignment) -> None:
+    models = ["JC", "HKY"]
+    expected = model_finder(four_otu, model_set=models, rand_seed=1)
+    got = model_finder(four_otu, model_set=models, rand_seed=1, checkpoint_dir=tmp_path)
+
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    assert str(got.best_aic) == str(expected.best_aic)
+    assert str(got.best_bic) == str(expected.best_bic)
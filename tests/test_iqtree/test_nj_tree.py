@@ -18,6 +18,16 @@ def test_nj_tree(five_otu: Alignment) -> None:
     assert expected.same_topology(actual)
 
 
+def test_nj_tree_leaves_distances(five_otu: Alignment) -> None:
+    # IQ-TREE is lent a copy of the distances, not the matrix's own array
+    dists = jc_distances(five_otu)
+    original = dists.array.copy()
+
+    nj_tree(dists)
+
+    np.testing.assert_array_equal(dists.array, original)
+
+
 def test_nj_tree_allow_negative(all_otu: Alignment) -> None:
     # a distance matrix can produce trees with negative branch lengths
     dists = jc_distances(all_otu)
@@ -44,3 +54,23 @@ def test_nj_tree_nan(four_otu: Alignment) -> None:
         match=re.escape("The pairwise distance matrix cannot contain NaN values."),
     ):
         nj_tree(dists, allow_negative=True)
+
+
+def test_nj_tree_condensed(five_otu: Alignment) -> None:
+    expected = make_tree("(((Human, Chimpanzee), Rhesus), Manatee, Dugong);")
+
+    dists = jc_distances(five_otu, condensed=True, dtype=np.float32)
+    actual = nj_tree(dists)
+
+    assert expected.same_topology(actual)
+
+
+def test_nj_tree_condensed_nan(four_otu: Alignment) -> None:
+    dists = jc_distances(four_otu, condensed=True)
+    dists.distances[0] = np.nan
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("The pairwise distance matrix cannot contain NaN values."),
+    ):
+        nj_tree(dists)
@@ -0,0 +1,178 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+import pytest
+from cogent3.core.alignment import Alignment
+
+import piqtree.iqtree._parallel_model_finder as parallel_module
+from piqtree import model_finder, parallel_model_finder
+from piqtree.exceptions import IqTreeError
+from piqtree.iqtree._model_finder import (
+    ModelResultValue,
+    _information_criteria,
+    merge_model_finder_results,
+    model_grid,
+    sample_size,
+)
+from piqtree.util import get_seq_array
+
+# lnL, nfp and tree length of each model
+STATS = {
+    "JC": "-1000.0 7 0.5",
+    "HKY+F": "-980.0 11 0.5",
+    "GTR+F": "-978.0 15 0.5",
+    "JC+G4": "-990.0 8 0.5",
+    "HKY+F+G4": "-970.0 12 0.5",
+    "GTR+F+G4": "-969.0 16 0.5",
+}
+
+
+def _raw(*models: str) -> dict[str, Any]:
+    raw: dict[str, Any] = {model: STATS[model] for model in models}
+    raw.update(
+        {
+            "best_model_AIC": models[0],
+            "best_model_AICc": models[0],
+            "best_model_BIC": models[0],
+            "initTree": "((a,b),c,d);",
+            "partition_type": 0,
+        },
+    )
+    return raw
+
+
+def _scores(model: str, num_sites: int) -> tuple[float, float, float]:
+    stats = ModelResultValue.from_string(STATS[model])
+    k, lnl = stats.nfp, stats.lnL
+    aic = 2 * k - 2 * lnl
+    return (
+        aic,
+        aic + 2 * k * (k + 1) / max(num_sites - k - 1, 1),
+        k * math.log(num_sites) - 2 * lnl,
+    )
+
+
+@pytest.mark.parametrize("num_sites", [20, 100, 10000])
+def test_merge_model_finder_results(num_sites: int) -> None:
+    raws = [_raw("JC", "JC+G4"), _raw("HKY+F", "HKY+F+G4"), _raw("GTR+F", "GTR+F+G4")]
+
+    merged = merge_model_finder_results(raws, num_sites)
+
+    assert {key: merged[key] for key in STATS} == STATS
+    for i, criterion in enumerate(("AIC", "AICc", "BIC")):
+        expected = min(STATS, key=lambda model: _scores(model, num_sites)[i])
+        assert merged[f"best_model_{criterion}"] == expected
+
+
+def test_merge_too_few_sites() -> None:
+    # as in ModelFinder, the AICc correction is divided by at least 1
+    # when there are too few sites for the number of parameters
+    _, aicc, _ = _information_criteria(
+        ModelResultValue.from_string(STATS["GTR+F+G4"]),
+        12,
+    )
+    assert aicc == pytest.approx(1970.0 + 2 * 16 * 17)
+
+    merged = merge_model_finder_results([_raw("JC"), _raw("GTR+F+G4")], 12)
+    assert merged["best_model_AIC"] == "GTR+F+G4"
+    assert merged["best_model_AICc"] == "JC"
+
+
+@pytest.mark.parametrize(
+    ("other_options", "expected"),
+    [
+        ("", 30),
+        ("-st DNA", 30),
+        ("-st CODON", 10),
+        ("--seqtype CODON2 -nt 2", 10),
+        ("-st NT2AA", 10),
+        ("-st CODONS", 30),
+    ],
+)
+def test_sample_size(other_options: str, expected: int) -> None:
+    seqs = np.zeros((4, 31), dtype=np.uint8)
+    assert sample_size(seqs, other_options) == expected
+
+
+def test_model_grid() -> None:
+    assert model_grid(None, [], None) == [("", "", "")]
+    assert model_grid(["JC", "HKY"], None, ["", "G4"]) == [
+        ("JC", "", ""),
+        ("JC", "", "G4"),
+        ("HKY", "", ""),
+        ("HKY", "", "G4"),
+    ]
+
+
+def test_merge_no_models() -> None:
+    with pytest.raises(ValueError, match="did not return any models"):
+        merge_model_finder_results([{"initTree": "((a,b),c,d);"}], 100)
+
+
+def test_parallel_model_finder_grid(
+    monkeypatch: pytest.MonkeyPatch,
+    four_otu: Alignment,
+) -> None:
+    tasks = []
+
+    def fake_evaluate(*args: Any) -> dict[str, Any]:  # noqa: ANN401
+        _, _, rand_seed, model_set, freq_set, rate_set, num_threads, _ = args
+        assert num_threads == 1
+        tasks.append((model_set, freq_set, rate_set, rand_seed))
+        model = {"JC": "JC", "HKY": "HKY+F", "GTR": "GTR+F"}[model_set]
+        return _raw(model if not rate_set else f"{model}+{rate_set}")
+
+    monkeypatch.setattr(parallel_module, "evaluate_models", fake_evaluate)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = parallel_model_finder(
+            four_otu,
+            model_set=["JC", "HKY", "GTR"],
+            rate_set=["", "G4"],
+            rand_seed=1,
+            executor=executor,
+        )
+
+    assert sorted(task[:3] for task in tasks) == sorted(
+        (model, "", rate) for model in ("JC", "HKY", "GTR") for rate in ("", "G4")
+    )
+    assert len({task[3] for task in tasks}) == 1
+    assert set(map(str, result.model_stats)) == set(STATS)
+
+    merged = merge_model_finder_results(
+        [_raw(model) for model in STATS],
+        sample_size(get_seq_array(four_otu), ""),
+    )
+    assert str(result.best_aic) == merged["best_model_AIC"]
+    assert str(result.best_aicc) == merged["best_model_AICc"]
+    assert str(result.best_bic) == merged["best_model_BIC"]
+
+
+def test_parallel_model_finder(five_otu: Alignment) -> None:
+    models = {"JC", "HKY", "GTR"}
+    expected = model_finder(five_otu, model_set=models, rand_seed=1)
+    got = parallel_model_finder(five_otu, model_set=models, rand_seed=1, num_workers=2)
+
+    assert str(got.best_aic) == str(expected.best_aic)
+    assert str(got.best_aicc) == str(expected.best_aicc)
+    assert str(got.best_bic) == str(expected.best_bic)
+
+
+def test_parallel_model_finder_error(four_otu: Alignment) -> None:
+    with (
+        ThreadPoolExecutor(max_workers=2) as executor,
+        pytest.raises(IqTreeError),
+    ):
+        parallel_model_finder(
+            four_otu,
+            model_set={"NOT_A_MODEL"},
+            rand_seed=1,
+            executor=executor,
+        )
+
+
+def test_parallel_model_finder_overridden_option(four_otu: Alignment) -> None:
+    with pytest.raises(ValueError, match="Option '-mset' will be overridden"):
+        parallel_model_finder(four_otu, other_options="-mset HKY")
@@ -0,0 +1,290 @@
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cogent3.core.alignment import Alignment
+
+import piqtree
+import piqtree.iqtree._model_finder as model_finder_module
+import piqtree.iqtree._tree as tree_module
+from piqtree import ProgressEvent
+from piqtree.iqtree._decorator import capture_output, iqtree_func
+from piqtree.iqtree._progress import ProgressTracker
+
+BUILD_TREE_OUTPUT = """\
+Alignment has 4 sequences with 1000 columns, 120 distinct patterns
+Creating fast initial parsimony tree by random order stepwise addition...
+0.001 seconds, parsimony score: 250 (based on 120 sites)
+Computing ML distances based on estimated model parameters...
+--------------------------------------------------------------------
+|             INITIALIZING CANDIDATE TREE SET                      |
+--------------------------------------------------------------------
+Generating 98 parsimony trees... 0.050 second
+Computing log-likelihood of 98 initial trees ... 0.100 seconds
+Current best score: -6525.500
+BETTER TREE FOUND at iteration 1: -6521.000
+Iteration 10 / LogL: -6521.100 / Time: 0h:0m:1s
+--------------------------------------------------------------------
+|               OPTIMIZING CANDIDATE TREE SET                      |
+--------------------------------------------------------------------
+BETTER TREE FOUND at iteration 12: -6519.330
+Iteration 20 / LogL: -6519.900 / Time: 0h:0m:3s (0h:0m:6s left)
+--------------------------------------------------------------------
+|                    FINALIZING TREE SEARCH                        |
+--------------------------------------------------------------------
+Optimal log-likelihood: -6519.330
+BEST SCORE FOUND : -6519.330
+"""
+
+MODEL_FINDER_OUTPUT = """\
+ModelFinder will test up to 2 DNA models (sample size: 1000) ...
+ No. Model         -LnL         df  AIC          AICc         BIC
+  1  JC            110.500      7   235.000      235.113      269.354
+  2  HKY+F         100.500      11  223.000      223.267      276.986
+"""
+
+
+def _events(lines: str, min_interval: float = 0) -> list[ProgressEvent]:
+    events: list[ProgressEvent] = []
+    tracker = ProgressTracker(events.append, min_interval=min_interval)
+    for line in lines.splitlines():
+        tracker(line)
+    tracker.finish()
+    return events
+
+
+def _write_output(output: str) -> None:
+    # the stdout file descriptor, which differs from 1 under pytest's capturing
+    os.write(sys.stdout.fileno(), output.encode())
+
+
+def test_tracker_tree_search() -> None:
+    events = _events(BUILD_TREE_OUTPUT)
+
+    phases = [event.phase for event in events]
+    assert list(dict.fromkeys(phases)) == [
+        "parsimony",
+        "distances",
+        "initial_trees",
+        "tree_search",
+        "finalizing",
+        "done",
+    ]
+    search = [event for event in events if event.phase == "tree_search"]
+    assert [event.iteration for event in search] == [None, 12, 20]
+    assert search[-1].best_lnl == -6519.330
+    assert events[-1].best_lnl == -6519.330
+    assert all(a.elapsed <= b.elapsed for a, b in itertools.pairwise(events))
+
+
+def test_tracker_phase_times() -> None:
+    tracker = ProgressTracker(None)
+    for line in BUILD_TREE_OUTPUT.splitlines():
+        time.sleep(0.001)
+        tracker(line)
+    tracker.finish()
+
+    assert list(tracker.phase_times) == [
+        "setup",
+        "parsimony",
+        "distances",
+        "initial_trees",
+        "tree_search",
+        "finalizing",
+    ]
+    assert all(seconds > 0 for seconds in tracker.phase_times.values())
+
+
+def test_tracker_model_finder() -> None:
+    events = _events(MODEL_FINDER_OUTPUT)
+
+    assert [(event.phase, event.iteration) for event in events] == [
+        ("model_finder", None),
+        ("model_finder", 1),
+        ("model_finder", 2),
+        ("done", None),
+    ]
+    assert events[-1].best_lnl == -100.5
+
+
+def test_tracker_rate_limited() -> None:
+    lines = "|  OPTIMIZING CANDIDATE TREE SET  |\n" + "\n".join(
+        f"Iteration {i} / LogL: {-1000 + i}.0 / Time: 0h:0m:1s" for i in range(1, 101)
+    )
+    events = _events(lines, min_interval=60)
+
+    # the start of the phase and the end of the call are always reported
+    assert [event.phase for event in events] == ["tree_search", "done"]
+    assert events[-1].best_lnl == -900.0
+
+
+def test_event_str() -> None:
+    event = ProgressEvent("tree_search", 20, -6519.33, 3.25, 1.0, "")
+    assert str(event) == "tree_search, iteration 20, best lnL -6519.3300, 3.2s"
+    assert str(ProgressEvent("setup", None, None, 0.0, 0.0, "")) == "setup, 0.0s"
+
+
+def test_capture_output(capfd: pytest.CaptureFixture[str]) -> None:
+    lines: list[str] = []
+    func = iqtree_func(_write_output)
+
+    with capture_output(lines.append):
+        func("first\nsecond\n")
+    func("hidden\n")
+
+    assert lines == ["first", "second"]
+    assert capfd.readouterr().out == ""
+
+
+def test_capture_output_waits_for_other_threads() -> None:
+    lines: list[str] = []
+    started = threading.Event()
+
+    def write_when_started(output: str) -> None:
+        started.set()
+        time.sleep(0.05)
+        _write_output(output)
+
+    other = iqtree_func(write_when_started)
+    func = iqtree_func(_write_output)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        running = executor.submit(other, "running\n")
+        started.wait()
+        # waits for the running call, and the call below waits for the capture
+        with capture_output(lines.append):
+            waiting = executor.submit(other, "waiting\n")
+            time.sleep(0.05)
+            func("captured\n")
+            assert not waiting.done()
+        running.result()
+        waiting.result()
+
+    assert lines == ["captured"]
+
+
+def test_progress_ignores_other_threads(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_iqtree: Callable[..., None],
+    raw_tree: str,
+    raw_models: str,
+    four_otu: Alignment,
+) -> None:
+    searching = threading.Event()
+
+    def fake_build_tree(*_: object) -> str:
+        searching.set()
+        time.sleep(0.05)
+        _write_output(BUILD_TREE_OUTPUT)
+        return raw_tree
+
+    monkeypatch.setattr(tree_module, "iq_build_tree", iqtree_func(fake_build_tree))
+    fake_iqtree(model_finder_module, "iq_model_finder", MODEL_FINDER_OUTPUT, raw_models)
+
+    events: list[ProgressEvent] = []
+    with ThreadPoolExecutor(max_workers=1) as executor:
+
+        def find_models() -> piqtree.ModelFinderResult:
+            searching.wait()
+            return piqtree.model_finder(four_otu, rand_seed=1)
+
+        other = executor.submit(find_models)
+        tree = piqtree.build_tree(
+            four_otu,
+            "JC",
+            rand_seed=1,
+            progress=events.append,
+            timings=True,
+        )
+        other.result()
+
+    assert "model_finder" not in tree.params["timings"]["iqtree_phases"]
+    assert all(event.phase != "model_finder" for event in events)
+    assert events[-1].best_lnl == -6519.330
+
+
+def test_build_tree_progress(
+    fake_iqtree: Callable[..., None],
+    raw_tree: str,
+    four_otu: Alignment,
+) -> None:
+    fake_iqtree(tree_module, "iq_build_tree", BUILD_TREE_OUTPUT, raw_tree)
+
+    events: list[ProgressEvent] = []
+    tree = piqtree.build_tree(four_otu, "JC", rand_seed=1, progress=events.append)
+
+    assert tree.params["lnL"] == pytest.approx(-6519.33018689)
+    assert events[0].phase == "parsimony"
+    assert events[-1].phase == "done"
+    assert events[-1].best_lnl == -6519.330
+
+
+def test_model_finder_progress_logger(
+    fake_iqtree: Callable[..., None],
+    raw_models: str,
+    caplog: pytest.LogCaptureFixture,
+    four_otu: Alignment,
+) -> None:
+    fake_iqtree(model_finder_module, "iq_model_finder", MODEL_FINDER_OUTPUT, raw_models)
+
+    logger = logging.getLogger("piqtree.test")
+    with caplog.at_level(logging.INFO, logger="piqtree.test"):
+        result = piqtree.model_finder(four_otu, rand_seed=1, progress=logger)
+
+    assert str(result.best_aic) == "HKY+F"
+    events = [record.progress for record in caplog.records]
+    assert events[0].phase == "model_finder"
+    assert events[-1].phase == "done"
+    assert caplog.records[-1].getMessage() == str(events[-1])
+
+
+def test_progress_callback_error(
+    fake_iqtree: Callable[..., None],
+    raw_tree: str,
+    four_otu: Alignment,
+) -> None:
+    def fail(_: ProgressEvent) -> None:
+        msg = "monitoring is down"
+        raise ConnectionError(msg)
+
+    fake_iqtree(tree_module, "iq_build_tree", BUILD_TREE_OUTPUT, raw_tree)
+
+    with pytest.raises(ConnectionError, match="monitoring is down"):
+        piqtree.build_tree(four_otu, "JC", progress=fail)
+
+
+def test_progress_callback_output(
+    fake_iqtree: Callable[..., None],
+    raw_tree: str,
+    capfd: pytest.CaptureFixture[str],
+    four_otu: Alignment,
+) -> None:
+    fake_iqtree(tree_module, "iq_build_tree", BUILD_TREE_OUTPUT, raw_tree)
+
+    logger = logging.getLogger("piqtree.test.output")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    # the stderr file descriptor, which differs from 2 under pytest's capturing
+    with open(sys.stderr.fileno(), "w", closefd=False) as stderr:
+        handler = logging.StreamHandler(stderr)
+        logger.addHandler(handler)
+
+        def report(event: ProgressEvent) -> None:
+            _write_output(f"printed: {event.phase}\n")
+            logger.info("logged: %s", event.phase)
+
+        try:
+            piqtree.build_tree(four_otu, "JC", rand_seed=1, progress=report)
+        finally:
+            logger.removeHandler(handler)
+
+    out, err = capfd.readouterr()
+    for phase in ("parsimony", "tree_search", "done"):
+        assert f"printed: {phase}" in out
+        assert f"logged: {phase}" in err
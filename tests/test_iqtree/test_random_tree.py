@@ -1,6 +1,7 @@
 import pytest
+from cogent3 import make_tree
 
-from piqtree import TreeGenMode, random_tree
+from piqtree import TreeGenMode, random_tree, random_trees
 from piqtree.exceptions import IqTreeError
 
 
@@ -37,3 +38,64 @@ def test_invalid_taxa(
 ) -> None:
     with pytest.raises(IqTreeError):
         _ = random_tree(num_taxa, tree_mode, rand_seed=1)
+
+
+@pytest.mark.parametrize("num_workers", [None, 1, 3])
+@pytest.mark.parametrize("tree_mode", list(TreeGenMode))
+def test_random_trees(tree_mode: TreeGenMode, num_workers: int | None) -> None:
+    trees = list(
+        random_trees(10, tree_mode, 7, rand_seed=1, num_workers=num_workers),
+    )
+    assert len(trees) == 7
+    assert all(len(tree.tips()) == 10 for tree in trees)
+
+
+@pytest.mark.parametrize("num_workers", [None, 4])
+def test_random_trees_determinism(num_workers: int | None) -> None:
+    newicks_1 = list(
+        random_trees(
+            10,
+            TreeGenMode.YULE_HARDING,
+            20,
+            rand_seed=5,
+            as_newick=True,
+            num_workers=num_workers,
+        ),
+    )
+    newicks_2 = list(
+        random_trees(
+            10,
+            TreeGenMode.YULE_HARDING,
+            20,
+            rand_seed=5,
+            as_newick=True,
+            num_workers=num_workers,
+        ),
+    )
+    assert newicks_1 == newicks_2
+    assert len(set(newicks_1)) > 1
+
+
+def test_random_trees_as_newick() -> None:
+    newicks = list(
+        random_trees(10, TreeGenMode.BALANCED, 3, rand_seed=1, as_newick=True),
+    )
+    assert len(newicks) == 3
+    for newick in newicks:
+        assert isinstance(newick, str)
+        assert len(make_tree(newick).tips()) == 10
+
+
+def test_random_trees_none() -> None:
+    assert list(random_trees(10, TreeGenMode.YULE_HARDING, 0)) == []
+
+
+def test_random_trees_negative() -> None:
+    with pytest.raises(ValueError, match="num_trees must be non-negative"):
+        random_trees(10, TreeGenMode.YULE_HARDING, -1)
+
+
+@pytest.mark.parametrize("num_taxa", [-1, 0, 1, 2])
+def test_random_trees_invalid_taxa(num_taxa: int) -> None:
+    with pytest.raises(IqTreeError):
+        _ = list(random_trees(num_taxa, TreeGenMode.YULE_HARDING, 3, rand_seed=1))
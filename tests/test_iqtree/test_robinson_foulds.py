@@ -1,12 +1,127 @@
+import random
+
 import numpy as np
+import pytest
 from cogent3 import make_tree
+from cogent3.core.tree import PhyloNode
 from numpy.testing import assert_array_equal
 
 import piqtree
 
 
+def _expected_rf(tree1: PhyloNode, tree2: PhyloNode) -> int:
+    def splits(tree: PhyloNode) -> set[frozenset[str]]:
+        taxa = frozenset(tree.get_tip_names())
+        result = set()
+        for node in tree.nontips():
+            split = frozenset(node.get_tip_names())
+            if min(taxa) in split:
+                split = taxa - split
+            if 1 < len(split) < len(taxa) - 1:
+                result.add(split)
+        return result
+
+    return len(splits(tree1) ^ splits(tree2))
+
+
+def _random_tree(names: list[str], seed: int) -> PhyloNode:
+    rng = random.Random(seed)  # noqa: S311
+    subtrees = list(names)
+    while len(subtrees) > 3:
+        rng.shuffle(subtrees)
+        subtrees.append(f"({subtrees.pop()},{subtrees.pop()})")
+    return make_tree(f"({','.join(subtrees)});")
+
+
 def test_robinson_foulds() -> None:
     tree1 = make_tree("(A,B,(C,D));")
     tree2 = make_tree("(A,C,(B,D));")
     pairwise_distances = piqtree.robinson_foulds([tree1, tree2])
     assert_array_equal(pairwise_distances, np.array([[0, 2], [2, 0]]))
+
+
+def test_robinson_foulds_rooting() -> None:
+    unrooted = make_tree("(A,B,(C,(D,E)));")
+    rooted = make_tree("((A,B),(C,(D,E)));")
+    pairwise_distances = piqtree.robinson_foulds([unrooted, rooted])
+    assert_array_equal(pairwise_distances, np.zeros((2, 2)))
+
+
+def test_robinson_foulds_multifurcating() -> None:
+    star = make_tree("(A,B,C,D,E);")
+    resolved = make_tree("(A,B,(C,(D,E)));")
+    pairwise_distances = piqtree.robinson_foulds([star, resolved])
+    assert_array_equal(pairwise_distances, np.array([[0, 2], [2, 0]]))
+
+
+@pytest.mark.parametrize("num_taxa", [10, 64, 150])
+@pytest.mark.parametrize("num_threads", [1, None])
+def test_robinson_foulds_many(num_taxa: int, num_threads: int | None) -> None:
+    names = [f"t{i}" for i in range(num_taxa)]
+    trees = [_random_tree(names, seed) for seed in range(8)]
+
+    pairwise_distances = piqtree.robinson_foulds(trees, num_threads=num_threads)
+
+    for i, tree1 in enumerate(trees):
+        for j, tree2 in enumerate(trees):
+            assert pairwise_distances[i, j] == _expected_rf(tree1, tree2)
+
+
+def test_robinson_foulds_empty() -> None:
+    assert piqtree.robinson_foulds([]).shape == (0, 0)
+
+
+@pytest.mark.parametrize("newick", ["(A,B,(C,E));", "(A,B,(C,D,E));", "(A,B,(C,C));"])
+def test_robinson_foulds_different_tips(newick: str) -> None:
+    tree1 = make_tree("(A,B,(C,D));")
+    tree2 = make_tree(newick)
+    with pytest.raises(ValueError, match="taxa"):
+        piqtree.robinson_foulds([tree1, tree2])
+
+
+def test_robinson_foulds_one_vs_many() -> None:
+    names = [f"t{i}" for i in range(20)]
+    reference = _random_tree(names, 0)
+    others = [_random_tree(names, seed) for seed in range(1, 6)]
+
+    distances = piqtree.robinson_foulds(reference, others)
+
+    assert distances.shape == (5,)
+    for distance, other in zip(distances, others, strict=True):
+        assert distance == _expected_rf(reference, other)
+
+
+def test_robinson_foulds_many_vs_many() -> None:
+    names = [f"t{i}" for i in range(70)]
+    trees = [_random_tree(names, seed) for seed in range(3)]
+    others = [_random_tree(names, seed) for seed in range(3, 8)]
+
+    distances = piqtree.robinson_foulds(trees, others, num_threads=2)
+
+    assert distances.shape == (3, 5)
+    for i, tree in enumerate(trees):
+        for j, other in enumerate(others):
+            assert distances[i, j] == _expected_rf(tree, other)
+
+
+def test_robinson_foulds_normalized() -> None:
+    tree1 = make_tree("(A,B,(C,(D,E)));")
+    tree2 = make_tree("(A,C,(B,(D,E)));")
+    star = make_tree("(A,B,C,D,E);")
+
+    pairwise_distances = piqtree.robinson_foulds(
+        [tree1, tree2, star],
+        normalized=True,
+    )
+    assert_array_equal(
+        pairwise_distances,
+        np.array([[0, 0.5, 1], [0.5, 0, 1], [1, 1, 0]]),
+    )
+
+    distances = piqtree.robinson_foulds(star, [star, tree1], normalized=True)
+    assert_array_equal(distances, np.array([0, 1]))
+
+
+def test_robinson_foulds_single_tree_requires_others() -> None:
+    with pytest.raises(ValueError, match="others must be given"):
+        piqtree.robinson_foulds(make_tree("(A,B,(C,D));"))
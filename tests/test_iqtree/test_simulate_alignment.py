@@ -1,12 +1,19 @@
+import pathlib
 import re
 from typing import cast
 
 import pytest
-from cogent3 import make_tree
+from cogent3 import get_moltype, load_aligned_seqs, make_aligned_seqs, make_tree
 from cogent3.core.alignment import Alignment
 from cogent3.core.tree import PhyloNode
 
-from piqtree import Model, simulate_alignment
+import piqtree.iqtree._alignment as alignment_module
+from piqtree import (
+    Model,
+    simulate_alignment,
+    simulate_alignment_to_file,
+    simulate_alignments,
+)
 from piqtree.distribution import (
     IndelDistribution,
     IndelGeometric,
@@ -14,7 +21,7 @@ from piqtree.distribution import (
     IndelNegativeBinomial,
     IndelZipfian,
 )
-from piqtree.iqtree._alignment import UNSUPPORTED_MODELS
+from piqtree.iqtree._alignment import UNSUPPORTED_MODELS, _parse_yaml_alignment
 from piqtree.model import (
     AaModel,
     LieModel,
@@ -191,3 +198,115 @@ def test_root_seq() -> None:
 
     assert str(aln.get_seq("c")) == root_seq
     assert str(aln.get_seq("e")) == root_seq
+
+
+def test_parse_wrapped_alignment() -> None:
+    fasta = ">a\nACGT\nAC\n>b\nTT-A\nNN\n>c\nGGGGGG\n"
+
+    seqs = _parse_yaml_alignment(fasta, get_moltype("dna"))
+
+    aln = make_aligned_seqs(seqs, moltype="dna")
+    assert aln.to_dict() == {"a": "ACGTAC", "b": "TT-ANN", "c": "GGGGGG"}
+
+
+@pytest.mark.parametrize("num_threads", [None, 2])
+def test_simulate_alignments(
+    four_taxon_unrooted_tree: PhyloNode,
+    num_threads: int | None,
+) -> None:
+    alns = list(
+        simulate_alignments(
+            four_taxon_unrooted_tree,
+            "JC",
+            5,
+            length=200,
+            rand_seed=1,
+            num_threads=num_threads,
+        ),
+    )
+
+    assert len(alns) == 5
+    for aln in alns:
+        assert len(aln) == 200
+        assert sorted(aln.names) == sorted(four_taxon_unrooted_tree.get_tip_names())
+
+    # replicates are simulated with different seeds
+    assert alns[0].to_dict() != alns[1].to_dict()
+
+
+def test_simulate_alignments_reproducible(four_taxon_unrooted_tree: PhyloNode) -> None:
+    alns1 = simulate_alignments(four_taxon_unrooted_tree, "JC", 3, rand_seed=1)
+    alns2 = simulate_alignments(four_taxon_unrooted_tree, "JC", 3, rand_seed=1)
+
+    for aln1, aln2 in zip(alns1, alns2, strict=True):
+        assert aln1.to_dict() == aln2.to_dict()
+
+
+def test_simulate_alignments_unsupported_model(
+    four_taxon_unrooted_tree: PhyloNode,
+) -> None:
+    with pytest.raises(ValueError, match="is unsupported"):
+        simulate_alignments(four_taxon_unrooted_tree, Model(LieModel.LIE_1_1), 3)
+
+
+@pytest.mark.parametrize("file_format", ["fasta", "phylip"])
+@pytest.mark.parametrize("suffix", ["", ".gz"])
+def test_simulate_alignment_to_file(
+    tmp_path: pathlib.Path,
+    five_taxon_rooted_tree: PhyloNode,
+    file_format: str,
+    suffix: str,
+) -> None:
+    path = tmp_path / f"simulated.{file_format}{suffix}"
+
+    result = simulate_alignment_to_file(
+        path,
+        five_taxon_rooted_tree,
+        "JC",
+        length=500,
+        rand_seed=1,
+        file_format=file_format,
+    )
+
+    assert result.path == path
+    assert result.num_seqs == 5
+    assert result.length == 500
+    assert result.rand_seed == 1
+
+    aln = load_aligned_seqs(path, moltype="dna", format_name=file_format)
+    expected = simulate_alignment(five_taxon_rooted_tree, "JC", 500, rand_seed=1)
+    assert aln.to_dict() == expected.to_dict()
+
+
+def test_simulate_alignment_to_file_relative_path(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    five_taxon_rooted_tree: PhyloNode,
+) -> None:
+    (tmp_path / "elsewhere").mkdir()
+    monkeypatch.chdir(tmp_path)
+
+    def simulate_elsewhere(*_: object) -> str:
+        # the working directory changing during the simulation
+        monkeypatch.chdir(tmp_path / "elsewhere")
+        return ">a\nACGT\n>b\nACGA\n"
+
+    monkeypatch.setattr(alignment_module, "_simulate_fasta", simulate_elsewhere)
+
+    result = simulate_alignment_to_file("simulated.fasta", five_taxon_rooted_tree, "JC")
+
+    assert result.path == tmp_path / "simulated.fasta"
+    assert result.path.read_text() == ">a\nACGT\n>b\nACGA\n"
+
+
+def test_simulate_alignment_to_file_bad_format(
+    tmp_path: pathlib.Path,
+    five_taxon_rooted_tree: PhyloNode,
+) -> None:
+    with pytest.raises(ValueError, match="file_format must be one of"):
+        simulate_alignment_to_file(
+            tmp_path / "simulated.nex",
+            five_taxon_rooted_tree,
+            "JC",
+            file_format="nexus",
+        )
@@ -0,0 +1,53 @@
+import statistics
+
+import pytest
+from cogent3 import make_tree
+
+from piqtree.iqtree._splits import SplitIndex
+from piqtree.iqtree._tree import _transfer_support
+
+
+def test_split_index_node_splits() -> None:
+    index = SplitIndex("abcde")
+    tree = make_tree("(a,b,(c,(d,e)));")
+
+    splits = {
+        frozenset(node.get_tip_names()): split
+        for node, split in index.node_splits(tree)
+    }
+
+    assert splits == {frozenset("cde"): 0b11100, frozenset("de"): 0b11000}
+    assert index.split_taxa(0b11100) == ["c", "d", "e"]
+
+
+def test_split_index_rooting() -> None:
+    index = SplitIndex("abcde")
+    unrooted = make_tree("(a,b,(c,(d,e)));")
+    rooted = make_tree("((a,b),(c,(d,e)));")
+
+    unrooted_splits = {split for _, split in index.node_splits(unrooted)}
+    rooted_splits = {split for _, split in index.node_splits(rooted)}
+
+    assert unrooted_splits == rooted_splits
+
+
+def test_split_index_different_taxa() -> None:
+    index = SplitIndex("abcd")
+    with pytest.raises(ValueError, match="taxa"):
+        list(index.node_splits(make_tree("(a,b,(c,e));")))
+
+
+def test_transfer_support() -> None:
+    consensus = make_tree("(a,b,(c,(d,e)));")
+    trees = [
+        make_tree("(a,b,(c,(d,e)0.9)0.8);"),
+        make_tree("((a,b)0.6,(c,(d,e)0.7)0.4);"),
+    ]
+
+    _transfer_support(consensus, trees, statistics.mean)
+
+    supports = {
+        frozenset(node.get_tip_names()): node.support for node in consensus.nontips()
+    }
+    assert supports[frozenset("de")] == pytest.approx(0.8)
+    assert supports[frozenset("cde")] == pytest.approx(0.6)
@@ -0,0 +1,164 @@
+import gzip
+import pathlib
+import re
+from collections.abc import Iterable
+
+import pytest
+from cogent3 import PhyloNode, make_tree
+
+from piqtree import streaming_consensus_tree
+
+
+def _internal_supports(tree: PhyloNode) -> dict[frozenset, float]:
+    return {
+        frozenset(node.get_tip_names()): node.support
+        for node in tree.postorder()
+        if not node.is_tip() and not node.is_root()
+    }
+
+
+def test_majority_consensus_tree(five_trees: list[PhyloNode]) -> None:
+    expected = make_tree("((a,b),(((e,f),d),c))")
+    assert expected.same_topology(streaming_consensus_tree(five_trees))
+
+
+@pytest.fixture
+def clade_trees() -> list[str]:
+    # {d,e} is in all trees, {b,c} in three, {b,d,e} and {c,d,e} in one
+    return [
+        "(a,(b,(c,(d,e))))",
+        "(a,((b,c),(d,e)))",
+        "(a,((b,c),(d,e)))",
+        "(a,(c,(b,(d,e))))",
+        "(c,(b,(a,(d,e))))",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("min_support", "expected"),
+    [
+        (0, "(a,((b,c),(d,e)))"),
+        (0.5, "(a,(b,c),(d,e))"),
+        (0.7, "(a,b,c,(d,e))"),
+        (1, "(a,b,c,(d,e))"),
+    ],
+)
+def test_min_support(
+    clade_trees: list[str],
+    min_support: float,
+    expected: str,
+) -> None:
+    got = streaming_consensus_tree(clade_trees, min_support=min_support)
+    assert make_tree(expected).same_topology(got)
+
+
+def test_unrooted_splits() -> None:
+    # the root of each tree is not a clade boundary, so {a,b}|{c,d,e}
+    # is in both trees
+    trees = ["((a,b),(c,(d,e)))", "(a,(b,(c,(d,e))))"]
+
+    got = streaming_consensus_tree(trees, min_support=1)
+    assert make_tree("((a,b),c,(d,e))").same_topology(got)
+
+
+def test_even_majority_rule() -> None:
+    trees = ["(a,(b,(c,d)))", "(a,(b,(c,d)))", "(b,(a,(c,d)))", "(c,(a,(b,d)))"]
+
+    got = streaming_consensus_tree(trees)
+    assert make_tree("(a,b,(c,d))").same_topology(got)
+
+
+def test_single_tree(five_trees: list[PhyloNode]) -> None:
+    got = streaming_consensus_tree(iter(five_trees[:1]))
+    assert five_trees[0].same_topology(got)
+
+
+def test_clade_frequency_support() -> None:
+    trees = ["(a,(b,(c,(d,e))))", "(a,(b,(c,(d,e))))", "(a,(c,(b,(d,e))))"]
+
+    got = streaming_consensus_tree(trees)
+    supports = _internal_supports(got)
+    assert supports[frozenset({"d", "e"})] == 100.0
+    assert supports[frozenset({"c", "d", "e"})] == pytest.approx(200 / 3)
+
+
+@pytest.mark.parametrize("suffix", [".nwk", ".nwk.gz"])
+def test_newick_file(
+    tmp_path: pathlib.Path,
+    five_trees: list[PhyloNode],
+    suffix: str,
+) -> None:
+    path = tmp_path / f"trees{suffix}"
+    opener = gzip.open if suffix.endswith(".gz") else open
+    with opener(path, "wt") as out:
+        for tree in five_trees:
+            out.write(f"{tree.get_newick()}\n\n")
+
+    expected = make_tree("((a,b),(((e,f),d),c))")
+    assert expected.same_topology(streaming_consensus_tree(path))
+    assert expected.same_topology(streaming_consensus_tree(str(path)))
+
+
+@pytest.mark.parametrize(
+    ("aggregate", "expected_ab", "expected_de"),
+    [
+        ("mean", 93.0, 79.0),
+        ("max", 95.0, 88.0),
+        ("min", 91.0, 70.0),
+    ],
+)
+def test_support_aggregate(
+    aggregate: str,
+    expected_ab: float,
+    expected_de: float,
+) -> None:
+    trees = [
+        "(((a:1,b:1)95:1,c:1)88:1,d:1,e:1);",
+        "(((a:1,b:1)91:1,c:1)70:1,d:1,e:1);",
+    ]
+
+    got = streaming_consensus_tree(trees, support_aggregate=aggregate)
+    supports = _internal_supports(got)
+
+    assert supports[frozenset({"c", "d", "e"})] == expected_ab  # {a,b}|{c,d,e}
+    assert supports[frozenset({"d", "e"})] == expected_de  # {a,b,c}|{d,e}
+
+
+def test_support_aggregate_none_keeps_clade_frequency() -> None:
+    trees = [
+        "(((a:1,b:1)95:1,c:1)88:1,d:1,e:1);",
+        "(((a:1,b:1)91:1,c:1)70:1,d:1,e:1);",
+    ]
+
+    got = streaming_consensus_tree(trees, support_aggregate=None)
+    assert set(_internal_supports(got).values()) == {100.0}
+
+
+@pytest.mark.parametrize(
+    "trees",
+    [
+        ["(a,(b,(c,d)))", "(a,(b,(c,(d,e))))"],
+        ["(a,(b,(c,(d,e))))", "(a,(b,(c,d)))"],
+        ["(a,(b,(c,e)))", "(a,(b,(c,d)))"],
+        ["(a,(b,(c,d)))", "(a,(b,(c,a)))"],
+    ],
+)
+def test_bad_trees(trees: Iterable[str]) -> None:
+    with pytest.raises(ValueError, match=re.escape("Trees must be on same taxa set.")):
+        streaming_consensus_tree(trees)
+
+
+def test_no_trees() -> None:
+    with pytest.raises(ValueError, match="At least one tree"):
+        streaming_consensus_tree([])
+
+
+@pytest.mark.parametrize("min_support", [-1, 1.00001])
+def test_bad_min_support(five_trees: list[PhyloNode], min_support: float) -> None:
+    with pytest.raises(ValueError, match="Only min support values"):
+        streaming_consensus_tree(five_trees, min_support=min_support)
+
+
+def test_bad_support_aggregate(five_trees: list[PhyloNode]) -> None:
+    with pytest.raises(ValueError, match="support_aggregate must be one of"):
+        streaming_consensus_tree(five_trees, support_aggregate="median")
@@ -0,0 +1,62 @@
+"""Test IQ-TREE functions being called concurrently from multiple threads."""
+
+import os
+import pathlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cogent3.core.alignment import Alignment
+
+from piqtree import build_tree
+from piqtree.iqtree._decorator import iqtree_func
+
+
+def test_concurrent_calls_hide_files(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    def write_then_read(text: str) -> tuple[pathlib.Path, str]:
+        # AliSim reads back files it has written to the working directory
+        log = pathlib.Path("output.log")
+        log.write_text(text)
+        time.sleep(0.01)
+        return pathlib.Path.cwd(), log.read_text()
+
+    func = iqtree_func(write_then_read, hide_files=True)
+    texts = [f"call {i}" for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(func, texts))
+
+    assert [text for _, text in results] == texts
+    working_dirs = {working_dir for working_dir, _ in results}
+    assert len(working_dirs) == len(texts)
+    assert not any(working_dir.exists() for working_dir in working_dirs)
+    assert pathlib.Path.cwd() == tmp_path
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_calls_restore_stdout(capfd: pytest.CaptureFixture[str]) -> None:
+    func = iqtree_func(lambda: time.sleep(0.05))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: func(), range(8)))
+
+    os.write(1, b"visible")
+    assert capfd.readouterr().out == "visible"
+
+
+def test_concurrent_build_tree(four_otu: Alignment) -> None:
+    expected = build_tree(four_otu, "JC", rand_seed=1)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        trees = list(
+            executor.map(lambda _: build_tree(four_otu, "JC", rand_seed=1), range(4)),
+        )
+
+    for tree in trees:
+        assert tree.same_topology(expected)
+        assert tree.params["lnL"] == expected.params["lnL"]
@@ -0,0 +1,83 @@
+import time
+from collections.abc import Callable
+
+from cogent3.core.alignment import Alignment
+
+import piqtree
+import piqtree.iqtree._model_finder as model_finder_module
+import piqtree.iqtree._tree as tree_module
+from piqtree import ModelFinderCache
+from piqtree.iqtree._timings import CallTimer
+
+
+def test_call_timer() -> None:
+    timer = CallTimer(enabled=True)
+    for _ in range(2):
+        with timer.step("sleep"):
+            time.sleep(0.01)
+
+    timings = timer.timings(None)
+    assert list(timings) == ["sleep", "total"]
+    assert timings["sleep"] >= 0.02
+    assert timings["total"] >= timings["sleep"]
+
+
+def test_call_timer_disabled() -> None:
+    timer = CallTimer(enabled=False)
+    with timer.step("sleep"):
+        pass
+    assert timer.steps == {}
+
+
+def test_build_tree_timings(
+    fake_iqtree: Callable[..., None],
+    raw_tree: str,
+    four_otu: Alignment,
+) -> None:
+    output = (
+        "Creating fast initial parsimony tree by random order stepwise addition...\n"
+        "|  OPTIMIZING CANDIDATE TREE SET  |\n"
+        "Iteration 10 / LogL: -6519.330 / Time: 0h:0m:1s\n"
+    )
+    fake_iqtree(tree_module, "iq_build_tree", output, raw_tree)
+
+    tree = piqtree.build_tree(four_otu, "JC", rand_seed=1, timings=True)
+    timings = tree.params["timings"]
+
+    steps = ["encode", "iqtree", "parse_yaml", "process_tree"]
+    assert list(timings) == [*steps, "iqtree_phases", "total"]
+    assert list(timings["iqtree_phases"]) == ["setup", "parsimony", "tree_search"]
+    assert sum(timings[step] for step in steps) <= timings["total"]
+    assert sum(timings["iqtree_phases"].values()) <= timings["iqtree"]
+
+    untimed = piqtree.build_tree(four_otu, "JC", rand_seed=1)
+    assert "timings" not in untimed.params
+
+
+def test_model_finder_timings(
+    fake_iqtree: Callable[..., None],
+    raw_models: str,
+    four_otu: Alignment,
+) -> None:
+    output = "ModelFinder will test up to 2 DNA models (sample size: 1000) ...\n"
+    fake_iqtree(model_finder_module, "iq_model_finder", output, raw_models)
+
+    cache = ModelFinderCache()
+    result = piqtree.model_finder(four_otu, rand_seed=1, timings=True, cache=cache)
+    assert result.timings is not None
+    assert list(result.timings) == [
+        "encode",
+        "cache",
+        "iqtree",
+        "process_result",
+        "iqtree_phases",
+        "total",
+    ]
+    assert list(result.timings["iqtree_phases"]) == ["setup", "model_finder"]
+
+    # a cached result only times the lookup
+    cached = piqtree.model_finder(four_otu, rand_seed=1, timings=True, cache=cache)
+    assert cached.timings is not None
+    assert list(cached.timings) == ["encode", "cache", "total"]
+
+    assert piqtree.model_finder(four_otu, rand_seed=1).timings is None
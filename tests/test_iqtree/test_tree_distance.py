@@ -0,0 +1,164 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+from cogent3 import make_tree
+from cogent3.core.tree import PhyloNode
+from numpy.testing import assert_allclose, assert_array_equal
+
+import piqtree
+
+
+def _random_tree(names: list[str], seed: int, *, lengths: bool = False) -> PhyloNode:
+    rng = random.Random(seed)  # noqa: S311
+    subtrees = list(names)
+    while len(subtrees) > 3:
+        rng.shuffle(subtrees)
+        subtrees.append(f"({subtrees.pop()},{subtrees.pop()})")
+    tree = make_tree(f"({','.join(subtrees)});")
+    if lengths:
+        for node in tree.preorder(include_self=False):
+            node.length = rng.random()
+    return tree
+
+
+def _splits(tree: PhyloNode) -> list[frozenset[str]]:
+    taxa = frozenset(tree.get_tip_names())
+    splits = set()
+    for node in tree.nontips():
+        split = frozenset(node.get_tip_names())
+        if min(taxa) in split:
+            split = taxa - split
+        if 1 < len(split) < len(taxa) - 1:
+            splits.add(split)
+    return list(splits)
+
+
+def _expected_quartet(tree1: PhyloNode, tree2: PhyloNode) -> float:
+    def resolved(tree: PhyloNode) -> set[frozenset[frozenset[str]]]:
+        quartets = set()
+        for split in _splits(tree):
+            other = frozenset(tree.get_tip_names()) - split
+            for pair1 in itertools.combinations(sorted(split), 2):
+                for pair2 in itertools.combinations(sorted(other), 2):
+                    quartets.add(frozenset([frozenset(pair1), frozenset(pair2)]))
+        return quartets
+
+    return len(resolved(tree1) ^ resolved(tree2)) / 2
+
+
+def _expected_matching_split(tree1: PhyloNode, tree2: PhyloNode) -> int:
+    taxa = frozenset(tree1.get_tip_names())
+    splits1 = _splits(tree1)
+    splits2 = _splits(tree2)
+    num_splits = max(len(splits1), len(splits2))
+    splits1 += [frozenset()] * (num_splits - len(splits1))
+    splits2 += [frozenset()] * (num_splits - len(splits2))
+
+    def cost(split1: frozenset[str], split2: frozenset[str]) -> int:
+        moved = len(split1 ^ split2)
+        return min(moved, len(taxa) - moved)
+
+    return min(
+        sum(cost(s1, s2) for s1, s2 in zip(splits1, perm, strict=True))
+        for perm in itertools.permutations(splits2)
+    )
+
+
+def test_weighted_robinson_foulds() -> None:
+    tree1 = make_tree("((A:1,B:2):0.5,C:3,D:4);")
+    tree2 = make_tree("((A:1,C:2):0.25,B:3,D:3);")
+
+    distances = piqtree.weighted_robinson_foulds([tree1, tree2])
+
+    # terminal branches differ by 0, 1, 1 and 1, each tree has a unique split
+    assert_allclose(distances, [[0, 3.75], [3.75, 0]])
+
+
+def test_kuhner_felsenstein() -> None:
+    tree1 = make_tree("((A:1,B:2):0.5,C:3,D:4);")
+    tree2 = make_tree("((A:1,C:2):0.25,B:3,D:3);")
+
+    distances = piqtree.kuhner_felsenstein(tree1, [tree1, tree2])
+
+    assert_allclose(distances, [0, np.sqrt(3 + 0.5**2 + 0.25**2)])
+
+
+def test_branch_scores_rooting() -> None:
+    unrooted = make_tree("(A:1,B:2,(C:3,D:4):1);")
+    rooted = make_tree("((A:1,B:2):0.25,(C:3,D:4):0.75);")
+
+    assert_allclose(piqtree.weighted_robinson_foulds([unrooted, rooted]), 0)
+    assert_allclose(piqtree.kuhner_felsenstein([unrooted, rooted]), 0)
+
+
+def test_branch_scores_without_lengths() -> None:
+    tree1 = make_tree("((A,B),C,D);")
+    tree2 = make_tree("((A,C),B,D);")
+
+    assert_array_equal(piqtree.weighted_robinson_foulds([tree1, tree2]), 0)
+
+
+@pytest.mark.parametrize("num_taxa", [5, 8, 20])
+def test_quartet_distance(num_taxa: int) -> None:
+    names = [f"t{i}" for i in range(num_taxa)]
+    trees = [_random_tree(names, seed) for seed in range(4)]
+
+    distances = piqtree.quartet_distance(trees, num_threads=2)
+
+    for i, tree1 in enumerate(trees):
+        for j, tree2 in enumerate(trees):
+            assert distances[i, j] == _expected_quartet(tree1, tree2)
+
+
+def test_quartet_distance_multifurcating() -> None:
+    star = make_tree("(A,B,C,D,E,F);")
+    partial = make_tree("(A,B,C,(D,E,F));")
+    resolved = make_tree("(A,B,(C,(D,(E,F))));")
+
+    distances = piqtree.quartet_distance(star, [star, partial, resolved])
+
+    assert_array_equal(
+        distances,
+        [0, _expected_quartet(star, partial), _expected_quartet(star, resolved)],
+    )
+    assert distances[2] == 15 / 2
+
+
+@pytest.mark.parametrize("num_taxa", [6, 7])
+def test_matching_split_distance(num_taxa: int) -> None:
+    names = [f"t{i}" for i in range(num_taxa)]
+    trees = [_random_tree(names, seed) for seed in range(5)]
+    trees.append(make_tree(f"({','.join(names[:-2])},({names[-2]},{names[-1]}));"))
+
+    distances = piqtree.matching_split_distance(trees, trees[:2])
+
+    for i, tree1 in enumerate(trees):
+        for j, tree2 in enumerate(trees[:2]):
+            assert distances[i, j] == _expected_matching_split(tree1, tree2)
+
+
+@pytest.mark.parametrize(
+    "metric",
+    [
+        piqtree.weighted_robinson_foulds,
+        piqtree.kuhner_felsenstein,
+        piqtree.quartet_distance,
+        piqtree.matching_split_distance,
+    ],
+)
+def test_tree_distance_shapes(metric) -> None:  # noqa: ANN001
+    names = [f"t{i}" for i in range(10)]
+    trees = [_random_tree(names, seed, lengths=True) for seed in range(4)]
+
+    pairwise = metric(trees)
+    assert pairwise.shape == (4, 4)
+    assert_array_equal(np.diag(pairwise), 0)
+    assert_array_equal(pairwise, pairwise.T)
+
+    assert_allclose(metric(trees[0], trees), pairwise[0])
+    assert_allclose(metric(trees[:2], trees), pairwise[:2])
+
+    with pytest.raises(ValueError, match="taxa"):
+        metric([trees[0], make_tree("(a,b,(c,d));")])
@@ -0,0 +1,71 @@
+import pathlib
+
+import numpy as np
+import pytest
+from cogent3 import load_aligned_seqs
+from cogent3.core.alignment import Alignment
+
+from piqtree.util import (
+    add_output_prefix,
+    derive_rand_seeds,
+    get_seq_array,
+    output_dir,
+)
+
+
+@pytest.mark.parametrize("aln_name", ["five_otu", "protein_four_otu"])
+def test_get_seq_array(aln_name: str, request: pytest.FixtureRequest) -> None:
+    aln = request.getfixturevalue(aln_name)
+
+    seqs = get_seq_array(aln)
+
+    assert seqs.dtype == np.uint8
+    assert seqs.shape == (aln.num_seqs, len(aln) + 1)
+    assert seqs.flags.c_contiguous
+    assert not seqs[:, -1].any()
+    for row, seq in zip(seqs, aln.iter_seqs(aln.names), strict=True):
+        assert row[:-1].tobytes().decode() == str(seq)
+
+
+def test_get_seq_array_gaps(DATA_DIR: pathlib.Path) -> None:
+    aln = load_aligned_seqs(DATA_DIR / "example.fasta", moltype="dna")
+
+    seqs = get_seq_array(aln)
+
+    for row, seq in zip(seqs, aln.iter_seqs(aln.names), strict=True):
+        assert row[:-1].tobytes().decode() == str(seq)
+
+
+def test_get_seq_array_invalid_code(
+    monkeypatch: pytest.MonkeyPatch,
+    five_otu: Alignment,
+) -> None:
+    codes = five_otu.array_seqs.copy()
+    codes[0, 0] = 200
+    monkeypatch.setattr(type(five_otu), "array_seqs", property(lambda _: codes))
+
+    with pytest.raises(ValueError, match="outside the"):
+        get_seq_array(five_otu)
+
+
+def test_derive_rand_seeds() -> None:
+    seeds = derive_rand_seeds(42, 100)
+
+    assert len(seeds) == 100
+    assert len(set(seeds)) == 100
+    assert all(-(1 << 31) <= seed < (1 << 31) for seed in seeds)
+    assert seeds == derive_rand_seeds(42, 100)
+    assert seeds[:10] == derive_rand_seeds(42, 10)
+    assert seeds != derive_rand_seeds(43, 100)
+
+
+def test_add_output_prefix() -> None:
+    with output_dir() as out_dir:
+        options = add_output_prefix("-m JC", out_dir / "piqtree")
+        assert options == f"-m JC -pre {out_dir / 'piqtree'}"
+        assert out_dir.is_dir()
+    assert not out_dir.exists()
+
+    assert add_output_prefix("", "out/piqtree") == "-pre out/piqtree"
+    with pytest.raises(ValueError, match="must not contain whitespace"):
+        add_output_prefix("", "my out/piqtree")